@@ -0,0 +1,204 @@
+"""
+File name:  Bricks.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Classes that index volumetric data per brick (block of voxels), to
+            skip the parts of a volume that can not contribute to a contour,
+            such as the air around a head.
+"""
+
+################################################################################
+################################################################################
+
+from logging import getLogger
+from math import ceil
+
+import numpy as np
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+class BrickIndex:
+
+    """
+    Index of the minimum and maximum value of every brick of a volume. The
+    index is built in a single pass over the (z, y, x) voxels and is tiny
+    compared to the volume, so it is built once and kept along with it. It
+    tells which bricks are crossed by a contour value, i.e. which parts of the
+    volume need to be visited to extract the contour.
+
+    The cells of a brick reach into the first voxels of the next brick, so the
+    range of a brick includes the ranges of its next neighbours.
+    """
+
+    ############################################################################
+
+    def __init__( self, array, brickSize = 16 ):
+        """
+        Build the index of the given (z, y, x) array.
+        """
+        self._brickSize = brickSize
+        self._shape = array.shape[:3]
+
+        starts = [np.arange( 0, n, brickSize ) for n in self._shape]
+        minima, maxima = [], []
+
+        # Reduce one slab of bricks at a time, such that a memory-mapped volume
+        # is paged in a slab at a time as well.
+        for z in starts[0]:
+            slab = np.asarray( array[z:z + brickSize] )
+            slabMinima, slabMaxima = slab.min( axis = 0 ), slab.max( axis = 0 )
+
+            for axis in range( 2 ):
+                slabMinima = np.minimum.reduceat( slabMinima, starts[axis + 1], axis = axis )
+                slabMaxima = np.maximum.reduceat( slabMaxima, starts[axis + 1], axis = axis )
+
+            minima.append( slabMinima )
+            maxima.append( slabMaxima )
+
+        self._minima = self._grow( np.stack( minima ), np.minimum, 1 )
+        self._maxima = self._grow( np.stack( maxima ), np.maximum, 1 )
+
+        logger.info( f"Built brick index of {self._minima.shape[::-1]} bricks of {brickSize} voxels." )
+
+    ############################################################################
+
+    def getBrickSize( self ):
+        """
+        Get the number of voxels along each side of a brick.
+        """
+        return self._brickSize
+
+    ############################################################################
+
+    def getRange( self ):
+        """
+        Get the range of the values in the volume.
+        """
+        return self._minima.min(), self._maxima.max()
+
+    ############################################################################
+
+    def activeBricks( self, value, margin = 0 ):
+        """
+        Get a (z, y, x) mask of the bricks whose cells may cross the given
+        value. The margin (in voxels) takes the voxels around each brick into
+        account, e.g. when the volume will be smoothed by a kernel of that
+        radius first.
+        """
+        minima, maxima = self._minima, self._maxima
+
+        if margin > 0:
+            steps = ceil( margin / self._brickSize )
+            minima = self._grow( self._grow( minima, np.minimum, steps ), np.minimum, -steps )
+            maxima = self._grow( self._grow( maxima, np.maximum, steps ), np.maximum, -steps )
+
+        return (minima <= value) & (value <= maxima) & (minima < maxima)
+
+    ############################################################################
+
+    def activeExtents( self, value, margin = 0 ):
+        """
+        Get the extents (x0, x1, y0, y1, z0, z1, in voxels) that cover all
+        bricks which may cross the given value (see activeBricks). There is an
+        extent for each slab of bricks along the z-axis, bounding its active
+        bricks. Consecutive slabs with equal bounds are merged. The extents of
+        consecutive slabs share a plane of voxels, such that no cell is left
+        out.
+        """
+        active = self.activeBricks( value, margin )
+        extents = []
+
+        for k, slab in enumerate( active ):
+            if not slab.any(): continue
+
+            ys, xs = np.nonzero( slab.any( axis = 1 ) )[0], np.nonzero( slab.any( axis = 0 ) )[0]
+            extent = [*self._voxelRange( xs[0], xs[-1], 2 ),
+                      *self._voxelRange( ys[0], ys[-1], 1 ),
+                      *self._voxelRange( k, k, 0 )]
+
+            if extents and extents[-1][:4] == extent[:4] and extents[-1][5] == extent[4]:
+                extents[-1][5] = extent[5]
+            else:
+                extents.append( extent )
+
+        return [tuple( extent ) for extent in extents]
+
+    ############################################################################
+
+    def boundingExtent( self, value, margin = 0 ):
+        """
+        Get the extent (x0, x1, y0, y1, z0, z1, in voxels) that bounds all
+        bricks which may cross the given value (see activeBricks), grown by
+        the margin (in voxels) and clipped to the volume, e.g. the region
+        around a contour. None if no brick crosses the value.
+        """
+        active = self.activeBricks( value )
+        if not active.any(): return None
+
+        extent = []
+        for axis in (2, 1, 0):
+            indices = np.nonzero( active.any( axis = tuple( a for a in range( 3 ) if a != axis ) ) )[0]
+            first, last = self._voxelRange( indices[0], indices[-1], axis )
+            extent += [int( max( first - margin, 0 ) ), int( min( last + margin, self._shape[axis] - 1 ) )]
+
+        return tuple( extent )
+
+    ############################################################################
+
+    def bricksInRange( self, low, high = None ):
+        """
+        Get a (z, y, x) mask of the bricks that may hold voxels between the
+        given values (inclusive, None if unbounded), e.g. the voxels at or
+        above a contour value.
+        """
+        mask = self._maxima >= low
+        if high is not None: mask &= self._minima <= high
+
+        return mask
+
+    ############################################################################
+
+    def valuesPresent( self, values, margin = 0 ):
+        """
+        Get the values (e.g. contour values or labels) that are crossed by
+        any brick, i.e. the contours that are not empty.
+        """
+        return [value for value in values if self.activeBricks( value, margin ).any()]
+
+    ############################################################################
+
+    def _voxelRange( self, first, last, axis ):
+        """
+        Get the range of voxels (inclusive) covered by the cells of the given
+        range of bricks along an axis of the (z, y, x) volume.
+        """
+        return first * self._brickSize, min( (last + 1) * self._brickSize, self._shape[axis] - 1 )
+
+    ############################################################################
+
+    @staticmethod
+    def _grow( array, function, steps ):
+        """
+        Combine every brick with its neighbours up to the given number of
+        steps further along each axis (or back, for negative steps), using the
+        given function (np.minimum or np.maximum).
+        """
+        for axis in range( 3 ):
+            for _ in range( abs( steps ) ):
+                shifted = np.moveaxis( array, axis, 0 )
+                result = shifted.copy()
+
+                if steps > 0: result[:-1] = function( shifted[:-1], shifted[1:] )
+                else: result[1:] = function( shifted[1:], shifted[:-1] )
+
+                array = np.moveaxis( result, 0, axis )
+
+        return array
+
+################################################################################
+################################################################################
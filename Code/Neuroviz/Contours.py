@@ -0,0 +1,1057 @@
+"""
+File name:  Contours.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Functions that extract and smooth the contours (isosurfaces) of
+            volumetric data. Every function executes its filters right away
+            and returns the resulting data, so they can be run on a worker
+            thread (see Neuroviz.Workers) and the results are handed over to
+            the rendering pipeline afterwards.
+"""
+
+################################################################################
+################################################################################
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from logging import getLogger
+from math import ceil
+from multiprocessing import RawArray, get_context
+from threading import Lock
+
+import numpy as np
+
+from vtk import (vtkAppendPolyData, vtkBox, vtkCleanPolyData, vtkClipPolyData,
+                 vtkContourFilter, vtkDiscreteFlyingEdges3D,
+                 vtkExtractPolyDataGeometry, vtkExtractVOI, vtkImageCast,
+                 vtkImageGaussianSmooth, vtkPolyData,
+                 vtkPolyDataConnectivityFilter, vtkPolyDataNormals,
+                 vtkQuadricDecimation, vtkStripper, vtkTriangleFilter,
+                 vtkWindowedSincPolyDataFilter)
+from vtk.util.numpy_support import vtk_to_numpy
+
+from Neuroviz.Meshes import (arraysToPolyData, compactMesh, hasSparseSmoothing,
+                             polyDataToArrays, reorderMesh, smoothMesh,
+                             splitByLabel, weldMeshes)
+from Neuroviz.Readers import arrayToImage, findExtent, imageToArray
+from Neuroviz.Stages import StageCache
+
+logger = getLogger( __name__ )
+
+# The shared volume and cancellation flags of a worker process, see
+# ExtractionPool.
+_workerVolume = None
+_workerCancelled = None
+
+################################################################################
+################################################################################
+
+def extractSurface( image, value, smoothing = None, sampleRate = 1, bricks = None, budget = None,
+                    focus = None, job = None ):
+    """
+    Extract the isosurface at the given value. The image is subsampled first
+    when the sample rate is larger than one, and smoothed using a Gaussian
+    filter when the smoothing (radius, stdDev, iters, passBand, angle) asks for
+    it. When the brick index (see Neuroviz.Bricks) of the image is given, only
+    the regions of the bricks that may cross the value are visited, unless
+    the image is subsampled. When a memory budget (in bytes) is given, the
+    image is streamed through the filters in slabs that fit the budget, such
+    that the whole (smoothed) image is never in memory at once. Together with
+    a memory-mapped image (see Neuroviz.Readers), this allows contouring
+    volumes larger than memory. When the image is subsampled, the part of it
+    within the focus extent (x0, x1, y0, y1, z0, z1, in voxels), if any, is
+    extracted at full resolution nonetheless (see _extractFocusedSurface).
+    """
+    if sampleRate <= 1 and (bricks is not None or budget is not None):
+        return _extractSurfaceFromRegions( image, value, smoothing, bricks, budget, job )
+
+    if sampleRate > 1 and focus is not None:
+        return _extractFocusedSurface( image, value, smoothing, sampleRate, focus, job )
+
+    image = _subsample( image, sampleRate, job )
+    image = _smooth( image, _subsampledSmoothing( smoothing, sampleRate ), job )
+
+    return _contour( image, value, job )
+
+################################################################################
+
+def extractSurfaces( image, values, smoothings, bricks = None, processes = 2, sincs = None, pool = None,
+                     job = None ):
+    """
+    Extract the isosurfaces at the given values, each with its own smoothing
+    (None if not smoothed), using the given pool of worker processes (see
+    ExtractionPool) of the image or, if there is none, a pool of the given
+    number of processes that is started for this call only. The regions of
+    all values (see extractSurface) are handed out to the processes at once.
+    The processes smooth their pieces using the windowed sinc filter as well
+    (unless turned off for a value by sincs, one flag for each value),
+    keeping the points at the seams in place, such that the pieces are welded
+    into watertight surfaces. Returns the list of (smoothed) surfaces.
+    """
+    if pool is not None: return pool.extract( values, smoothings, bricks, sincs, job )
+
+    pool = ExtractionPool( image, processes )
+
+    try:
+        return pool.extract( values, smoothings, bricks, sincs, job )
+    finally:
+        pool.shutdown()
+
+################################################################################
+
+def extractLabelSurfaces( image, values, sampleRate = 1, job = None ):
+    """
+    Extract the surfaces of all labels (values) in a single pass over the
+    volume using discrete flying edges. Every point of the output carries the
+    label it belongs to, which is used to split the output into a surface per
+    label. The split only visits the (small) output mesh, so adding labels
+    barely increases the cost of contouring.
+    """
+    image = _subsample( image, sampleRate, job )
+
+    contour = vtkDiscreteFlyingEdges3D()
+    contour.SetInputData( image )
+    contour.ComputeScalarsOn()
+    contour.ComputeGradientsOff()
+    contour.ComputeNormalsOff()
+
+    for i, value in enumerate( values ): contour.SetValue( i, value )
+
+    surfaces = splitByLabel( _execute( contour, job ), values )
+    if job is not None: job.checkCancelled()
+
+    return surfaces
+
+################################################################################
+
+def smoothSurface( surface, smoothing, job = None ):
+    """
+    Smooth an isosurface using a windowed sinc filter followed by normal
+    creation to create a smooth shading.
+    """
+    angle = smoothing[4]
+
+    # The filters complain about empty input, e.g. a contour value that does
+    # not occur in the data.
+    if surface.GetNumberOfPolys() == 0: return surface
+
+    return _normals( _sinc( surface, smoothing, job = job ), angle, job = job )
+
+################################################################################
+
+def decimateSurface( surface, reduction, angle = 45.0, job = None ):
+    """
+    Decimate a surface by the given target reduction and recompute its
+    normals.
+    """
+    if surface.GetNumberOfPolys() == 0: return surface
+
+    decimation = vtkQuadricDecimation()
+    decimation.SetInputData( surface )
+    decimation.SetTargetReduction( reduction )
+
+    return _normals( _execute( decimation, job ), angle, job = job )
+
+################################################################################
+
+def stripSurface( surface, job = None ):
+    """
+    Create triangle strips from a surface, which will render very fast.
+    """
+    stripper = vtkStripper()
+    stripper.SetInputData( surface )
+
+    return _execute( stripper, job )
+
+################################################################################
+
+def optimizeSurface( surface, islandSize = 0, budget = None, job = None ):
+    """
+    Optimize a (smoothed) surface for rendering: weld its coincident points
+    (e.g. the ones that were split to create sharp edges), drop its connected
+    components of fewer than the given number of triangles (noise islands),
+    decimate it to at most the given number of triangles (None if unlimited)
+    and reorder it for the vertex cache (see Neuroviz.Meshes.reorderMesh).
+    Returns a triangle mesh without normals.
+    """
+    if surface.GetNumberOfPolys() == 0: return surface
+
+    clean = vtkCleanPolyData()
+    clean.SetInputData( surface )
+    clean.PointMergingOn()
+
+    connectivity = vtkPolyDataConnectivityFilter()
+    connectivity.SetInputData( _execute( clean, job ) )
+    connectivity.SetExtractionModeToAllRegions()
+    connectivity.ColorRegionsOn()
+
+    connected = _execute( connectivity, job )
+    points, triangles = polyDataToArrays( connected )
+    triangleCount = len( triangles )
+
+    # All points of a triangle belong to the same region.
+    regions = vtk_to_numpy( connected.GetPointData().GetArray( "RegionId" ) )[triangles[:, 0]]
+    triangles = triangles[np.bincount( regions )[regions] >= islandSize]
+    mesh = arraysToPolyData( *compactMesh( points, triangles ) )
+
+    if budget is not None and len( triangles ) > budget:
+        decimation = vtkQuadricDecimation()
+        decimation.SetInputData( mesh )
+        decimation.SetTargetReduction( 1.0 - budget / len( triangles ) )
+        points, triangles = polyDataToArrays( _execute( decimation, job ) )
+
+    mesh = arraysToPolyData( *reorderMesh( points, triangles ) )
+    logger.info( f"Optimized surface of {triangleCount} triangles into {mesh.GetNumberOfPolys()} triangles." )
+
+    return mesh
+
+################################################################################
+
+def buildContour( surface, smoothing = None, reductions = (), presmoothed = False, optimization = None,
+                  cache = None, key = None, job = None ):
+    """
+    Turn an isosurface into the mesh to render and its levels of detail,
+    one decimated mesh for each of the given target reductions. A presmoothed
+    surface has been smoothed by the windowed sinc filter already (see
+    extractSurfaces) and only needs its normals. The optimization (island
+    size, triangle budget, strips), if any, optimizes the smoothed surface
+    (see optimizeSurface), which keeps its welded points as the normals are
+    not split, and tells whether to render it as triangle strips or as plain
+    (cache ordered) triangles. Every stage (windowed sinc, normals,
+    optimization, stripper, decimation) is memoized in the cache (see
+    Neuroviz.Stages.StageCache), if any, given the key of the surface (None if
+    it is not memoized). Returns the mesh and the list of decimated meshes.
+    """
+    if smoothing is None:
+        smoothed, mesh, angle = surface, surface, 45.0
+    else:
+        mesh, angle = None, smoothing[4]
+
+        # The feature angle only matters to the windowed sinc filter when it
+        # smooths feature edges, which it does not (see _sinc).
+        if not presmoothed and surface.GetNumberOfPolys() > 0:
+            surface, key = _stage( cache, key, "Sinc", (*smoothing[2:4], *smoothing[5:]), _sinc, surface, smoothing,
+                                   job = job )
+
+        smoothed, key = _stage( cache, key, "Normals", (angle, True), _normals, surface, angle, job = job )
+
+    if optimization is not None:
+        islandSize, budget, strips = optimization
+        smoothed, key = _stage( cache, key, "Optimization", (islandSize, budget), optimizeSurface, smoothed,
+                                islandSize, budget, job = job )
+        smoothed, key = _stage( cache, key, "Normals", (angle, False), _normals, smoothed, angle, False, job = job )
+        if strips: mesh = _stage( cache, key, "Strips", (), stripSurface, smoothed, job = job )[0]
+        else: mesh = smoothed
+    elif mesh is None:
+        mesh = _stage( cache, key, "Strips", (), stripSurface, smoothed, job = job )[0]
+
+    lods = [_stage( cache, key, "Decimation", (reduction, angle), decimateSurface, smoothed, reduction, angle,
+                    job = job )[0] for reduction in reductions]
+
+    return mesh, lods
+
+################################################################################
+
+def createContour( image, value, smoothing = None, reductions = (), discrete = False,
+                   sampleRate = 1, withRawSurface = False, bricks = None, budget = None, processes = 1,
+                   optimization = None, cache = None, focus = None, pool = None, job = None ):
+    """
+    Extract and build the contour at the given value (see buildContour). In
+    discrete mode, the value is treated as a label. Returns the mesh, the list
+    of decimated meshes and, if asked for, the raw isosurface (i.e. smoothed
+    by the Gaussian filter of the smoothing, but not by the windowed sinc
+    filter), such that the smoothing of the contour applies to cuts of it as
+    well (see cutSurface). The brick index (if any) is used to skip empty
+    space and the memory budget (if any) to stream the image (see
+    extractSurface). A subsampled contour is extracted at full resolution
+    within the focus extent (if any, not in discrete mode). More than one
+    process extracts the contour in parallel (see extractSurfaces), using the
+    pool of the image (if any), unless the image is subsampled or streamed.
+    The optimization (if any) is passed on to buildContour. The stages are
+    memoized in the cache (if any), see buildContour and _extractSurface,
+    unless the contour is extracted in parallel.
+    """
+    parallel = processes > 1 and not discrete and sampleRate <= 1 and budget is None
+    source = None if cache is None else cache.fingerprint( image )
+    key = None
+
+    if parallel and withRawSurface:
+        surface, rawSurface = extractSurfaces( image, [value] * 2, [smoothing] * 2, bricks, processes, (True, False),
+                                               pool, job )
+    elif parallel:
+        surface, rawSurface = extractSurfaces( image, [value], [smoothing], bricks, processes, pool = pool,
+                                               job = job )[0], None
+    else:
+        surface, key = _extractSurface( image, value, smoothing, discrete, sampleRate, focus, bricks, budget,
+                                        cache, source, job )
+        rawSurface = surface if withRawSurface else None
+
+    mesh, lods = buildContour( surface, smoothing, reductions, parallel, optimization, cache, key, job )
+
+    return mesh, lods, rawSurface
+
+################################################################################
+
+def createContours( image, values, smoothings, reductions = (), discrete = False, bricks = None,
+                    budget = None, processes = 1, optimizations = None, cache = None, sampleRates = None,
+                    focus = None, pool = None, job = None ):
+    """
+    Extract and build the contours at the given values (see buildContour),
+    each with its own smoothing (None if not smoothed). In discrete mode, the
+    values are treated as labels and extracted in a single pass. Returns the
+    list of contours (mesh, decimated meshes) and the raw isosurface of the
+    first value (see createContour). The brick index (if any) is
+    used to skip empty space and the memory budget (if any) to stream the
+    image (see extractSurface). Each contour is extracted from the image
+    subsampled by its sample rate (1 if there are none, not in discrete
+    mode), except within the focus extent (if any), see extractSurface. More
+    than one process extracts the contours in parallel (see extractSurfaces),
+    using the pool of the image (if any), unless the image is streamed or
+    subsampled. The optimizations (one for
+    each value, None if not optimized) are passed on to buildContour. The
+    stages are memoized in the cache (if any), such that editing a contour
+    afterwards (see createContour) reuses them, unless the contours are
+    extracted in parallel. The contours with value None are skipped (e.g. to
+    build them later on) and left empty, except for the first one.
+    """
+    skipped = [i for i, value in enumerate( values ) if value is None]
+    if skipped:
+        contours, rawSurface = createContours( image, _unskipped( values, skipped ),
+                                               _unskipped( smoothings, skipped ), reductions, discrete, bricks,
+                                               budget, processes, _unskipped( optimizations, skipped ), cache,
+                                               _unskipped( sampleRates, skipped ), focus, pool, job )
+        for i in skipped: contours.insert( i, (vtkPolyData(), []) )
+
+        return contours, rawSurface
+
+    n = len( values )
+    if optimizations is None: optimizations = [None] * n
+    if sampleRates is None or discrete: sampleRates = [1] * n
+    parallel = processes > 1 and not discrete and budget is None and max( sampleRates ) <= 1
+    source = None if cache is None else cache.fingerprint( image )
+    keys = [None] * n
+    rawSurface = None
+
+    if discrete:
+        if job is not None: job.setProgressRange( 0.0, 0.5 )
+        surfaces = extractLabelSurfaces( image, values, job = job )
+        start, step = 0.5, 0.5 / n
+
+        # Each surface is memoized as if it has been extracted by itself, see
+        # _extractSurface.
+        if cache is not None:
+            keys = [_surfaceKey( source, value, None, True, 1, None ) for value in values]
+            for key, surface in zip( keys, surfaces ): cache.add( key, [surface] )
+    elif parallel:
+        # The raw surface of the first value is extracted along with the others.
+        if job is not None: job.setProgressRange( 0.0, 0.5 )
+        surfaces = extractSurfaces( image, [*values, values[0]], [*smoothings, smoothings[0]], bricks, processes,
+                                    [True] * n + [False], pool, job )
+        rawSurface = surfaces.pop()
+        start, step = 0.5, 0.5 / n
+    else:
+        surfaces = [None] * n
+        start, step = 0.0, 1.0 / n
+
+    contours = []
+
+    for i, (value, smoothing) in enumerate( zip( values, smoothings ) ):
+        if job is not None: job.setProgressRange( start + i * step, start + (i + 1) * step )
+
+        if surfaces[i] is None:
+            surfaces[i], keys[i] = _extractSurface( image, value, smoothing, False, sampleRates[i], focus, bricks,
+                                                    budget, cache, source, job )
+
+        contours.append( buildContour( surfaces[i], smoothing, reductions, parallel, optimizations[i], cache, keys[i],
+                                       job ) )
+
+    if rawSurface is None: rawSurface = surfaces[0]
+
+    size = sum( mesh.GetActualMemorySize() for contour in contours for mesh in (contour[0], *contour[1]) )
+    logger.info( f"Built {n} contours from {image.GetScalarTypeAsString()} voxels "
+                 f"({image.GetActualMemorySize() / 1024:.1f} MB), taking {size / 1024:.1f} MB." )
+
+    return contours, rawSurface
+
+################################################################################
+
+def cutSurface( surface, bounds, smoothing = None, reductions = (), optimization = None, job = None ):
+    """
+    Cut the cells inside the box with the given bounds out of a raw isosurface
+    (see createContour) and build the cut (see buildContour), optimized like a
+    contour if asked for. Smoothing by the windowed sinc filter is done after
+    cutting, as smoothing before cutting results in strange boundary cells.
+    Returns the mesh and the list of decimated meshes.
+    """
+    box = vtkBox()
+    box.SetBounds( *bounds )
+
+    extraction = vtkExtractPolyDataGeometry()
+    extraction.SetInputData( surface )
+    extraction.SetImplicitFunction( box )
+    extraction.ExtractInsideOn()
+    extraction.ExtractBoundaryCellsOn()
+
+    return buildContour( _execute( extraction, job ), smoothing, reductions, optimization = optimization, job = job )
+
+################################################################################
+
+def createOctants( surface, bounds, smoothing = None, reductions = (), optimization = None, job = None ):
+    """
+    Cut a raw isosurface into pieces, one for each of the given box bounds
+    (see cutSurface). The optimization (island size, triangle budget, strips),
+    if any, optimizes the pieces, which share the triangle budget of the
+    surface. Returns the list of pieces (mesh, decimated meshes).
+    """
+    if optimization is not None and optimization[1] is not None:
+        islandSize, budget, strips = optimization
+        optimization = (islandSize, budget // len( bounds ), strips)
+
+    octants = []
+
+    for i, octantBounds in enumerate( bounds ):
+        if job is not None: job.setProgressRange( i / len( bounds ), (i + 1) / len( bounds ) )
+
+        octants.append( cutSurface( surface, octantBounds, smoothing, reductions, optimization, job ) )
+
+    return octants
+
+################################################################################
+
+def contourExtent( array, values, smoothings ):
+    """
+    Get the tight extent (in voxels) of the part of the (z, y, x) array that
+    the contours at the given values, each with its own smoothing, can reach:
+    the voxels at or above the lowest value (see Neuroviz.Readers.findExtent),
+    grown by the margin of contourReach. Returns None if the contours are
+    empty.
+    """
+    return findExtent( array, *contourReach( values, smoothings ) )
+
+################################################################################
+
+def contourReach( values, smoothings ):
+    """
+    Get the lowest of the given contour values and the margin (in voxels)
+    around the voxels at or above it that the contours, each with its own
+    smoothing, can reach: a voxel for the cells that cross the value and
+    twice the radius of the largest Gaussian kernel, once for the voxels that
+    the smoothing may lift above the value and once more for the voxels that
+    are smoothed into those. A crop (see contourExtent) holds other contours
+    as long as their value is not lower and their margin not larger.
+    """
+    margin = 1 + 2 * max( (_margin( smoothing ) for smoothing in smoothings), default = 0 )
+
+    return min( values ), margin
+
+################################################################################
+
+def previewSmoothing( smoothing ):
+    """
+    Get a cheaper version of the smoothing (a quarter of the sinc iterations)
+    to be used for previews.
+    """
+    if smoothing is None: return None
+
+    return smoothing[:2] + (smoothing[2] // 4,) + smoothing[3:]
+
+################################################################################
+
+def parseSmoothing( text ):
+    """
+    Parse a smoothing from the settings: the radius and standard deviation of
+    the Gaussian filter, the iterations and pass band of the windowed sinc
+    filter and the feature angle, separated by slashes, optionally followed by
+    the smoothing engine of the windowed sinc filter. The "VTK" engine (the
+    default) uses vtkWindowedSincPolyDataFilter, the "Sparse" engine uses
+    Neuroviz.Meshes.smoothMesh, which falls back to the former if scipy is
+    not available. Only the "Sparse" engine is kept in the tuple.
+    """
+    s = [x.strip() for x in text.split( "/" )]
+    smoothing = (int( s[0] ), float( s[1] ), int( s[2] ), float( s[3] ), float( s[4] ))
+    engine = s[5] if len( s ) > 5 else "VTK"
+
+    if engine not in ("VTK", "Sparse"):
+        logger.warning( f"Unknown smoothing engine {engine}, using VTK instead." )
+    elif engine == "Sparse" and not hasSparseSmoothing():
+        logger.warning( "The Sparse smoothing engine requires scipy, using VTK instead." )
+    elif engine == "Sparse":
+        smoothing += (engine,)
+
+    return smoothing
+
+################################################################################
+
+def _extractSurface( image, value, smoothing, discrete, sampleRate, focus, bricks, budget, cache, source, job ):
+    """
+    Extract the (Gaussian smoothed) isosurface at the given value (see
+    extractSurface) or, in discrete mode, the surface of the label (see
+    extractLabelSurfaces), memoized in the cache (if any) given the
+    fingerprint (source) of the image. The Gaussian smoothing and the contour
+    are a single stage, as the smoothed image is only kept a region at a time.
+    Returns the surface and its key (None if not memoized).
+    """
+    parameters = _surfaceKey( source, value, smoothing, discrete, sampleRate, focus )[1]
+
+    if discrete:
+        surfaces, key = _stage( cache, source, "Surface", parameters, extractLabelSurfaces, image, [value],
+                                sampleRate, job = job )
+        return surfaces[0], key
+
+    return _stage( cache, source, "Surface", parameters, extractSurface, image, value, smoothing, sampleRate, bricks,
+                   budget, focus, job = job )
+
+################################################################################
+
+def _surfaceKey( source, value, smoothing, discrete, sampleRate, focus ):
+    """
+    Get the key of the isosurface at the given value of the image with the
+    given fingerprint (see _extractSurface). Only the Gaussian smoothing
+    (radius, stdDev) is used to extract it, and the focus extent only if the
+    image is subsampled.
+    """
+    gaussian = smoothing[:2] if not discrete and _margin( smoothing ) > 0 else None
+    if discrete or sampleRate <= 1: focus = None
+
+    return ("Surface", (value, discrete, sampleRate, None if focus is None else tuple( focus ), gaussian), source)
+
+################################################################################
+
+def _stage( cache, key, name, parameters, function, *args, **kwargs ):
+    """
+    Execute a stage of the pipeline, i.e. call the function with the given
+    arguments, unless its output is memoized in the cache (see
+    Neuroviz.Stages.StageCache) under the name and parameters of the stage
+    and the key of its input. Returns the output along with its key, None if
+    there is no cache or the input has no key (i.e. it is not memoized).
+    """
+    if cache is None or key is None: return function( *args, **kwargs ), None
+
+    key = (name, parameters, key)
+
+    return cache.compute( key, function, *args, **kwargs ), key
+
+################################################################################
+
+def _unskipped( items, skipped ):
+    """
+    Get the items (one for each contour, None if there are none) of the
+    contours that are not skipped (see createContours).
+    """
+    if items is None: return None
+
+    return [item for i, item in enumerate( items ) if i not in skipped]
+
+################################################################################
+
+def _extractSurfaceFromRegions( image, value, smoothing, bricks = None, budget = None, job = None ):
+    """
+    Extract the isosurface at the given value region by region (see _regions)
+    and merge the pieces. Each region is smoothed along with a margin of
+    voxels around it, such that the pieces match the whole surface and their
+    points at the seams (the planes shared by the regions) coincide.
+    """
+    regions = _regions( image, value, smoothing, bricks, budget )
+    append = vtkAppendPolyData()
+
+    for outer, inner in regions:
+        region = _smooth( _extractVOI( image, outer, job ), smoothing, job )
+        if outer != inner: region = _extractVOI( region, inner, job )
+
+        append.AddInputData( _contour( region, value, job ) )
+
+    if len( regions ) == 0: return vtkPolyData()
+    if len( regions ) == 1: return _execute( append, job )
+
+    # Merge the coinciding points at the seams, leaving the cells untouched.
+    clean = vtkCleanPolyData()
+    clean.SetInputData( _execute( append, job ) )
+    clean.ConvertLinesToPointsOff()
+    clean.ConvertPolysToLinesOff()
+    clean.ConvertStripsToPolysOff()
+
+    return _execute( clean, job )
+
+################################################################################
+
+def _extractFocusedSurface( image, value, smoothing, sampleRate, focus, job = None ):
+    """
+    Extract the isosurface at the given value from the image subsampled by
+    the sample rate, except within the focus extent (in voxels, clipped to
+    the image), where it is extracted at full resolution. The full resolution
+    part is smoothed along with a margin of voxels around it, like a region
+    (see _extractSurfaceFromRegions), the subsampled part with the same
+    Gaussian kernel in space (see _subsampledSmoothing). Both surfaces are
+    clipped at the planes of the box around the focus extent (see _clip), such
+    that they meet at the planes, and their coinciding points are merged. The
+    points on the planes stay in place when the merged surface is smoothed by
+    the windowed sinc filter (see _sinc).
+    """
+    whole = image.GetExtent()
+    margin = _margin( smoothing )
+
+    inner = [min( max( e + whole[i - i % 2], whole[i - i % 2] ), whole[i - i % 2 + 1] ) for i, e in enumerate( focus )]
+    outer = [max( e - margin, w ) if i % 2 == 0 else min( e + margin, w )
+             for i, (e, w) in enumerate( zip( inner, whole ) )]
+
+    coarse = _smooth( _subsample( image, sampleRate, job ), _subsampledSmoothing( smoothing, sampleRate ), job )
+    coarse = _contour( coarse, value, job )
+    fine = _contour( _smooth( _extractVOI( image, outer, job ), smoothing, job ), value, job )
+
+    origin, spacing = image.GetOrigin(), image.GetSpacing()
+    bounds = [origin[i // 2] + spacing[i // 2] * e for i, e in enumerate( inner )]
+
+    append = vtkAppendPolyData()
+    append.AddInputData( _clip( coarse, bounds, False, job ) )
+    append.AddInputData( _clip( fine, bounds, True, job ) )
+
+    # Merge the coinciding points at the seam, leaving the cells untouched.
+    clean = vtkCleanPolyData()
+    clean.SetInputData( _execute( append, job ) )
+    clean.ConvertLinesToPointsOff()
+    clean.ConvertPolysToLinesOff()
+    clean.ConvertStripsToPolysOff()
+
+    return _execute( clean, job )
+
+################################################################################
+
+def _subsampledSmoothing( smoothing, sampleRate ):
+    """
+    Get the smoothing of an image subsampled by the given sample rate that
+    has the same Gaussian kernel in space as the smoothing of the image: the
+    standard deviation is given in voxels, the radius in standard deviations.
+    """
+    if smoothing is None or sampleRate <= 1: return smoothing
+
+    return (smoothing[0], smoothing[1] / sampleRate, *smoothing[2:])
+
+################################################################################
+
+def _initializeWorker( shared, cancelled, dtype, shape, extent, spacing, origin ):
+    """
+    Map the volume and the cancellation flags in shared memory when a worker
+    process starts (see ExtractionPool).
+    """
+    global _workerVolume, _workerCancelled
+
+    _workerVolume = (np.frombuffer( shared, dtype = dtype ).reshape( shape ), extent, spacing, origin)
+    _workerCancelled = cancelled
+
+################################################################################
+
+def _extractRegion( slot, value, smoothing, sinc, outer, inner ):
+    """
+    Extract the piece of the isosurface at the given value from a region
+    (see _regions) of the shared volume and, if asked for, smooth it using the
+    windowed sinc filter, which keeps the points at the boundary (i.e. the
+    seams) in place. Runs in a worker process. The extraction is abandoned
+    between the filters once the flag of the given slot tells that it has
+    been cancelled (see ExtractionPool). Returns the points and triangles of
+    the piece, None if cancelled.
+    """
+    if _workerCancelled[slot]: return None
+
+    array, extent, spacing, origin = _workerVolume
+    x0, x1, y0, y1, z0, z1 = (e - w for e, w in zip( outer, (extent[0], extent[0], extent[2], extent[2],
+                                                            extent[4], extent[4]) ))
+
+    # The region keeps the index coordinates of the volume, such that the
+    # points of neighbouring pieces coincide exactly.
+    region = arrayToImage( array[z0:z1 + 1, y0:y1 + 1, x0:x1 + 1], spacing, origin )
+    region.SetExtent( *outer )
+
+    region = _smooth( region, smoothing )
+    if outer != inner: region = _extractVOI( region, inner )
+    if _workerCancelled[slot]: return None
+
+    surface = _contour( region, value )
+    if _workerCancelled[slot]: return None
+
+    # The points at the seams must coincide exactly after smoothing, see _sinc.
+    if sinc and smoothing is not None and surface.GetNumberOfPolys() > 0: surface = _sinc( surface, smoothing, False )
+
+    points, triangles = polyDataToArrays( surface )
+
+    return points.copy(), triangles.copy()
+
+################################################################################
+
+def _regions( image, value, smoothing, bricks = None, budget = None, pieces = 1 ):
+    """
+    Get the regions from which the isosurface at the given value is
+    extracted, as (outer, inner) extents in the index coordinates of the
+    image. The inner extents cover the bricks that may cross the value (see
+    BrickIndex.activeExtents), or the whole image if there is no brick index,
+    split into slabs that fit the memory budget (if any) and into about the
+    given number of pieces. The outer extents add the margin of voxels needed
+    by the Gaussian smoothing.
+    """
+    margin = _margin( smoothing )
+    whole = image.GetExtent()
+    offsets = (whole[0], whole[0], whole[2], whole[2], whole[4], whole[4])
+
+    if bricks is not None: extents = bricks.activeExtents( value, margin )
+    else: extents = [tuple( w - o for w, o in zip( whole, offsets ) )]
+
+    # A region is copied, smoothed (which takes twice the memory of the region
+    # for the intermediate result) and cropped to its inner part.
+    voxelSize = image.GetScalarSize() * (4 if margin > 0 else 1)
+    depth = sum( extent[5] - extent[4] for extent in extents )
+    regions = []
+
+    for extent in extents:
+        slices = extent[5] - extent[4] + 1
+        if pieces > 1: slices = min( slices, ceil( depth / pieces ) + 1 )
+        if budget is not None: slices = min( slices, _budgetSlices( extent, margin, voxelSize, budget ) )
+
+        for slab in _splitExtent( extent, slices ):
+            inner = [e + o for e, o in zip( slab, offsets )]
+            outer = [max( e - margin, w ) if i % 2 == 0 else min( e + margin, w )
+                     for i, (e, w) in enumerate( zip( inner, whole ) )]
+            regions.append( (outer, inner) )
+
+    return regions
+
+################################################################################
+
+def _budgetSlices( extent, margin, voxelSize, budget ):
+    """
+    Get the number of slices of a slab of the extent (x0, x1, y0, y1, z0, z1)
+    that, along with a margin of voxels around it, takes at most the given
+    budget (in bytes) of memory.
+    """
+    x0, x1, y0, y1 = extent[:4]
+    sliceSize = (x1 - x0 + 1 + 2 * margin) * (y1 - y0 + 1 + 2 * margin) * voxelSize
+    slices = int( budget // sliceSize ) - 2 * margin
+
+    if slices < 2:
+        logger.warning( f"Memory budget of {budget} bytes is too small, streaming slabs of 2 slices." )
+        slices = 2
+
+    return slices
+
+################################################################################
+
+def _splitExtent( extent, slices ):
+    """
+    Split an extent (x0, x1, y0, y1, z0, z1) into slabs of (at most) the given
+    number of slices along the z-axis. Consecutive slabs share a plane of
+    voxels, such that no cell is left out.
+    """
+    x0, x1, y0, y1, z0, z1 = extent
+    slices = max( slices, 2 )
+
+    return [(x0, x1, y0, y1, z, min( z + slices - 1, z1 )) for z in range( z0, max( z1, z0 + 1 ), slices - 1 )]
+
+################################################################################
+
+def _smooth( image, smoothing, job = None ):
+    """
+    Smooth the image using a Gaussian filter, if the smoothing (radius, stdDev,
+    iters, passBand, angle) asks for it. The filter keeps the data type of its
+    input, so the image is smoothed in float32: integer (label) volumes would
+    be rounded to their steps, doubles take twice the memory. Images that are
+    not smoothed are contoured in their own (compact) data type.
+    """
+    if _margin( smoothing ) == 0: return image
+
+    radius, stdDev = smoothing[:2]
+
+    cast = vtkImageCast()
+    cast.SetInputData( image )
+    cast.SetOutputScalarTypeToFloat()
+
+    gaussian = vtkImageGaussianSmooth()
+    gaussian.SetInputConnection( cast.GetOutputPort() )
+    gaussian.SetRadiusFactors( radius, radius, radius )
+    gaussian.SetStandardDeviations( stdDev, stdDev, stdDev )
+
+    smoothed = _execute( gaussian, job )
+    logger.debug( f"Smoothed {image.GetDimensions()} voxels from {image.GetScalarTypeAsString()} "
+                  f"({image.GetActualMemorySize() / 1024:.1f} MB) in float "
+                  f"({smoothed.GetActualMemorySize() / 1024:.1f} MB)." )
+
+    return smoothed
+
+################################################################################
+
+def _margin( smoothing ):
+    """
+    Get the radius (in voxels) of the Gaussian kernel of the smoothing, zero
+    if no Gaussian smoothing is done.
+    """
+    if smoothing is None: return 0
+
+    radius, stdDev = smoothing[:2]
+
+    if radius == 0 or stdDev == 0: return 0
+
+    return ceil( radius * stdDev )
+
+################################################################################
+
+def _sinc( surface, smoothing, normalize = True, job = None ):
+    """
+    Smooth a surface using a windowed sinc filter, keeping the points at its
+    boundary in place. Normalizing the coordinates improves the numerical
+    stability, but the points at the boundary no longer stay in place exactly,
+    except with the "Sparse" engine (see parseSmoothing).
+    """
+    radius, stdDev, iters, passBand, angle = smoothing[:5]
+
+    if smoothing[5:] == ("Sparse",):
+        if job is not None: job.checkCancelled()
+
+        points, triangles = polyDataToArrays( surface )
+        smoothed = arraysToPolyData( smoothMesh( points, triangles, iters, passBand, normalize ), triangles )
+        smoothed.GetPointData().ShallowCopy( surface.GetPointData() )
+
+        return smoothed
+
+    sinc = vtkWindowedSincPolyDataFilter()
+    sinc.SetInputData( surface )
+    sinc.SetNumberOfIterations( iters )
+    sinc.BoundarySmoothingOff()
+    sinc.FeatureEdgeSmoothingOff()
+    sinc.SetFeatureAngle( angle )
+    sinc.SetPassBand( passBand )
+    sinc.NonManifoldSmoothingOn()
+    sinc.SetNormalizeCoordinates( normalize )
+
+    return _execute( sinc, job )
+
+################################################################################
+
+def _normals( surface, angle, splitting = True, job = None ):
+    """
+    Compute the normals of a surface for a smooth shading, with sharp edges
+    above the given feature angle. Sharp edges split the points along them,
+    unless splitting is turned off.
+    """
+    if surface.GetNumberOfPolys() == 0: return surface
+
+    normals = vtkPolyDataNormals()
+    normals.SetInputData( surface )
+    normals.SetFeatureAngle( angle )
+    normals.SetSplitting( splitting )
+
+    return _execute( normals, job )
+
+################################################################################
+
+def _contour( image, value, job = None ):
+    """
+    Extract the isosurface at the given value.
+    """
+    contour = vtkContourFilter()
+    contour.SetInputData( image )
+    contour.SetValue( 0, value )
+    contour.ComputeScalarsOff()
+    contour.ComputeGradientsOff()
+    contour.ComputeNormalsOff()
+
+    return _execute( contour, job )
+
+################################################################################
+
+def _clip( surface, bounds, inside, job = None ):
+    """
+    Clip a surface at the planes of the box with the given bounds, keeping
+    the part inside or outside of the box. Unlike cutSurface, the cells are
+    cut at the planes rather than kept whole. The cut cells are triangulated
+    again, as the decimation only handles triangles.
+    """
+    if surface.GetNumberOfPolys() == 0: return surface
+
+    box = vtkBox()
+    box.SetBounds( *bounds )
+
+    clip = vtkClipPolyData()
+    clip.SetInputData( surface )
+    clip.SetClipFunction( box )
+    clip.SetInsideOut( inside )
+
+    triangles = vtkTriangleFilter()
+    triangles.SetInputConnection( clip.GetOutputPort() )
+
+    return _execute( triangles, job )
+
+################################################################################
+
+def _extractVOI( image, extent, job = None ):
+    """
+    Extract the part of the image within the given extent (in the index
+    coordinates of the image, which the output keeps).
+    """
+    voi = vtkExtractVOI()
+    voi.SetInputData( image )
+    voi.SetVOI( *extent )
+
+    return _execute( voi, job )
+
+################################################################################
+
+def _subsample( image, sampleRate, job = None ):
+    """
+    Keep every n'th sample of the image along each axis, n being the sample
+    rate.
+    """
+    if sampleRate <= 1: return image
+
+    voi = vtkExtractVOI()
+    voi.SetInputData( image )
+    voi.SetVOI( image.GetExtent() )
+    voi.SetSampleRate( sampleRate, sampleRate, sampleRate )
+
+    return _execute( voi, job )
+
+################################################################################
+
+def _execute( algorithm, job = None ):
+    """
+    Execute the algorithm and return its output. When running as a job, the
+    algorithm is aborted as soon as the job has been cancelled.
+    """
+    if job is not None: job.watch( algorithm )
+
+    algorithm.Update()
+
+    if job is not None: job.checkCancelled()
+
+    return algorithm.GetOutput()
+
+################################################################################
+################################################################################
+
+class ExtractionPool:
+
+    """
+    A pool of worker processes that extract the isosurfaces of a volume in
+    parallel (see extractSurfaces). The volume is copied into shared memory
+    once, which the processes map when they start, such that the pool serves
+    any number of extractions from the same volume. The copy is made and the
+    processes are started by the first extraction, i.e. on a worker thread.
+    Every extraction has a flag in shared memory, which tells the processes
+    to drop its regions once it has been cancelled. The pool can be used by
+    several worker threads at once.
+    """
+
+    ############################################################################
+
+    def __init__( self, image, processes = 2, slots = 64 ):
+        """
+        Initialize the pool of the given number of processes for the image,
+        with the given number of extractions that can run at once.
+        """
+        logger.info( f"Creating {__class__.__name__}..." )
+
+        self._image, self._processes = image, processes
+        self._fingerprint = StageCache.fingerprint( image )
+        self._executor = None
+        self._cancelled = RawArray( "b", slots )
+        self._slot = 0
+        self._lock = Lock()
+
+    ############################################################################
+
+    def matches( self, image ):
+        """
+        Check whether the pool serves the given image (or a shallow copy of it).
+        """
+        return StageCache.fingerprint( image ) == self._fingerprint
+
+    ############################################################################
+
+    def extract( self, values, smoothings, bricks = None, sincs = None, job = None ):
+        """
+        Extract the isosurfaces at the given values (see extractSurfaces).
+        Cancelling the job cancels the regions that have not been extracted
+        yet, in the processes as well. Raises a RuntimeError when the pool is
+        shut down during the extraction.
+        """
+        if sincs is None: sincs = [True] * len( values )
+
+        tasks = [(i, value, smoothing, sinc, *region)
+                 for i, (value, smoothing, sinc) in enumerate( zip( values, smoothings, sincs ) )
+                 for region in _regions( self._image, value, smoothing, bricks, pieces = 4 * self._processes )]
+        pieces = [None] * len( tasks )
+
+        # The regions are submitted under the lock, such that the pool cannot
+        # be shut down in between (see shutdown).
+        with self._lock:
+            if self._executor is None: self._start()
+
+            slot = self._slot
+            self._slot = (self._slot + 1) % len( self._cancelled )
+            self._cancelled[slot] = 0
+
+            executor = self._executor
+            futures = {executor.submit( _extractRegion, slot, *task[1:] ): k for k, task in enumerate( tasks )}
+
+        pending = set( futures )
+
+        try:
+            # Wake up regularly, such that a cancelled job (or a pool that has
+            # been shut down, whose regions may never be done) is noticed
+            # while the processes are busy.
+            while pending:
+                done, pending = wait( pending, timeout = 0.1, return_when = FIRST_COMPLETED )
+                for future in done:
+                    if not future.cancelled(): pieces[futures[future]] = future.result()
+
+                if self._cancelled[slot]: break
+
+                if job is not None:
+                    job.checkCancelled()
+                    job.reportProgress( 1 - len( pending ) / len( tasks ) )
+        finally:
+            self._cancelled[slot] = 1
+            for future in pending: future.cancel()
+
+        # The regions are only dropped here when the pool has been shut down.
+        if any( piece is None for piece in pieces ):
+            raise RuntimeError( f"{__class__.__name__} was shut down while extracting." )
+
+        logger.info( f"Extracted {len( values )} surfaces from {len( tasks )} regions using {self._processes} processes." )
+
+        return [arraysToPolyData( *weldMeshes( [piece for task, piece in zip( tasks, pieces ) if task[0] == i] ) )
+                for i in range( len( values ) )]
+
+    ############################################################################
+
+    def shutdown( self ):
+        """
+        Stop the processes and release the shared copy of the volume, once the
+        running extractions have been cancelled (which then fail, see
+        extract).
+        """
+        with self._lock:
+            for slot in range( len( self._cancelled ) ): self._cancelled[slot] = 1
+            if self._executor is not None: self._executor.shutdown( wait = False, cancel_futures = True )
+
+            self._executor = None
+
+    ############################################################################
+
+    def _start( self ):
+        """
+        Copy the volume into shared memory and create the processes, which map
+        it when they start.
+        """
+        array = imageToArray( self._image )
+
+        shared = RawArray( "B", array.nbytes )
+        np.frombuffer( shared, dtype = array.dtype ).reshape( array.shape )[...] = array
+
+        # The processes are spawned rather than forked, as forking a
+        # multithreaded process (e.g. Qt) is not safe.
+        self._executor = ProcessPoolExecutor( max_workers = self._processes, mp_context = get_context( "spawn" ),
+                                              initializer = _initializeWorker,
+                                              initargs = (shared, self._cancelled, array.dtype.str, array.shape,
+                                                          self._image.GetExtent(), self._image.GetSpacing(),
+                                                          self._image.GetOrigin()) )
+
+################################################################################
+################################################################################
@@ -0,0 +1,279 @@
+"""
+File name:  Frames.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Classes that cache the frames (volume and contours of a time point)
+            of a time series, such that it can be played back at a steady rate.
+            The frames ahead of the playhead are built on worker threads.
+"""
+
+################################################################################
+################################################################################
+
+from collections import OrderedDict
+from functools import partial
+from logging import getLogger
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from Neuroviz.Bricks import BrickIndex
+from Neuroviz.Contours import createContours, createOctants
+from Neuroviz.Readers import compactImage, imageToArray
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+def createFrame( reader, index, extent, values, smoothings, reductions = (), discrete = False,
+                 optimizations = None, compact = False, sampleRates = None, focus = None, octantBounds = None,
+                 job = None ):
+    """
+    Read a time point of the series of the given reader, crop it to the given
+    extent (None to keep the whole volume), convert it to its compact data
+    type if asked for (see Neuroviz.Readers.compactImage) and extract its
+    contours at the given sample rates and focus extent (see createContours).
+    The raw isosurface of the first contour is cut into octants at the given
+    bounds, if any, optimized like the first contour (see createOctants). Can
+    be run on a worker thread.
+    """
+    image = reader.GetTimePoint( index, extent )
+    if compact: image = compactImage( image )
+    if job is not None: job.checkCancelled()
+
+    bricks = BrickIndex( imageToArray( image ) )
+    contours, rawSurface = createContours( image, values, smoothings, reductions, discrete, bricks,
+                                          optimizations = optimizations, sampleRates = sampleRates, focus = focus,
+                                          job = job )
+
+    octants = None
+    if octantBounds is not None and rawSurface is not None:
+        optimization = optimizations[0] if optimizations is not None else None
+        octants = createOctants( rawSurface, octantBounds, smoothings[0], reductions, optimization, job )
+
+    return Frame( index, image, bricks, contours, rawSurface, octants, octantBounds )
+
+################################################################################
+################################################################################
+
+class Frame:
+
+    """
+    A time point of a series: its volume and brick index, its contours (mesh,
+    decimated meshes), the raw isosurface of the first contour value and the
+    octants (mesh, decimated meshes) cut from it at the given bounds, if any.
+    """
+
+    ############################################################################
+
+    def __init__( self, index, image, bricks, contours, rawSurface, octants = None, octantBounds = None ):
+        """
+        Initialize the frame.
+        """
+        self.index = index
+        self.image, self.bricks = image, bricks
+        self.contours, self.rawSurface = contours, rawSurface
+        self.octants, self.octantBounds = octants, octantBounds
+
+    ############################################################################
+
+    def getSize( self ):
+        """
+        Get the (approximate) number of bytes taken by the frame.
+        """
+        objects = [self.image, self.rawSurface]
+        for mesh, lods in [*self.contours, *(self.octants or ())]: objects += [mesh, *lods]
+
+        # Meshes may be shared, e.g. the raw isosurface of an unsmoothed contour.
+        objects = {id( x ): x for x in objects if x is not None}
+
+        return 1024 * sum( x.GetActualMemorySize() for x in objects.values() )
+
+################################################################################
+################################################################################
+
+class FrameCache( QObject ):
+
+    """
+    Caches the frames of a time series. The frames up to a number of time
+    points ahead of the playhead are prefetched: they are built on worker
+    threads, in the order in which they will be played (wrapping around at the
+    end of the series). Built frames are kept until they exceed the memory
+    budget, in which case the least recently used frames are dropped, except
+    for the ones ahead of the playhead. Stepping back thus reuses the frames
+    that have just been played, as long as they fit the budget.
+    """
+
+    ############################################################################
+
+    frameReady = pyqtSignal( int )
+
+    ############################################################################
+
+    def __init__( self, timePoints, build, jobQueue, prefetch = 4, budget = None, jobs = 2, *args, **kwargs ):
+        """
+        Initialize the cache of a series of the given number of time points.
+        The frames are built by calling the given function with the index of
+        a time point and the job (see createFrame), on the given job queue.
+        At most the given number of frames ahead of the playhead is prefetched,
+        by at most the given number of jobs at once, and the cached frames take
+        at most the given budget (in bytes, None if unlimited).
+        """
+        logger.info( f"Creating {__class__.__name__}..." )
+
+        super().__init__( *args, **kwargs )
+
+        self._timePoints = timePoints
+        self._build, self._jobQueue = build, jobQueue
+        self._prefetch, self._budget, self._jobs = prefetch, budget, jobs
+
+        self._frames = OrderedDict()    # From least to most recently used.
+        self._sizes = {}                # The size of each cached frame.
+        self._pending = set()           # The time points that are being built.
+        self._playhead = 0
+
+    ############################################################################
+
+    def getNumberOfTimePoints( self ):
+        """
+        Get the number of time points of the series.
+        """
+        return self._timePoints
+
+    ############################################################################
+
+    def get( self, index ):
+        """
+        Get the frame of the given time point, or None if it is not cached.
+        """
+        frame = self._frames.get( index )
+        if frame is not None: self._frames.move_to_end( index )
+
+        return frame
+
+    ############################################################################
+
+    def add( self, frame ):
+        """
+        Add a frame that has been built elsewhere, e.g. while loading.
+        """
+        self._frames[frame.index] = frame
+        self._sizes[frame.index] = frame.getSize()
+
+        self._evict()
+
+    ############################################################################
+
+    def setPlayhead( self, index ):
+        """
+        Move the playhead to the given time point, which prefetches the frames
+        ahead of it. Frames that are being built but are no longer ahead of the
+        playhead are cancelled.
+        """
+        self._playhead = index
+        window = self._getWindow()
+
+        for pending in self._pending - set( window ):
+            self._jobQueue.cancel( f"Frame{pending}" )
+            self._pending.discard( pending )
+
+        self._prefetchFrames()
+
+    ############################################################################
+
+    def clear( self, keep = None ):
+        """
+        Drop all frames (except for the one of the given time point, if any)
+        and cancel the frames that are being built, e.g. when the contours have
+        been changed.
+        """
+        for pending in self._pending: self._jobQueue.cancel( f"Frame{pending}" )
+
+        for index in list( self._frames ):
+            if index != keep: del self._frames[index], self._sizes[index]
+
+        self._pending.clear()
+
+    ############################################################################
+
+    def _getWindow( self ):
+        """
+        Get the time points from the playhead up to the number of prefetched
+        frames ahead of it, in the order in which they will be played.
+        """
+        count = min( self._prefetch + 1, self._timePoints )
+
+        return [(self._playhead + i) % self._timePoints for i in range( count )]
+
+    ############################################################################
+
+    def _prefetchFrames( self ):
+        """
+        Build the next frames ahead of the playhead that are not cached yet,
+        as long as the frames ahead of the playhead fit the budget.
+        """
+        window = self._getWindow()
+        frameSize = sum( self._sizes.values() ) / len( self._sizes ) if self._sizes else 0
+
+        for index in window:
+            if len( self._pending ) >= self._jobs: break
+            if index in self._frames or index in self._pending: continue
+
+            ahead = sum( 1 for i in window if i in self._frames ) + len( self._pending )
+            if self._budget is not None and (ahead + 1) * frameSize > self._budget: break
+
+            job = self._build( index )
+            job.signals.finished.connect( self._onFrameBuilt )
+            job.signals.failed.connect( partial( self._onFrameFailed, index ) )
+
+            # Prefetching gives way to the jobs of the user, e.g. contour edits.
+            self._jobQueue.submit( f"Frame{index}", job, priority = -1 )
+            self._pending.add( index )
+
+    ############################################################################
+
+    def _evict( self ):
+        """
+        Drop the least recently used frames that are not ahead of the playhead,
+        until the cached frames fit the budget.
+        """
+        if self._budget is None: return
+
+        window = set( self._getWindow() )
+
+        for index in list( self._frames ):
+            if sum( self._sizes.values() ) <= self._budget: break
+            if index in window: continue
+
+            del self._frames[index], self._sizes[index]
+            logger.debug( f"Dropped frame {index} from the cache." )
+
+    ############################################################################
+
+    def _onFrameBuilt( self, frame ):
+        """
+        Cache a frame that has been built on a worker thread and prefetch the
+        next one.
+        """
+        logger.debug( f"_onFrameBuilt( {frame.index} )" )
+
+        self._pending.discard( frame.index )
+        self.add( frame )
+
+        self.frameReady.emit( frame.index )
+        self._prefetchFrames()
+
+    ############################################################################
+
+    def _onFrameFailed( self, index, error ):
+        """
+        Forget about a frame that could not be built.
+        """
+        logger.warning( f"Unable to build frame {index}: {error}" )
+
+        self._pending.discard( index )
+
+################################################################################
+################################################################################
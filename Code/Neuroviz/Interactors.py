@@ -14,10 +14,12 @@ About:      Classes that compose widgets that can be used to interact with a
 from logging import getLogger
 
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import (QApplication, QCheckBox, QComboBox,
-                             QDoubleSpinBox, QGridLayout, QGroupBox, QLabel,
-                             QSizePolicy, QSlider, QSpacerItem, QVBoxLayout,
-                             QWidget)
+from PyQt5.QtWidgets import (QAbstractItemView, QApplication, QCheckBox,
+                             QComboBox, QDoubleSpinBox, QGridLayout,
+                             QGroupBox, QHeaderView, QLabel, QProgressBar,
+                             QPushButton, QSizePolicy, QSlider, QSpacerItem,
+                             QSpinBox, QTableWidget, QTableWidgetItem,
+                             QVBoxLayout, QWidget)
 
 from Neuroviz.UiComponents import SliderGroup
 
@@ -58,15 +60,75 @@ class BasicWidget( QWidget ):
 
     ############################################################################
 
+    def setControlsEnabled( self, enabled ):
+        """
+        Enable or disable the widgets that control the scene, e.g. while the
+        scene is being loaded. The loading widgets stay enabled.
+        """
+        for widget in (self._labelInteractionStyle, self.comboBoxInteractionStyle,
+                       self._labelActiveContour, self.comboBoxActiveContour,
+                       self._labelOpacity, self.sliderOpacity,
+                       self._groupBoxContour, self._groupBoxSliders, self._groupBoxTimeSeries):
+            widget.setEnabled( enabled )
+
+    ############################################################################
+
+    def setLoadingVisible( self, visible ):
+        """
+        Show or hide the loading progress bar and cancel button.
+        """
+        self._groupBoxLoading.setVisible( visible )
+
+    ############################################################################
+
+    def setTimeSeriesVisible( self, visible ):
+        """
+        Show or hide the time series widgets.
+        """
+        self._groupBoxTimeSeries.setVisible( visible )
+
+    ############################################################################
+
+    def setStatistics( self, statistics ):
+        """
+        Show the statistics (name, (voxels, volume, bounds)) of the tissues, see
+        Neuroviz.Scenes.BasicScene.getStatistics. None shows that they are
+        being measured.
+        """
+        self._labelStatistics.setVisible( statistics is None )
+        if statistics is None: return
+
+        self.tableStatistics.setRowCount( len( statistics ) )
+
+        for row, (name, (voxels, volume, bounds)) in enumerate( statistics.items() ):
+            size = "-" if bounds is None else " x ".join( f"{bounds[i + 1] - bounds[i]:.0f}" for i in range( 0, 6, 2 ) )
+            texts = (name, f"{voxels:,}", f"{volume / 1000:.2f}", size)
+
+            for column, text in enumerate( texts ):
+                item = QTableWidgetItem( text )
+                if column > 0: item.setTextAlignment( Qt.AlignRight | Qt.AlignVCenter )
+                self.tableStatistics.setItem( row, column, item )
+
+    ############################################################################
+
     def _createLayout( self ):
         """
         Creates the actual layout.
         """
+        self.progressBarLoading = QProgressBar( self )
+        self.progressBarLoading.setRange( 0, 100 )
+        self.pushButtonCancelLoading = QPushButton( "Cancel", self )
+
+        self._groupBoxLoading = QGroupBox( "Loading", self )
+        self._groupBoxLoading.setFlat( True )
+        self._groupBoxLoading.setVisible( False )
+
         self._labelInteractionStyle = QLabel( "Interaction style", self )
         self.comboBoxInteractionStyle = QComboBox( self )
         self.comboBoxInteractionStyle.addItem( "Opacity" )
         self.comboBoxInteractionStyle.addItem( "Interactive" )
         self.comboBoxInteractionStyle.addItem( "Automatic" )
+        self.comboBoxInteractionStyle.addItem( "Volume" )
 
         self._labelActiveContour = QLabel( "Active contour", self )
         self.comboBoxActiveContour = QComboBox( self )
@@ -75,6 +137,45 @@ class BasicWidget( QWidget ):
         self.sliderOpacity = QSlider( Qt.Horizontal, self )
         self.sliderOpacity.setRange( 0, 99 )
 
+        self._labelEditContour = QLabel( "Contour", self )
+        self.comboBoxEditContour = QComboBox( self )
+
+        self._labelContourValue = QLabel( "Value", self )
+        self.sliderContourValue = QSlider( Qt.Horizontal, self )
+        self.spinBoxContourValue = QSpinBox( self )
+
+        self._labelGaussianRadius = QLabel( "Gaussian radius", self )
+        self.spinBoxGaussianRadius = QSpinBox( self )
+        self.spinBoxGaussianRadius.setRange( 0, 10 )
+
+        self._labelGaussianStdDev = QLabel( "Gaussian std. dev.", self )
+        self.spinBoxGaussianStdDev = QDoubleSpinBox( self )
+        self.spinBoxGaussianStdDev.setRange( 0.0, 10.0 )
+        self.spinBoxGaussianStdDev.setDecimals( 2 )
+        self.spinBoxGaussianStdDev.setSingleStep( 0.1 )
+
+        self._labelSincIterations = QLabel( "Smoothing iterations", self )
+        self.spinBoxSincIterations = QSpinBox( self )
+        self.spinBoxSincIterations.setRange( 0, 500 )
+
+        self._labelSincPassBand = QLabel( "Pass band", self )
+        self.spinBoxSincPassBand = QDoubleSpinBox( self )
+        self.spinBoxSincPassBand.setRange( 0.001, 2.0 )
+        self.spinBoxSincPassBand.setDecimals( 3 )
+        self.spinBoxSincPassBand.setSingleStep( 0.01 )
+
+        self._labelFeatureAngle = QLabel( "Feature angle", self )
+        self.spinBoxFeatureAngle = QDoubleSpinBox( self )
+        self.spinBoxFeatureAngle.setRange( 0.0, 180.0 )
+        self.spinBoxFeatureAngle.setDecimals( 1 )
+
+        self._groupBoxContour = QGroupBox( "Contour editing", self )
+        self._groupBoxContour.setFlat( True )
+
+        # Keep the contour value slider and spinbox in sync.
+        self.sliderContourValue.valueChanged.connect( self.spinBoxContourValue.setValue )
+        self.spinBoxContourValue.valueChanged.connect( self.sliderContourValue.setValue )
+
         self.sliderGroupCoronal = SliderGroup( "CoronalCut", self )
         self.sliderGroupCoronal.setText( "Coronal cut" )
 
@@ -84,26 +185,108 @@ class BasicWidget( QWidget ):
         self.sliderGroupTransverse = SliderGroup( "TransverseCut", self )
         self.sliderGroupTransverse.setText( "Transverse cut" )
 
+        self.checkBoxObliqueCut = QCheckBox( "Oblique cut", self )
+
+        self._labelSlabMode = QLabel( "Slab projection", self )
+        self.comboBoxSlabMode = QComboBox( self )
+        self.comboBoxSlabMode.addItem( "None" )
+        self.comboBoxSlabMode.addItem( "Maximum" )
+        self.comboBoxSlabMode.addItem( "Minimum" )
+        self.comboBoxSlabMode.addItem( "Average" )
+
+        self._labelSlabThickness = QLabel( "Slab thickness", self )
+        self.spinBoxSlabThickness = QSpinBox( self )
+        self.spinBoxSlabThickness.setRange( 1, 100 )
+        self.spinBoxSlabThickness.setSuffix( " slices" )
+
         self._groupBoxSliders = QGroupBox( "Volumetric cuts", self )
         self._groupBoxSliders.setFlat( True )
 
+        self.sliderTimePoint = QSlider( Qt.Horizontal, self )
+        self.pushButtonPlay = QPushButton( "Play", self )
+        self.pushButtonPlay.setCheckable( True )
+
+        self._groupBoxTimeSeries = QGroupBox( "Time series", self )
+        self._groupBoxTimeSeries.setFlat( True )
+        self._groupBoxTimeSeries.setVisible( False )
+
+        self._labelStatistics = QLabel( "Measuring...", self )
+        self.tableStatistics = QTableWidget( 0, 4, self )
+        self.tableStatistics.setHorizontalHeaderLabels( ["Tissue", "Voxels", "Volume (ml)", "Size (mm)"] )
+        self.tableStatistics.horizontalHeader().setSectionResizeMode( QHeaderView.ResizeToContents )
+        self.tableStatistics.verticalHeader().setVisible( False )
+        self.tableStatistics.setEditTriggers( QAbstractItemView.NoEditTriggers )
+
+        self._groupBoxStatistics = QGroupBox( "Tissue statistics", self )
+        self._groupBoxStatistics.setFlat( True )
+
         self._spacerItem = QSpacerItem( 20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding )
 
         groupBoxSlidersLayout = QVBoxLayout()
         groupBoxSlidersLayout.addWidget( self.sliderGroupCoronal )
         groupBoxSlidersLayout.addWidget( self.sliderGroupSagittal )
         groupBoxSlidersLayout.addWidget( self.sliderGroupTransverse )
+        groupBoxSlidersLayout.addWidget( self.checkBoxObliqueCut )
+
+        slabLayout = QGridLayout()
+        slabLayout.addWidget( self._labelSlabMode, 0, 0, 1, 1 )
+        slabLayout.addWidget( self.comboBoxSlabMode, 0, 1, 1, 1 )
+        slabLayout.addWidget( self._labelSlabThickness, 1, 0, 1, 1 )
+        slabLayout.addWidget( self.spinBoxSlabThickness, 1, 1, 1, 1 )
+
+        groupBoxSlidersLayout.addLayout( slabLayout )
 
         self._groupBoxSliders.setLayout( groupBoxSlidersLayout )
 
+        groupBoxContourLayout = QGridLayout()
+        groupBoxContourLayout.addWidget( self._labelEditContour, 0, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.comboBoxEditContour, 0, 1, 1, 1 )
+        groupBoxContourLayout.addWidget( self._labelContourValue, 1, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.spinBoxContourValue, 1, 1, 1, 1 )
+        groupBoxContourLayout.addWidget( self.sliderContourValue, 2, 0, 1, 2 )
+        groupBoxContourLayout.addWidget( self._labelGaussianRadius, 3, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.spinBoxGaussianRadius, 3, 1, 1, 1 )
+        groupBoxContourLayout.addWidget( self._labelGaussianStdDev, 4, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.spinBoxGaussianStdDev, 4, 1, 1, 1 )
+        groupBoxContourLayout.addWidget( self._labelSincIterations, 5, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.spinBoxSincIterations, 5, 1, 1, 1 )
+        groupBoxContourLayout.addWidget( self._labelSincPassBand, 6, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.spinBoxSincPassBand, 6, 1, 1, 1 )
+        groupBoxContourLayout.addWidget( self._labelFeatureAngle, 7, 0, 1, 1 )
+        groupBoxContourLayout.addWidget( self.spinBoxFeatureAngle, 7, 1, 1, 1 )
+
+        self._groupBoxContour.setLayout( groupBoxContourLayout )
+
+        groupBoxLoadingLayout = QGridLayout()
+        groupBoxLoadingLayout.addWidget( self.progressBarLoading, 0, 0, 1, 1 )
+        groupBoxLoadingLayout.addWidget( self.pushButtonCancelLoading, 0, 1, 1, 1 )
+
+        self._groupBoxLoading.setLayout( groupBoxLoadingLayout )
+
+        groupBoxTimeSeriesLayout = QGridLayout()
+        groupBoxTimeSeriesLayout.addWidget( self.sliderTimePoint, 0, 0, 1, 1 )
+        groupBoxTimeSeriesLayout.addWidget( self.pushButtonPlay, 0, 1, 1, 1 )
+
+        self._groupBoxTimeSeries.setLayout( groupBoxTimeSeriesLayout )
+
+        groupBoxStatisticsLayout = QVBoxLayout()
+        groupBoxStatisticsLayout.addWidget( self._labelStatistics )
+        groupBoxStatisticsLayout.addWidget( self.tableStatistics )
+
+        self._groupBoxStatistics.setLayout( groupBoxStatisticsLayout )
+
         verticalLayout = QVBoxLayout()
+        verticalLayout.addWidget( self._groupBoxLoading )
         verticalLayout.addWidget( self._labelInteractionStyle )
         verticalLayout.addWidget( self.comboBoxInteractionStyle )
         verticalLayout.addWidget( self._labelActiveContour )
         verticalLayout.addWidget( self.comboBoxActiveContour )
         verticalLayout.addWidget( self._labelOpacity )
         verticalLayout.addWidget( self.sliderOpacity )
+        verticalLayout.addWidget( self._groupBoxContour )
         verticalLayout.addWidget( self._groupBoxSliders )
+        verticalLayout.addWidget( self._groupBoxTimeSeries )
+        verticalLayout.addWidget( self._groupBoxStatistics )
         verticalLayout.addItem( self._spacerItem )
         self.setLayout( verticalLayout )
 
@@ -0,0 +1,68 @@
+"""
+File name:  Memory.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Functions that measure the memory taken by the data of a scene
+            (volumes, meshes and the outputs of its pipelines), counting the
+            data shared by shallow copies once.
+"""
+
+################################################################################
+################################################################################
+
+from vtk import vtkAlgorithm, vtkDataSet, vtkPolyData
+
+from Neuroviz.Readers import VolumeReader
+
+################################################################################
+################################################################################
+
+def measureMemory( *objects ):
+    """
+    Get the number of bytes taken by the given data objects and by the
+    outputs of the given algorithms and readers (see Neuroviz.Readers), which
+    may be nested in lists, tuples and dictionaries (values). Data objects
+    share their arrays with their shallow copies, so every array is counted
+    once.
+    """
+    arrays = {}
+    for x in objects: _collectArrays( x, arrays )
+
+    return 1024 * sum( array.GetActualMemorySize() for array in arrays.values() )
+
+################################################################################
+
+def _collectArrays( x, arrays ):
+    """
+    Collect the arrays (points, cells and attributes) of a data object, or of
+    the outputs of an algorithm or reader, keyed by their address.
+    """
+    if x is None: return
+    if isinstance( x, dict ): x = list( x.values() )
+
+    if isinstance( x, (list, tuple) ):
+        for y in x: _collectArrays( y, arrays )
+        return
+
+    if isinstance( x, VolumeReader ): x = x.GetOutputDataObject( 0 )
+
+    if isinstance( x, vtkAlgorithm ):
+        for port in range( x.GetNumberOfOutputPorts() ): _collectArrays( x.GetOutputDataObject( port ), arrays )
+        return
+
+    if not isinstance( x, vtkDataSet ): return
+
+    found = [x.GetPointData().GetAbstractArray( i ) for i in range( x.GetPointData().GetNumberOfArrays() )]
+    found += [x.GetCellData().GetAbstractArray( i ) for i in range( x.GetCellData().GetNumberOfArrays() )]
+
+    if isinstance( x, vtkPolyData ):
+        if x.GetPoints() is not None: found.append( x.GetPoints().GetData() )
+        found += [x.GetVerts(), x.GetLines(), x.GetPolys(), x.GetStrips()]
+
+    for array in found:
+        if array is not None: arrays[array.__this__] = array
+
+################################################################################
+################################################################################
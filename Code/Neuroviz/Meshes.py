@@ -0,0 +1,274 @@
+"""
+File name:  Meshes.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Functions that operate on triangle meshes (vtkPolyData) as numpy
+            arrays, for the mesh operations that are not (efficiently)
+            available as VTK filters. The sparse smoothing engine requires
+            scipy, which is optional.
+"""
+
+################################################################################
+################################################################################
+
+from logging import getLogger
+
+import numpy as np
+
+from vtk import vtkCellArray, vtkPoints, vtkPolyData, vtkTriangleFilter
+from vtk.util.numpy_support import (numpy_to_vtk, numpy_to_vtkIdTypeArray,
+                                    vtk_to_numpy)
+
+try:
+    from scipy.sparse import csr_matrix
+except ImportError:
+    csr_matrix = None
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+def polyDataToArrays( polyData ):
+    """
+    Get the points (N x 3) and triangles (M x 3) of a mesh as numpy arrays.
+    Other polygons and triangle strips are triangulated first (which copies
+    the mesh), vertices and lines are ignored.
+    """
+    polys = polyData.GetPolys()
+
+    # Every cell of a triangle mesh takes three ids of the connectivity.
+    if np.any( np.diff( vtk_to_numpy( polys.GetOffsetsArray() ) ) != 3 ) or polyData.GetNumberOfStrips():
+        triangleFilter = vtkTriangleFilter()
+        triangleFilter.SetInputData( polyData )
+        triangleFilter.PassVertsOff()
+        triangleFilter.PassLinesOff()
+        triangleFilter.Update()
+
+        polyData = triangleFilter.GetOutput()
+        polys = polyData.GetPolys()
+
+    points = vtk_to_numpy( polyData.GetPoints().GetData() ) if polyData.GetPoints() else np.empty( (0, 3) )
+    triangles = vtk_to_numpy( polys.GetConnectivityArray() ).reshape( -1, 3 )
+
+    return points, triangles
+
+################################################################################
+
+def arraysToPolyData( points, triangles ):
+    """
+    Create a triangle mesh from the points (N x 3) and triangles (M x 3). The
+    arrays are copied.
+    """
+    vtkPts = vtkPoints()
+    vtkPts.SetData( numpy_to_vtk( np.ascontiguousarray( points ), deep = 1 ) )
+
+    offsets = np.arange( 0, 3 * len( triangles ) + 1, 3, dtype = np.int64 )
+    connectivity = np.ascontiguousarray( triangles, dtype = np.int64 ).ravel()
+
+    polys = vtkCellArray()
+    polys.SetData( numpy_to_vtkIdTypeArray( offsets, deep = 1 ), numpy_to_vtkIdTypeArray( connectivity, deep = 1 ) )
+
+    polyData = vtkPolyData()
+    polyData.SetPoints( vtkPts )
+    polyData.SetPolys( polys )
+
+    return polyData
+
+################################################################################
+
+def compactMesh( points, triangles ):
+    """
+    Remove the points that are not used by any of the triangles and renumber
+    the triangles accordingly.
+    """
+    used, inverse = np.unique( triangles, return_inverse = True )
+
+    return points[used], inverse.reshape( -1, 3 )
+
+################################################################################
+
+def weldMeshes( meshes ):
+    """
+    Merge meshes, given as a list of points (N x 3) and triangles (M x 3),
+    into a single mesh, welding the points that coincide exactly (e.g. at the
+    seams of pieces of a surface that were extracted separately). Returns the
+    points and triangles.
+    """
+    if not meshes: return np.empty( (0, 3), dtype = np.float32 ), np.empty( (0, 3), dtype = np.int64 )
+
+    offsets = np.cumsum( [0] + [len( points ) for points, _ in meshes[:-1]] )
+    points = np.concatenate( [points for points, _ in meshes] )
+    triangles = np.concatenate( [triangles + offset for (_, triangles), offset in zip( meshes, offsets )] )
+
+    points, inverse = np.unique( points, axis = 0, return_inverse = True )
+
+    return points, inverse.reshape( -1 )[triangles]
+
+################################################################################
+
+def reorderMesh( points, triangles ):
+    """
+    Reorder a mesh for the vertex cache of the GPU. The triangles are sorted
+    along a Morton (Z-order) curve through their centroids, such that
+    consecutive triangles lie close together and share most of their points.
+    The points are renumbered in the order in which the triangles first use
+    them, such that they are fetched in order as well. Points that are not
+    used by any of the triangles are removed. Returns the points and
+    triangles.
+    """
+    if len( triangles ) == 0: return compactMesh( points, triangles )
+
+    # Quantize the centroids to 21 bits per axis, which fills a 63-bit code.
+    centroids = points[triangles].mean( axis = 1 )
+    low, high = centroids.min( axis = 0 ), centroids.max( axis = 0 )
+    cells = ((centroids - low) / np.maximum( high - low, 1e-12 ) * (2 ** 21 - 1)).astype( np.uint64 )
+
+    codes = _spreadBits( cells[:, 0] ) | (_spreadBits( cells[:, 1] ) << np.uint64( 1 )) \
+            | (_spreadBits( cells[:, 2] ) << np.uint64( 2 ))
+    triangles = triangles[np.argsort( codes, kind = "stable" )]
+
+    used, first = np.unique( triangles.ravel(), return_index = True )
+    used = used[np.argsort( first )]
+
+    renumbering = np.empty( len( points ), dtype = np.int64 )
+    renumbering[used] = np.arange( len( used ) )
+
+    return points[used], renumbering[triangles]
+
+################################################################################
+
+def splitByLabel( polyData, labels ):
+    """
+    Split a multi-label mesh into a mesh per label. The label of each triangle
+    is taken from the point scalars, which are equal for all points of a
+    triangle (e.g. the output of discrete flying edges). Returns a list with a
+    mesh for each of the given labels.
+    """
+    points, triangles = polyDataToArrays( polyData )
+    pointLabels = vtk_to_numpy( polyData.GetPointData().GetScalars() )
+    triangleLabels = pointLabels[triangles[:, 0]]
+
+    meshes = []
+
+    for label in labels:
+        selected = triangles[triangleLabels == label]
+        meshes.append( arraysToPolyData( *compactMesh( points, selected ) ) )
+
+    return meshes
+
+################################################################################
+
+def hasSparseSmoothing():
+    """
+    Check whether the sparse smoothing engine (see smoothMesh) is available,
+    i.e. whether scipy is installed.
+    """
+    return csr_matrix is not None
+
+################################################################################
+
+def smoothMesh( points, triangles, iters, passBand, normalize = True ):
+    """
+    Smooth a triangle mesh using the windowed sinc filter of Taubin et al.,
+    which is what vtkWindowedSincPolyDataFilter does (without feature edge
+    smoothing). The filter is a Chebyshev polynomial of the given degree
+    (iterations) in the umbrella operator of the mesh, which is built once as
+    a sparse matrix (see _smoothingMatrix), such that every iteration is a
+    single sparse matrix-vector product on float32 coordinates. The points at
+    the boundary of the mesh stay in place exactly. Normalizing the
+    coordinates improves the numerical stability. Returns the smoothed points.
+    """
+    if len( points ) == 0 or len( triangles ) == 0 or iters <= 0: return points
+
+    matrix, fixed = _smoothingMatrix( len( points ), triangles )
+    coefficients = _sincCoefficients( iters, passBand )
+
+    center, scale = (points.mean( axis = 0 ), np.abs( points - points.mean( axis = 0 ) ).max()) if normalize else (0.0, 1.0)
+    x0 = ((points - center) / max( scale, 1e-12 )).astype( np.float32 )
+
+    # The Chebyshev recurrence x_{j+1} = 2 M x_j - x_{j-1}.
+    x1 = matrix @ x0
+    result = coefficients[0] * x0 + coefficients[1] * x1
+
+    for c in coefficients[2:]:
+        x0, x1 = x1, 2.0 * (matrix @ x1) - x0
+        result += c * x1
+
+    result = (result * scale + center).astype( points.dtype )
+    result[fixed] = points[fixed]
+
+    return result
+
+################################################################################
+
+def _smoothingMatrix( n, triangles ):
+    """
+    Build the sparse (n x n, float32) matrix M = I - K / 2 of a triangle mesh
+    with n points, K being its umbrella operator (the difference between a
+    point and the mean of its neighbours). Its rows of the points at the
+    boundary of the mesh (on an edge of a single triangle) and of the points
+    without neighbours are those of the identity, such that they stay in
+    place. Returns the matrix and the mask of those (fixed) points.
+    """
+    edges = np.concatenate( [triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]] ).astype( np.int64 )
+    edges.sort( axis = 1 )
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    keys, counts = np.unique( edges[:, 0] * n + edges[:, 1], return_counts = True )
+    first, second = keys // n, keys % n
+
+    rows, cols = np.concatenate( [first, second] ), np.concatenate( [second, first] )
+    degrees = np.bincount( rows, minlength = n )
+
+    fixed = degrees == 0
+    fixed[first[counts == 1]] = fixed[second[counts == 1]] = True
+
+    moving = ~fixed[rows]
+    rows, cols = rows[moving], cols[moving]
+    diagonal = np.where( fixed, 1.0, 0.5 )
+
+    data = np.concatenate( [0.5 / degrees[rows], diagonal] ).astype( np.float32 )
+    indices = (np.concatenate( [rows, np.arange( n )] ), np.concatenate( [cols, np.arange( n )] ))
+
+    return csr_matrix( (data, indices), shape = (n, n) ), fixed
+
+################################################################################
+
+def _sincCoefficients( iters, passBand ):
+    """
+    Get the coefficients of the Chebyshev polynomials of the windowed sinc
+    filter of the given degree (iterations) and pass band (0 to 2, lower
+    values smooth more). The ideal low-pass filter is windowed by a Nuttall
+    window, with its cut-off moved up by the transition band of the window
+    such that the pass band is kept, and normalized to keep the mean of the
+    points in place (as vtkWindowedSincPolyDataFilter does).
+    """
+    j = np.arange( iters + 1 )
+    theta = min( np.arccos( 1.0 - 0.5 * passBand ) + 3.1 * np.pi / (iters + 1), np.pi )
+
+    sinc = np.where( j == 0, theta / np.pi, 2.0 * np.sin( j * theta ) / (np.maximum( j, 1 ) * np.pi) )
+    angles = j * np.pi / (iters + 1)
+    window = 0.355768 + 0.487396 * np.cos( angles ) + 0.144232 * np.cos( 2 * angles ) + 0.012604 * np.cos( 3 * angles )
+
+    coefficients = sinc * window
+
+    return coefficients / coefficients.sum()
+
+################################################################################
+
+def _spreadBits( x ):
+    """
+    Spread the lowest 21 bits of the given (uint64) integers over every third
+    bit, which interleaves three of them into a Morton code.
+    """
+    for shift, mask in ((32, 0x1F00000000FFFF), (16, 0x1F0000FF0000FF), (8, 0x100F00F00F00F00F),
+                        (4, 0x10C30C30C30C30C3), (2, 0x1249249249249249)):
+        x = (x | (x << np.uint64( shift ))) & np.uint64( mask )
+
+    return x
+
+################################################################################
+################################################################################
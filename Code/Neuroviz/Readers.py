@@ -0,0 +1,884 @@
+"""
+File name:  Readers.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Classes that read volumetric data into vtkImageData. Uncompressed
+            MetaImage (MHD/RAW) and NIfTI files are memory-mapped, so opening
+            a volume only reads its header and the voxels are paged in when
+            they are used. Stacks of PNG slices are decoded in parallel. The
+            readers can be connected to a VTK pipeline like any VTK reader.
+            Time series (4D) are read as a volume per time point. Legacy VTK
+            files are converted into a memory-mapped side-car file once.
+"""
+
+################################################################################
+################################################################################
+
+import gzip
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from glob import escape, glob
+from logging import getLogger
+from os import cpu_count, remove, replace, stat
+from os.path import basename, dirname, exists, getsize, isdir, join, splitext
+from tempfile import mkstemp
+
+import numpy as np
+
+from vtk import (vtkGenericDataObjectReader, vtkImageData, vtkPNGReader,
+                 vtkTrivialProducer)
+from vtk.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+def createReader( fileName, spacing = None, update = True, compress = False ):
+    """
+    Create a reader for the given file (or directory of PNG slices), based on
+    its extension. Returns None if the file can not be read. The spacing is
+    only used for PNG slices, as they do not contain it. Without update, the
+    volume is only read by the first call to Update (e.g. on a worker thread)
+    and read errors are raised from there. The side-car files of legacy VTK
+    files are compressed if asked for (see LegacyVTKReader).
+    """
+    name = fileName.lower()
+
+    try:
+        if isdir( fileName ):
+            reader = PNGStackReader( fileName, spacing )
+        elif name.endswith( (".mhd", ".mha") ):
+            reader = MetaImageReader( fileName )
+        elif name.endswith( (".nii", ".nii.gz", ".hdr") ):
+            reader = NIfTIReader( fileName )
+        elif name.endswith( ".vtk" ):
+            reader = LegacyVTKReader( fileName, compress )
+        else:
+            return None
+
+        if update: reader.Update()
+
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning( f"Unable to read {fileName}: {e}" )
+        return None
+
+    return reader
+
+################################################################################
+
+def arrayToImage( array, spacing = (1.0, 1.0, 1.0), origin = (0.0, 0.0, 0.0) ):
+    """
+    Wrap a (z, y, x) or (z, y, x, components) numpy array into vtkImageData,
+    without copying it if it is contiguous and in native byte order. The array
+    must be kept alive as long as the image is used.
+    """
+    array = np.ascontiguousarray( array )
+    if not array.dtype.isnative: array = array.astype( array.dtype.newbyteorder( "=" ) )
+
+    components = array.shape[3] if array.ndim == 4 else 1
+
+    image = vtkImageData()
+    image.SetDimensions( array.shape[2], array.shape[1], array.shape[0] )
+    image.SetSpacing( *spacing )
+    image.SetOrigin( *origin )
+    image.GetPointData().SetScalars( numpy_to_vtk( array.reshape( -1, components ), deep = 0 ) )
+
+    return image
+
+################################################################################
+
+def imageToArray( image ):
+    """
+    Get the voxels of vtkImageData as a (z, y, x) or (z, y, x, components)
+    numpy array, without copying them.
+    """
+    scalars = image.GetPointData().GetScalars()
+    components = scalars.GetNumberOfComponents()
+    shape = tuple( reversed( image.GetDimensions() ) )
+
+    if components > 1: shape += (components,)
+
+    return vtk_to_numpy( scalars ).reshape( shape )
+
+################################################################################
+
+def downsampleImage( image, maxVoxels ):
+    """
+    Create a strided copy of the image, keeping every n'th voxel along each
+    axis, with n the smallest stride that keeps at most the given number of
+    voxels. The spacing is stretched such that the copy covers the same
+    bounds as the image.
+    """
+    array = imageToArray( image )
+    shape = np.array( array.shape[:3] )
+
+    stride = 1
+    while np.prod( -(-shape // stride) ) > maxVoxels: stride += 1
+
+    copy = np.ascontiguousarray( array[::stride, ::stride, ::stride] )
+    extent = (shape - 1)[::-1] * np.array( image.GetSpacing() )
+    samples = np.array( copy.shape[:3] )[::-1] - 1
+    spacing = [e / s if s > 0 else 1.0 for e, s in zip( extent, samples )]
+
+    return arrayToImage( copy, spacing, image.GetOrigin() )
+
+################################################################################
+
+def findExtent( array, threshold, margin = 0, slabSize = 16 ):
+    """
+    Get the tight extent (x0, x1, y0, y1, z0, z1, in voxels) of the voxels of
+    a (z, y, x) array at or above the threshold, grown by a margin of voxels
+    and clipped to the array. The array is visited once, a slab of slices at
+    a time. Returns None if no voxel reaches the threshold.
+    """
+    shape = array.shape[:3]
+    slices, rows = [], np.zeros( shape[1:], dtype = bool )
+
+    for z in range( 0, shape[0], slabSize ):
+        mask = np.asarray( array[z:z + slabSize] ) >= threshold
+        projection = mask.any( axis = 0 )
+
+        if projection.any():
+            slices.extend( z + np.nonzero( mask.reshape( len( mask ), -1 ).any( axis = 1 ) )[0] )
+            rows |= projection
+
+    if not slices: return None
+
+    ys, xs = np.nonzero( rows.any( axis = 1 ) )[0], np.nonzero( rows.any( axis = 0 ) )[0]
+    first, last = (xs[0], ys[0], slices[0]), (xs[-1], ys[-1], slices[-1])
+
+    return tuple( int( x ) for f, l, n in zip( first, last, shape[::-1] )
+                  for x in (max( f - margin, 0 ), min( l + margin, n - 1 )) )
+
+################################################################################
+
+def cropImage( image, extent = None ):
+    """
+    Copy the part of the image within the given extent (x0, x1, y0, y1, z0,
+    z1, in voxels), clipped to the image (see cropArray). The copy starts at
+    index zero, with its origin moved such that it covers the same part of
+    space. The image itself is returned if there is no extent or it covers
+    the whole image.
+    """
+    array = imageToArray( image )
+    cropped, origin = cropArray( array, image.GetSpacing(), image.GetOrigin(), extent )
+
+    return image if cropped is array else arrayToImage( cropped, image.GetSpacing(), origin )
+
+################################################################################
+
+def cropArray( array, spacing, origin, extent = None ):
+    """
+    Get the part of the (z, y, x) array within the given extent (x0, x1, y0,
+    y1, z0, z1, in voxels), clipped to the array, as a view, along with the
+    origin that is moved such that the part covers the same part of space.
+    The array and origin themselves are returned if there is no extent or it
+    covers the whole array.
+    """
+    if extent is None: return array, origin
+
+    dimensions = array.shape[2::-1]
+    extent = [max( e, 0 ) if i % 2 == 0 else min( e, dimensions[i // 2] - 1 ) for i, e in enumerate( extent )]
+    if extent == [0, dimensions[0] - 1, 0, dimensions[1] - 1, 0, dimensions[2] - 1]: return array, origin
+
+    x0, x1, y0, y1, z0, z1 = extent
+
+    return array[z0:z1 + 1, y0:y1 + 1, x0:x1 + 1], [o + s * e for o, s, e in zip( origin, spacing, extent[::2] )]
+
+################################################################################
+
+def compactType( array, slabSize = 16 ):
+    """
+    Get the smallest data type that holds every value of the (z, y, x) array
+    exactly: the smallest integer type that covers the range of the values if
+    they are all integers (e.g. labels, even when stored as floating point),
+    float32 for other floating point values. The data type of the array is
+    kept if it is not larger. The array is visited a slab of slices at a time,
+    such that a memory-mapped volume is paged in a slab at a time as well.
+    """
+    dtype = array.dtype
+    if dtype.kind not in "iuf" or array.size == 0: return dtype
+
+    low, high, integral = np.inf, -np.inf, True
+
+    for z in range( 0, array.shape[0], slabSize ):
+        slab = np.asarray( array[z:z + slabSize] )
+        low, high = min( low, slab.min() ), max( high, slab.max() )
+
+        if integral and dtype.kind == "f": integral = bool( np.all( slab == np.floor( slab ) ) )
+
+    if integral:
+        for candidate in map( np.dtype, (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32) ):
+            if np.iinfo( candidate ).min <= low and high <= np.iinfo( candidate ).max:
+                return candidate if candidate.itemsize < dtype.itemsize else dtype
+
+    return np.dtype( np.float32 ) if dtype.kind == "f" and dtype.itemsize > 4 else dtype
+
+################################################################################
+
+def compactImage( image ):
+    """
+    Convert the voxels of a single component image to the smallest data type
+    that holds them exactly (see compactType), e.g. a label volume stored as
+    int16 or float64 to uint8. Returns the image itself if its data type is
+    compact already.
+    """
+    if image.GetNumberOfScalarComponents() != 1: return image
+
+    array = imageToArray( image )
+    dtype = compactType( array )
+    if dtype == array.dtype: return image
+
+    compacted = arrayToImage( array.astype( dtype ), image.GetSpacing(), image.GetOrigin() )
+    logger.info( f"Compacted volume from {array.dtype} ({array.nbytes / 2**20:.1f} MB) to {dtype} "
+                 f"({compacted.GetActualMemorySize() / 1024:.1f} MB)." )
+
+    return compacted
+
+################################################################################
+
+def writeMetaImage( fileName, array, spacing, origin, compress = False, blockSize = 2 ** 24 ):
+    """
+    Write a (z, y, x) or (z, y, x, components) numpy array into a single
+    MetaImage file (.mha), i.e. the header followed by the raw voxels, which
+    can be memory-mapped when read (see MetaImageReader). Compressed voxels
+    (zlib) are compressed a block of bytes at a time into a single stream.
+    The file is written under a unique temporary name in the same directory
+    first, such that it is never read while incomplete, even when several
+    processes write it at once.
+    """
+    types = {}
+    for name, dtype in MetaImageReader._types.items(): types.setdefault( np.dtype( dtype ), name )
+
+    array = np.ascontiguousarray( array )
+    if not array.dtype.isnative: array = array.astype( array.dtype.newbyteorder( "=" ) )
+
+    data = memoryview( array ).cast( "B" )
+
+    header = {"ObjectType": "Image", "NDims": 3, "BinaryData": True,
+              "BinaryDataByteOrderMSB": sys.byteorder == "big", "CompressedData": compress,
+              "DimSize": " ".join( str( x ) for x in array.shape[2::-1] ),
+              "ElementNumberOfChannels": array.shape[3] if array.ndim == 4 else 1,
+              "ElementSpacing": " ".join( str( x ) for x in spacing ),
+              "Offset": " ".join( str( x ) for x in origin ),
+              "ElementType": types[array.dtype],
+              "ElementDataFile": "LOCAL"}
+
+    descriptor, temporaryName = mkstemp( suffix = ".part", prefix = f".{basename( fileName )}.",
+                                         dir = dirname( fileName ) or "." )
+
+    try:
+        with open( descriptor, "wb" ) as f:
+            f.write( "".join( f"{key} = {value}\n" for key, value in header.items() ).encode( "latin-1" ) )
+
+            if compress:
+                compressor = zlib.compressobj( 1 )
+                for start in range( 0, len( data ), blockSize ): f.write( compressor.compress( data[start:start + blockSize] ) )
+                f.write( compressor.flush() )
+            else:
+                f.write( data )
+
+        replace( temporaryName, fileName )
+    except BaseException:
+        remove( temporaryName )
+        raise
+
+################################################################################
+################################################################################
+
+class VolumeReader:
+
+    """
+    Base class of the readers. Subclasses read the voxels as a (t, z, y, x)
+    numpy array of time points along with the spacing, origin and direction of
+    the volume (see _read). The first time point is exposed as the output of a
+    trivial producer, the others are wrapped when they are asked for.
+
+    The direction is not set on the image, as not all VTK filters respect it
+    (e.g. vtkContourFilter does not, vtkImageReslice does), which would
+    misalign the parts of a scene. Instead, the axes of the voxels are flipped
+    and permuted such that they run along the axes of the world (see
+    _reorient), unless the direction is oblique, in which case it is kept by
+    the reader (see GetDirection). The flipped and permuted voxels are a view
+    of the (memory-mapped) voxels, which VTK can not use as is, so they are
+    only copied when they are wrapped: the first time point once the output
+    is asked for, and only the part within the extent of a cropped time point
+    (see GetTimePoint).
+    """
+
+    ############################################################################
+
+    def __init__( self, fileName ):
+        """
+        Initialize the reader.
+        """
+        self._fileName = fileName
+        self._producer = vtkTrivialProducer()
+        self._series = None             # Keeps the (memory-mapped) voxels alive.
+        self._array = None              # The voxels of the first time point.
+        self._image = None              # The first time point, once it has been wrapped.
+        self._direction = np.eye( 3 )
+
+    ############################################################################
+
+    def Update( self ):
+        """
+        Read the volume, unless it has been read already. The voxels are not
+        wrapped into vtkImageData yet (see GetOutput).
+        """
+        if self._array is not None: return
+
+        self._series, self._spacing, self._origin, self._direction = self._reorient( *self._read() )
+        self._array = self._getTimePoint( 0 )
+
+        logger.info( f"Read {self._fileName}: {self._array.shape[::-1]} {self._array.dtype}, spacing {tuple( self._spacing )}"
+                     f", {len( self._series )} time point(s)." )
+
+    ############################################################################
+
+    def GetOutput( self ):
+        """
+        Get the volume as vtkImageData.
+        """
+        self._wrap()
+
+        return self._producer.GetOutputDataObject( 0 )
+
+    ############################################################################
+
+    def GetOutputPort( self ):
+        """
+        Get the output port, to connect the reader to a VTK pipeline.
+        """
+        self._wrap()
+
+        return self._producer.GetOutputPort()
+
+    ############################################################################
+
+    def GetOutputDataObject( self, port ):
+        """
+        Get the volume as vtkImageData without reading it, like a VTK algorithm
+        does (None if it has not been read).
+        """
+        return self._producer.GetOutputDataObject( port )
+
+    ############################################################################
+
+    def ReleaseData( self ):
+        """
+        Release the voxels, like a VTK algorithm releases its output data. The
+        volume is read again by the next call to Update, but not by a pipeline
+        it is connected to, so it is only released once it is no longer used.
+        """
+        if self._array is None: return
+
+        if self._image is not None: self._image.ReleaseData()
+        self._series = self._array = self._image = None
+
+    ############################################################################
+
+    def GetFileName( self ):
+        """
+        Get the name of the file that is read.
+        """
+        return self._fileName
+
+    ############################################################################
+
+    def GetArray( self ):
+        """
+        Get the voxels as a (z, y, x) numpy array, which is a view of the
+        (memory-mapped) voxels, without copying them.
+        """
+        self.Update()
+
+        return self._array
+
+    ############################################################################
+
+    def GetBounds( self ):
+        """
+        Get the bounds (x0, x1, y0, y1, z0, z1) of the volume, without
+        wrapping it.
+        """
+        self.Update()
+
+        sizes = np.array( self._array.shape[2::-1] ) - 1
+
+        return tuple( x for o, s, n in zip( self._origin, self._spacing, sizes ) for x in sorted( (o, o + s * n) ) )
+
+    ############################################################################
+
+    def GetNumberOfTimePoints( self ):
+        """
+        Get the number of time points (volumes) of a time series, which is 1
+        for a single volume.
+        """
+        self.Update()
+
+        return len( self._series )
+
+    ############################################################################
+
+    def GetTimePoint( self, index, extent = None ):
+        """
+        Get the volume of the given time point as new vtkImageData, such that
+        several time points can be used at once (e.g. on worker threads). Only
+        the part within the given extent is wrapped, if any (see cropArray),
+        such that only this part of a reoriented volume is copied.
+        """
+        self.Update()
+
+        array, origin = cropArray( self._getTimePoint( index ), self._spacing, self._origin, extent )
+
+        return arrayToImage( array, self._spacing, origin )
+
+    ############################################################################
+
+    def GetDirection( self ):
+        """
+        Get the direction (3 x 3, the columns are the directions of the x, y
+        and z axes) of the volume, which is the identity unless the direction
+        of the file is oblique (see _reorient).
+        """
+        self.Update()
+
+        return self._direction
+
+    ############################################################################
+
+    def _getTimePoint( self, index ):
+        """
+        Get the voxels of the given time point as a (z, y, x) numpy array.
+        """
+        return self._series[index]
+
+    ############################################################################
+
+    def _wrap( self ):
+        """
+        Read the volume and wrap its first time point into the output, unless
+        it has been wrapped already.
+        """
+        self.Update()
+        if self._image is not None: return
+
+        self._image = arrayToImage( self._array, self._spacing, self._origin )
+        self._producer.SetOutput( self._image )
+
+    ############################################################################
+
+    def _reorient( self, series, spacing, origin, direction ):
+        """
+        Flip and permute the axes of the (t, z, y, x) series such that they
+        run along the x, y and z axes of the world, i.e. such that the
+        direction becomes the identity, moving the origin to the voxel that
+        becomes the first one. The series becomes a view, which is copied a
+        time point (or the cropped part of it) at a time when it is wrapped
+        into vtkImageData (see arrayToImage), as VTK needs the voxels in order.
+        An oblique direction can not be undone this way, so it is kept as is.
+        """
+        rounded = np.round( direction )
+        axes = np.argmax( np.abs( rounded ), axis = 0 )     # The world axis of each voxel axis.
+
+        if np.allclose( direction, np.eye( 3 ) ): return series, spacing, origin, direction
+
+        if not np.allclose( direction, rounded, atol = 1e-3 ) or sorted( axes ) != [0, 1, 2] \
+           or np.any( np.abs( rounded ).sum( axis = 0 ) != 1 ):
+            logger.warning( f"Ignoring the oblique direction of {self._fileName}: {direction.tolist()}" )
+            return series, spacing, origin, direction
+
+        signs = rounded[axes, range( 3 )]
+        sizes = np.array( series.shape[3:0:-1] )
+        first = np.where( signs < 0, sizes - 1, 0 )
+        origin = np.array( origin, dtype = np.float64 ) + direction @ (np.array( spacing ) * first)
+
+        # The numpy axes of the voxel axes x, y and z are 3, 2 and 1.
+        index = tuple( slice( None, None, -1 ) if 0 < i < 4 and signs[3 - i] < 0 else slice( None )
+                       for i in range( series.ndim ) )
+        source = np.argsort( axes )                         # The voxel axis along each world axis.
+        order = (0, *(3 - source[::-1]), *range( 4, series.ndim ))
+
+        logger.info( f"Reoriented {self._fileName} from direction {direction.tolist()}." )
+
+        return (series[index].transpose( order ), [spacing[a] for a in source], origin.tolist(), np.eye( 3 ))
+
+################################################################################
+################################################################################
+
+class MetaImageReader( VolumeReader ):
+
+    """
+    Reads MetaImage files, either a header (.mhd) with a separate data file or
+    a single file (.mha). Uncompressed data is memory-mapped. The fourth
+    dimension of a 4D file is time.
+    """
+
+    ############################################################################
+
+    _types = {"MET_CHAR": np.int8, "MET_UCHAR": np.uint8,
+              "MET_SHORT": np.int16, "MET_USHORT": np.uint16,
+              "MET_INT": np.int32, "MET_UINT": np.uint32,
+              "MET_LONG": np.int32, "MET_ULONG": np.uint32,
+              "MET_LONG_LONG": np.int64, "MET_ULONG_LONG": np.uint64,
+              "MET_FLOAT": np.float32, "MET_DOUBLE": np.float64}
+
+    ############################################################################
+
+    def _read( self ):
+        """
+        Read the voxels (of each time point), spacing, origin and direction of
+        the volume.
+        """
+        header, headerSize = self._readHeader()
+
+        if int( header.get( "NDims", 3 ) ) > 4:
+            raise ValueError( f"NDims = {header['NDims']} is not supported" )
+
+        dims = [int( x ) for x in header["DimSize"].split()] + [1, 1]
+        components = int( header.get( "ElementNumberOfChannels", 1 ) )
+        byteOrder = ">" if header.get( "BinaryDataByteOrderMSB", "False" ).lower() == "true" else "<"
+        dtype = np.dtype( self._types[header["ElementType"]] ).newbyteorder( byteOrder )
+
+        shape = (dims[3], dims[2], dims[1], dims[0]) + ((components,) if components > 1 else ())
+        count = int( np.prod( shape ) )
+
+        floats = lambda *keys, default : [float( x ) for x in next( (header[k] for k in keys if k in header), default ).split()]
+        spacing = floats( "ElementSpacing", "ElementSize", default = "1 1 1" ) + [1.0]
+        origin = floats( "Offset", "Position", "Origin", default = "0 0 0" ) + [0.0]
+        matrix = floats( "TransformMatrix", "Rotation", "Orientation", default = "1 0 0 0 1 0 0 0 1" )
+
+        # The rows of the transform matrix are the directions of the axes (of
+        # which time is left out in 4D).
+        if len( matrix ) == 16: matrix = np.array( matrix ).reshape( 4, 4 )[:3, :3].ravel()
+        direction = np.array( matrix ).reshape( 3, 3 ).T if len( matrix ) == 9 else np.eye( 3 )
+
+        dataFile = header["ElementDataFile"]
+        if dataFile == "LOCAL":
+            dataFile, offset = self._fileName, headerSize
+        else:
+            dataFile, offset = join( dirname( self._fileName ), dataFile ), int( header.get( "HeaderSize", 0 ) )
+
+        if header.get( "CompressedData", "False" ).lower() == "true":
+            with open( dataFile, "rb" ) as f:
+                f.seek( offset )
+                data = bytearray( zlib.decompress( f.read() ) )
+            series = np.frombuffer( data, dtype, count ).reshape( shape )
+        else:
+            # A header size of -1 means the data is at the end of the file.
+            if offset == -1: offset = getsize( dataFile ) - count * dtype.itemsize
+            series = np.memmap( dataFile, dtype, "c", offset, shape )
+
+        return series, spacing[:3], origin[:3], direction
+
+    ############################################################################
+
+    def _readHeader( self ):
+        """
+        Read the "Key = Value" lines of the header up to the data file, which
+        is the last one. Returns the header and its size in bytes.
+        """
+        header = {}
+
+        with open( self._fileName, "rb" ) as f:
+            for line in iter( f.readline, b"" ):
+                key, _, value = line.decode( "latin-1" ).partition( "=" )
+                header[key.strip()] = value.strip()
+
+                if key.strip() == "ElementDataFile": return header, f.tell()
+
+        raise ValueError( "ElementDataFile is missing" )
+
+################################################################################
+################################################################################
+
+class NIfTIReader( VolumeReader ):
+
+    """
+    Reads NIfTI-1 files, either a single file (.nii) or a header (.hdr, which
+    is the file that is read) with a separate data file (.img). Uncompressed
+    data is memory-mapped, gzipped files (.nii.gz) are decompressed. The fifth
+    dimension (if any) is time.
+    """
+
+    ############################################################################
+
+    _types = {2: np.uint8, 4: np.int16, 8: np.int32, 16: np.float32,
+              64: np.float64, 256: np.int8, 512: np.uint16, 768: np.uint32,
+              1024: np.int64, 1280: np.uint64}
+
+    ############################################################################
+
+    def _read( self ):
+        """
+        Read the voxels (of each time point), spacing, origin and direction of
+        the volume.
+        """
+        isCompressed = self._fileName.lower().endswith( ".gz" )
+
+        with (gzip.open if isCompressed else open)( self._fileName, "rb" ) as f:
+            header = f.read( 348 )
+
+        # The header size is stored first and tells the byte order.
+        if np.frombuffer( header, "<i4", 1 )[0] == 348: byteOrder = "<"
+        elif np.frombuffer( header, ">i4", 1 )[0] == 348: byteOrder = ">"
+        else: raise ValueError( "Not a NIfTI-1 file" )
+
+        field = lambda type, count, offset : np.frombuffer( header, byteOrder + type, count, offset )
+
+        dim = field( "i2", 8, 40 )
+        dtype = np.dtype( self._types[int( field( "i2", 1, 70 )[0] )] ).newbyteorder( byteOrder )
+        pixdim = field( "f4", 8, 76 )
+        offset = int( field( "f4", 1, 108 )[0] )
+        slope, intercept = field( "f4", 2, 112 )
+        qformCode, sformCode = field( "i2", 2, 252 )
+        quatern = field( "f4", 6, 256 )
+        srow = field( "f4", 12, 280 ).reshape( 3, 4 ).astype( np.float64 )
+
+        dataFile = self._fileName
+        if header[344:347] == b"ni1":
+            dataFile, offset = splitext( self._fileName )[0] + ".img", 0
+
+        nx, ny, nz, nt = (max( int( d ), 1 ) for d in dim[1:5])
+        shape = (nt, nz, ny, nx)
+        spacing = [abs( float( x ) ) or 1.0 for x in pixdim[1:4]]
+
+        # Prefer the (general) sform over the (rigid) qform transformation.
+        if sformCode > 0:
+            direction = srow[:, :3] / spacing
+            origin = srow[:, 3]
+        elif qformCode > 0:
+            direction = self._quaternionToMatrix( *quatern[:3] )
+            if pixdim[0] < 0: direction[:, 2] *= -1
+            origin = quatern[3:].astype( np.float64 )
+        else:
+            direction, origin = np.eye( 3 ), np.zeros( 3 )
+
+        if isCompressed:
+            with gzip.open( dataFile, "rb" ) as f:
+                data = bytearray( f.read() )
+            series = np.frombuffer( data, dtype, int( np.prod( shape ) ), offset ).reshape( shape )
+        else:
+            series = np.memmap( dataFile, dtype, "c", offset, shape )
+
+        self._scaling = (slope, intercept) if slope not in (0.0, 1.0) or intercept != 0.0 else None
+
+        return series, spacing, list( origin ), direction
+
+    ############################################################################
+
+    def _getTimePoint( self, index ):
+        """
+        Get the voxels of the given time point as a (z, y, x) numpy array,
+        scaled by the slope and intercept of the header.
+        """
+        array = self._series[index]
+
+        # Scaling the values needs a copy of the data.
+        if self._scaling is not None:
+            logger.info( f"Scaling {self._fileName} by {self._scaling[0]} and {self._scaling[1]}." )
+            array = (array * self._scaling[0] + self._scaling[1]).astype( np.float32 )
+
+        return array
+
+    ############################################################################
+
+    @staticmethod
+    def _quaternionToMatrix( b, c, d ):
+        """
+        Get the rotation matrix of a NIfTI quaternion (of which a is derived).
+        """
+        a = np.sqrt( max( 0.0, 1.0 - (b * b + c * c + d * d) ) )
+
+        return np.array( [[a * a + b * b - c * c - d * d, 2 * (b * c - a * d), 2 * (b * d + a * c)],
+                          [2 * (b * c + a * d), a * a + c * c - b * b - d * d, 2 * (c * d - a * b)],
+                          [2 * (b * d - a * c), 2 * (c * d + a * b), a * a + d * d - c * c - b * b]] )
+
+################################################################################
+################################################################################
+
+class PNGStackReader( VolumeReader ):
+
+    """
+    Reads a directory of PNG slices (in the order of their names). The slices
+    are decoded in parallel by a pool of threads, straight into the volume.
+    PNG files do not contain the spacing, so it has to be given.
+    """
+
+    ############################################################################
+
+    def __init__( self, fileName, spacing = None ):
+        """
+        Initialize the reader.
+        """
+        super().__init__( fileName )
+
+        self._spacing = spacing if spacing is not None else (1.0, 1.0, 1.0)
+
+    ############################################################################
+
+    def _read( self ):
+        """
+        Read the voxels (of each time point), spacing, origin and direction of
+        the volume.
+        """
+        fileNames = sorted( glob( join( self._fileName, "*.png" ) ) )
+        if not fileNames: raise ValueError( "No PNG files found" )
+
+        first = self._readSlice( fileNames[0] )
+        array = np.empty( (len( fileNames ),) + first.shape, first.dtype )
+        array[0] = first
+
+        def readSlice( index ):
+            array[index] = self._readSlice( fileNames[index] )
+
+        with ThreadPoolExecutor( cpu_count() ) as executor:
+            list( executor.map( readSlice, range( 1, len( fileNames ) ) ) )
+
+        return array[np.newaxis], self._spacing, (0.0, 0.0, 0.0), np.eye( 3 )
+
+    ############################################################################
+
+    @staticmethod
+    def _readSlice( fileName ):
+        """
+        Read a single slice as a (y, x) or (y, x, components) numpy array.
+        """
+        reader = vtkPNGReader()
+        reader.SetFileName( fileName )
+        reader.Update()
+
+        return imageToArray( reader.GetOutput() )[0]
+
+################################################################################
+################################################################################
+
+class LegacyVTKReader( VolumeReader ):
+
+    """
+    Reads legacy VTK files of structured points. Parsing a legacy file is slow
+    (ASCII files in particular), so the first read converts it into a side-car
+    MetaImage file next to it, which later reads memory-map (see
+    MetaImageReader). The side-car is named after the size and modification
+    time of the legacy file, such that a changed file is converted again. A
+    compressed side-car takes less disk space, but is decompressed rather
+    than memory-mapped.
+    """
+
+    ############################################################################
+
+    def __init__( self, fileName, compress = False ):
+        """
+        Initialize the reader. Only the header of the file is read, to check
+        whether it contains structured points.
+        """
+        super().__init__( fileName )
+
+        self._compress = compress
+
+        reader = vtkGenericDataObjectReader()
+        reader.SetFileName( fileName )
+        if not reader.IsFileStructuredPoints(): raise ValueError( "Not a legacy VTK structured points file" )
+
+    ############################################################################
+
+    def GetSideCarName( self ):
+        """
+        Get the name of the side-car file of the current version of the legacy
+        file.
+        """
+        info = stat( self._fileName )
+        suffix = "z" if self._compress else ""
+
+        return join( dirname( self._fileName ), f".{basename( self._fileName )}.{info.st_size}-{info.st_mtime_ns}{suffix}.mha" )
+
+    ############################################################################
+
+    def _read( self ):
+        """
+        Read the voxels (of each time point), spacing, origin and direction of
+        the volume. The legacy file is only parsed if there is no valid
+        side-car. If the side-car cannot be written, the one that has been
+        written by another process in the meantime (if any) is used, or else
+        the parsed voxels themselves.
+        """
+        sideCar = self.GetSideCarName()
+        reader = self._openSideCar( sideCar )
+
+        if reader is None:
+            image = self._readLegacyFile()
+
+            try:
+                self._writeSideCar( image, sideCar )
+            except OSError as e:
+                logger.warning( f"Unable to write side-car {sideCar}: {e}" )
+
+            reader = self._openSideCar( sideCar )
+
+            if reader is None:
+                return imageToArray( image )[np.newaxis], image.GetSpacing(), image.GetOrigin(), np.eye( 3 )
+
+        image = reader.GetOutput()
+
+        return reader.GetArray()[np.newaxis], image.GetSpacing(), image.GetOrigin(), reader.GetDirection()
+
+    ############################################################################
+
+    def _openSideCar( self, sideCar ):
+        """
+        Open the given side-car, None if it does not exist or is not a valid
+        MetaImage file (e.g. it has been truncated).
+        """
+        if not exists( sideCar ): return None
+
+        reader = MetaImageReader( sideCar )
+
+        try:
+            reader.Update()
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning( f"Ignoring invalid side-car {sideCar}: {e}" )
+            return None
+
+        return reader
+
+    ############################################################################
+
+    def _readLegacyFile( self ):
+        """
+        Parse the legacy file into vtkImageData.
+        """
+        reader = vtkGenericDataObjectReader()
+        reader.SetFileName( self._fileName )
+        reader.Update()
+
+        image = reader.GetOutput()
+        if image is None or image.GetPointData().GetScalars() is None:
+            raise ValueError( "No scalars found" )
+
+        return image
+
+    ############################################################################
+
+    def _writeSideCar( self, image, sideCar ):
+        """
+        Write the side-car of the legacy file and remove the side-cars of its
+        previous versions.
+        """
+        writeMetaImage( sideCar, imageToArray( image ), image.GetSpacing(), image.GetOrigin(), self._compress )
+        logger.info( f"Converted {self._fileName} into side-car {sideCar}." )
+
+        pattern = join( escape( dirname( self._fileName ) ), f".{escape( basename( self._fileName ) )}.*.mha" )
+
+        for fileName in glob( pattern ):
+            if fileName == sideCar: continue
+
+            try: remove( fileName )
+            except OSError: pass
+
+################################################################################
+################################################################################
@@ -13,14 +13,16 @@ About:      Classes that group the behaviour of a scene (VTK render window,
 ################################################################################
 
 
+from functools import partial
 from glob import glob
 from logging import getLogger
 
 from PyQt5.QtCore import QObject, QTimer, pyqtSlot
-from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QWidget
 
 from Neuroviz.Interactors import BasicWidget, DSAWidget, EEGWidget
-from Neuroviz.Scenes import BasicScene, DSAScene, EEGScene
+from Neuroviz.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
+from Neuroviz.Scenes import BasicScene, DSAScene, EEGScene, SliceScene
 
 logger = getLogger( __name__ )
 
@@ -50,10 +52,13 @@ class BasicSceneAndInteractor( QObject ):
 
         self._scene = BasicScene( self._ui.qvtkBasic.GetRenderWindow() )
         self._interactor = BasicWidget( self._ui.qdwDock )
+        self._createSlicePanes()
 
-        self._updateInteractorFromScene()
-        self._updateSceneFromInteractor()
-        self._connectSignalsToSlots()
+        # The scene is loaded on a worker thread, the interactor is connected
+        # to it as soon as the downsampled scene has been built.
+        self._interactor.setControlsEnabled( False )
+        self._interactor.setLoadingVisible( self._scene.isLoading() )
+        self._connectLoadingSignalsToSlots()
 
     ############################################################################
 
@@ -65,6 +70,43 @@ class BasicSceneAndInteractor( QObject ):
 
     ############################################################################
 
+    def _createSlicePanes( self ):
+        """
+        Create the 2D panes that show the coronal, sagittal and transverse
+        slices of the scene below it (see Neuroviz.Scenes.SliceScene), if
+        enabled in the settings. A position that is picked in one pane moves
+        the slices of the other panes there.
+        """
+        self._slicePanes = []
+        if not self._settings.value( f"{__class__.__name__}/SlicePanes", False, type = bool ): return
+
+        self._slicePanesWidget = QWidget( self._ui.qwBasic )
+        self._slicePanesWidget.setMaximumHeight( 300 )
+
+        layout = QHBoxLayout( self._slicePanesWidget )
+        layout.setContentsMargins( 0, 0, 0, 0 )
+
+        for axis in range( 3 ):
+            view = QVTKRenderWindowInteractor( self._slicePanesWidget )
+            layout.addWidget( view )
+
+            pane = SliceScene( view.GetRenderWindow(), axis )
+            pane.positionPicked.connect( partial( self._onSlicePositionPicked, axis ) )
+            self._slicePanes.append( pane )
+
+        self._ui.qwBasic.layout().addWidget( self._slicePanesWidget )
+
+    ############################################################################
+
+    def _updateSlicePanes( self, sliceValues ):
+        """
+        Update the slice panes (if any) for the given positions of the slices,
+        after the scene has been updated.
+        """
+        for pane in self._slicePanes: pane.updateSlices( sliceValues )
+
+    ############################################################################
+
     def _updateInteractorFromScene( self ):
         """
         Update the interactor with information from the scene.
@@ -81,18 +123,93 @@ class BasicSceneAndInteractor( QObject ):
         index = self._interactor.comboBoxActiveContour.findText( self._scene.getActiveContourName() )
         self._interactor.comboBoxActiveContour.setCurrentIndex( index )
 
+        # Update the contour editing widgets.
+        for name in self._scene.getContourNames( includeHead = True ):
+            self._interactor.comboBoxEditContour.addItem( name )
+
+        minimum, maximum = ( int( x ) for x in self._scene.getScalarRange() )
+        self._interactor.sliderContourValue.setRange( minimum, maximum )
+        self._interactor.spinBoxContourValue.setRange( minimum, maximum )
+
+        self._updateContourEditorsFromScene()
+
         # Update the slider group ranges.
         sliderRanges = self._scene.getBounds()
         self._interactor.sliderGroupCoronal.setRange( *sliderRanges[0:2] )
         self._interactor.sliderGroupSagittal.setRange( *sliderRanges[2:4] )
         self._interactor.sliderGroupTransverse.setRange( *sliderRanges[4:6] )
 
+        # Update the time series widgets.
+        self._interactor.setTimeSeriesVisible( self._scene.getTimePoints() > 1 )
+        self._interactor.sliderTimePoint.blockSignals( True )
+        self._interactor.sliderTimePoint.setRange( 0, self._scene.getTimePoints() - 1 )
+        self._interactor.sliderTimePoint.setValue( self._scene.getTimePoint() )
+        self._interactor.sliderTimePoint.blockSignals( False )
+
+        # Update the tissue statistics.
+        self._interactor.setStatistics( self._scene.getStatistics() )
+
+        # Update the oblique cut checkbox.
+        self._interactor.checkBoxObliqueCut.setChecked( self._scene.isObliqueSliceVisible() )
+
+        # Update the slab projection widgets.
+        mode, thickness = self._scene.getSlabInfo()
+        self._interactor.comboBoxSlabMode.setCurrentIndex( self._interactor.comboBoxSlabMode.findText( mode ) )
+        self._interactor.spinBoxSlabThickness.blockSignals( True )
+        self._interactor.spinBoxSlabThickness.setValue( thickness )
+        self._interactor.spinBoxSlabThickness.blockSignals( False )
+
         # Update the opacity slider value.
         self._interactor.sliderOpacity.setEnabled( self._scene.getInteractionStyle() != "Automatic" )
         self._interactor.sliderOpacity.setValue( int( 100 * self._scene.getOpacity() ) )
 
     ############################################################################
 
+    def _updateContourEditorsFromScene( self ):
+        """
+        Update the contour editing widgets with the value and smoothing of the
+        contour that is being edited. Contours without smoothing show zeros.
+        """
+        name = self._interactor.comboBoxEditContour.currentText()
+        value, smoothing = self._scene.getContourInfo( name )
+        if smoothing is None: smoothing = (0, 0.0, 0, 0.1, 45.0)
+
+        widgets = (self._interactor.sliderContourValue,
+                   self._interactor.spinBoxContourValue,
+                   self._interactor.spinBoxGaussianRadius,
+                   self._interactor.spinBoxGaussianStdDev,
+                   self._interactor.spinBoxSincIterations,
+                   self._interactor.spinBoxSincPassBand,
+                   self._interactor.spinBoxFeatureAngle)
+
+        for widget, x in zip( widgets, (value, value, *smoothing) ):
+            widget.blockSignals( True )
+            widget.setValue( x )
+            widget.blockSignals( False )
+
+    ############################################################################
+
+    def _getContourEditorValues( self ):
+        """
+        Get the name, value and smoothing of the contour that is being edited.
+        The smoothing is None if none of the smoothing steps are used. The
+        smoothing engine, which has no widget, is kept from the scene.
+        """
+        name = self._interactor.comboBoxEditContour.currentText()
+        value = self._interactor.sliderContourValue.value()
+        smoothing = (self._interactor.spinBoxGaussianRadius.value(),
+                     self._interactor.spinBoxGaussianStdDev.value(),
+                     self._interactor.spinBoxSincIterations.value(),
+                     self._interactor.spinBoxSincPassBand.value(),
+                     self._interactor.spinBoxFeatureAngle.value(),
+                     *(self._scene.getContourInfo( name )[1] or ())[5:])
+
+        if smoothing[0] == 0 and smoothing[1] == 0 and smoothing[2] == 0: smoothing = None
+
+        return name, value, smoothing
+
+    ############################################################################
+
     def _updateSceneFromInteractor( self ):
         """
         Update the scene with information from the interactor.
@@ -103,6 +220,21 @@ class BasicSceneAndInteractor( QObject ):
                        self._interactor.sliderGroupTransverse.getValue())
 
         self._scene.updateSlices( sliceValues )
+        self._updateSlicePanes( sliceValues )
+
+    ############################################################################
+
+    def _connectLoadingSignalsToSlots( self ):
+        """
+        Connect the signals that report the loading of the scene to their
+        slots.
+        """
+        self._scene.previewLoaded.connect( self._onPreviewLoaded )
+        self._scene.loadingProgressed.connect( self._interactor.progressBarLoading.setValue )
+        self._scene.loadingFinished.connect( self._onLoadingFinished )
+        self._scene.timePointChanged.connect( self._onTimePointChanged )
+        self._scene.statisticsChanged.connect( self._onStatisticsChanged )
+        self._interactor.pushButtonCancelLoading.clicked.connect( self._onPushButtonCancelLoadingClicked )
 
     ############################################################################
 
@@ -124,13 +256,74 @@ class BasicSceneAndInteractor( QObject ):
         self._interactor.sliderGroupSagittal.toggled.connect( self._onSliderGroupToggled )
         self._interactor.sliderGroupTransverse.toggled.connect( self._onSliderGroupToggled )
 
+        # Time series playback.
+        self._interactor.sliderTimePoint.valueChanged.connect( self._onSliderTimePointChanged )
+        self._interactor.pushButtonPlay.toggled.connect( self._onPushButtonPlayToggled )
+
+        # Oblique cut toggles.
+        self._interactor.checkBoxObliqueCut.toggled.connect( self._onCheckBoxObliqueCutToggled )
+
+        # Slab projection changes.
+        self._interactor.comboBoxSlabMode.activated.connect( self._onSlabChanged )
+        self._interactor.spinBoxSlabThickness.valueChanged.connect( self._onSlabChanged )
+
         # Opacity slider changes.
         self._interactor.sliderOpacity.valueChanged.connect( self._onSliderOpacityChanged )
 
-        # Add a timer for smoother interaction in the "Automatic" and "Interactive" interaction mode.
-        self._sliderGroupTimer = QTimer()
-        self._sliderGroupTimer.setSingleShot( True )
-        self._sliderGroupTimer.timeout.connect( self._onSliderGroupTimeout )
+        # Contour editing (the value spinbox is synced with the slider).
+        self._interactor.comboBoxEditContour.activated.connect( self._onComboBoxEditContourActivated )
+        self._interactor.sliderContourValue.valueChanged.connect( self._onContourEdited )
+        self._interactor.spinBoxGaussianRadius.valueChanged.connect( self._onContourEdited )
+        self._interactor.spinBoxGaussianStdDev.valueChanged.connect( self._onContourEdited )
+        self._interactor.spinBoxSincIterations.valueChanged.connect( self._onContourEdited )
+        self._interactor.spinBoxSincPassBand.valueChanged.connect( self._onContourEdited )
+        self._interactor.spinBoxFeatureAngle.valueChanged.connect( self._onContourEdited )
+
+        # Add a timer to extract the full quality contour once the edits settle.
+        self._contourEditTimer = QTimer()
+        self._contourEditTimer.setSingleShot( True )
+        self._contourEditTimer.timeout.connect( self._onContourEditTimeout )
+
+    ############################################################################
+
+    @pyqtSlot()
+    def _onPreviewLoaded( self ):
+        """
+        When the scene has been built from the downsampled volume.
+        """
+        logger.debug( f"_onPreviewLoaded()" )
+
+        self._interactor.setControlsEnabled( True )
+
+        # The panes show the slices of the scene itself.
+        for axis, pane in enumerate( self._slicePanes ): pane.setSlice( *self._scene.getSlice( axis ) )
+
+        self._updateInteractorFromScene()
+        self._updateSceneFromInteractor()
+        self._connectSignalsToSlots()
+
+    ############################################################################
+
+    @pyqtSlot( bool )
+    def _onLoadingFinished( self, completed ):
+        """
+        When the scene has been loaded in full resolution, or loading has been
+        cancelled or has failed.
+        """
+        logger.debug( f"_onLoadingFinished( {completed} )" )
+
+        self._interactor.setLoadingVisible( False )
+
+    ############################################################################
+
+    @pyqtSlot()
+    def _onPushButtonCancelLoadingClicked( self ):
+        """
+        When the cancel loading button has been clicked.
+        """
+        logger.debug( f"_onPushButtonCancelLoadingClicked()" )
+
+        self._scene.cancelLoading()
 
     ############################################################################
 
@@ -164,17 +357,62 @@ class BasicSceneAndInteractor( QObject ):
 
     ############################################################################
 
+    @pyqtSlot( int )
+    def _onComboBoxEditContourActivated( self, index ):
+        """
+        When the contour editing combobox has been changed by the user.
+        """
+        logger.debug( f"_onComboBoxEditContourActivated( {index} )" )
+
+        # Finish the edits of the previous contour first.
+        if self._contourEditTimer.isActive():
+            self._contourEditTimer.stop()
+            self._onContourEditTimeout()
+
+        self._updateContourEditorsFromScene()
+
+    ############################################################################
+
+    @pyqtSlot( int )
+    @pyqtSlot( float )
+    def _onContourEdited( self, _ ):
+        """
+        When the value or smoothing of the edited contour has changed. A preview
+        is extracted right away, the full quality contour after a timeout.
+        """
+        logger.debug( f"_onContourEdited( {_} )" )
+
+        self._scene.setContourInfo( *self._getContourEditorValues(), preview = True )
+
+        self._contourEditTimer.start( 500 )
+
+    ############################################################################
+
+    @pyqtSlot()
+    def _onContourEditTimeout( self ):
+        """
+        Extract the edited contour in full quality.
+        """
+        logger.debug( f"_onContourEditTimeout()" )
+
+        self._scene.setContourInfo( *self._getContourEditorValues() )
+
+    ############################################################################
+
     @pyqtSlot( int )
     def _onSliderGroupChanged( self, _ ):
         """
-        When any of the slider groups has changed.
+        When any of the slider groups has changed. The octants are rebuilt on a
+        worker thread, so the slices can follow the sliders right away.
         """
         logger.debug( f"_onSliderGroupChanged( {_} )" )
 
-        if self._scene.getInteractionStyle == "Interactive":
-            self._sliderGroupTimer.start( 200 )
-        else:
-            self._onSliderGroupTimeout()
+        sliceValues = (self._interactor.sliderGroupCoronal.getValue(),
+                       self._interactor.sliderGroupSagittal.getValue(),
+                       self._interactor.sliderGroupTransverse.getValue())
+
+        self._scene.updateSlices( sliceValues )
+        self._updateSlicePanes( sliceValues )
 
     ############################################################################
 
@@ -191,34 +429,123 @@ class BasicSceneAndInteractor( QObject ):
 
         self._scene.resetOpacity()
         self._scene.updateSlices( sliceValues )
+        self._updateSlicePanes( sliceValues )
 
     ############################################################################
 
-    @pyqtSlot( int )
-    def _onSliderOpacityChanged( self, value ):
+    def _onSlicePositionPicked( self, axis, x, y, z ):
         """
-        When the opacity slider has been changed.
+        When a position has been picked in the slice pane along the given
+        axis. The other two slices move to the position, the slice of the pane
+        itself stays where it is (and is not computed again).
         """
-        logger.debug( f"_onSliderOpacityChanged( {value} )" )
+        logger.debug( f"_onSlicePositionPicked( {axis}, {x}, {y}, {z} )" )
 
-        self._scene.setOpacity( value / 100 )
+        sliderGroups = (self._interactor.sliderGroupCoronal,
+                        self._interactor.sliderGroupSagittal,
+                        self._interactor.sliderGroupTransverse)
 
-        self._settings.setValue( f"{type( self._scene ).__name__}/Opacity", value / 100 )
+        # Move both sliders before updating the scene once.
+        for i, (sliderGroup, position) in enumerate( zip( sliderGroups, (x, y, z) ) ):
+            if i == axis: continue
+
+            sliderGroup.blockSignals( True )
+            sliderGroup.setValue( round( position ) )
+            sliderGroup.blockSignals( False )
+
+        sliceValues = tuple( sliderGroup.getValue() for sliderGroup in sliderGroups )
+
+        self._scene.updateSlices( sliceValues )
+        self._updateSlicePanes( sliceValues )
+
+    ############################################################################
+
+    @pyqtSlot( int )
+    def _onTimePointChanged( self, index ):
+        """
+        When the scene shows another time point, e.g. during playback.
+        """
+        self._interactor.sliderTimePoint.blockSignals( True )
+        self._interactor.sliderTimePoint.setValue( index )
+        self._interactor.sliderTimePoint.blockSignals( False )
 
     ############################################################################
 
     @pyqtSlot()
-    def _onSliderGroupTimeout( self ):
+    def _onStatisticsChanged( self ):
         """
-        Update the slices in the scene.
+        When the tissue statistics of the scene have been measured.
         """
-        logger.debug( f"_onSliderGroupTimeout()" )
+        logger.debug( f"_onStatisticsChanged()" )
 
-        sliceValues = (self._interactor.sliderGroupCoronal.getValue(),
-                       self._interactor.sliderGroupSagittal.getValue(),
-                       self._interactor.sliderGroupTransverse.getValue())
+        self._interactor.setStatistics( self._scene.getStatistics() )
 
-        self._scene.updateSlices( sliceValues )
+    ############################################################################
+
+    @pyqtSlot( int )
+    def _onSliderTimePointChanged( self, value ):
+        """
+        When the time point slider has been changed by the user.
+        """
+        logger.debug( f"_onSliderTimePointChanged( {value} )" )
+
+        self._scene.setTimePoint( value )
+
+    ############################################################################
+
+    @pyqtSlot( bool )
+    def _onPushButtonPlayToggled( self, checked ):
+        """
+        When the play button has been toggled.
+        """
+        logger.debug( f"_onPushButtonPlayToggled( {checked} )" )
+
+        self._scene.setPlaying( checked )
+        self._interactor.pushButtonPlay.setText( "Pause" if checked else "Play" )
+
+    ############################################################################
+
+    @pyqtSlot( bool )
+    def _onCheckBoxObliqueCutToggled( self, checked ):
+        """
+        When the oblique cut checkbox has been toggled.
+        """
+        logger.debug( f"_onCheckBoxObliqueCutToggled( {checked} )" )
+
+        self._scene.setObliqueSliceVisible( checked )
+
+        self._settings.setValue( f"{type( self._scene ).__name__}/ObliqueSlice", checked )
+
+    ############################################################################
+
+    @pyqtSlot( int )
+    def _onSlabChanged( self, _ ):
+        """
+        When the slab projection mode or thickness has been changed by the
+        user.
+        """
+        logger.debug( f"_onSlabChanged( {_} )" )
+
+        mode = self._interactor.comboBoxSlabMode.currentText()
+        thickness = self._interactor.spinBoxSlabThickness.value()
+
+        self._scene.setSlabInfo( mode, thickness )
+
+        self._settings.setValue( f"{type( self._scene ).__name__}/SlabMode", mode )
+        self._settings.setValue( f"{type( self._scene ).__name__}/SlabThickness", thickness )
+
+    ############################################################################
+
+    @pyqtSlot( int )
+    def _onSliderOpacityChanged( self, value ):
+        """
+        When the opacity slider has been changed.
+        """
+        logger.debug( f"_onSliderOpacityChanged( {value} )" )
+
+        self._scene.setOpacity( value / 100 )
+
+        self._settings.setValue( f"{type( self._scene ).__name__}/Opacity", value / 100 )
 
 ################################################################################
 ################################################################################
@@ -12,10 +12,11 @@ About:      Classes that compose VTK scenes that represent some neuroimaging
 ################################################################################
 ################################################################################
 
+from functools import partial
 from glob import glob
 from logging import getLogger
 from os import getcwd
-from os.path import isfile, realpath
+from os.path import exists, realpath
 from random import choice
 
 import numpy as np
@@ -24,22 +25,39 @@ from matplotlib.image import imread
 from PyQt5.QtCore import QObject, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QApplication
 
-from vtk import (vtkActor, vtkActor2D, vtkAxis, vtkBox, vtkCamera,
-                 vtkChartMatrix, vtkContextView, vtkContourFilter,
-                 vtkExtractPolyDataGeometry, vtkFloatArray, vtkFollower,
-                 vtkGenericDataObjectReader, vtkImageActor, vtkImageData,
-                 vtkImageGaussianSmooth, vtkImageMapper, vtkImageMapToColors,
-                 vtkImageResample, vtkImageReslice, vtkInteractorStyleImage,
-                 vtkInteractorStyleTrackballCamera, vtkLookupTable, vtkMath,
-                 vtkMatrix4x4, vtkNamedColors, vtkOutlineFilter, vtkPlane,
-                 vtkPointPicker, vtkPoints, vtkPolyData, vtkPolyDataMapper,
-                 vtkPolyDataNormals, vtkRenderer, vtkResampleWithDataSet,
-                 vtkScalarBarActor, vtkShepardMethod, vtkSphereSource,
-                 vtkStripper, vtkTable, vtkVector2f, vtkVector2i,
-                 vtkVectorText, vtkWindowedSincPolyDataFilter,
+from vtk import (vtkActor, vtkActor2D, vtkAxis, vtkCamera, vtkChartMatrix,
+                 vtkColorTransferFunction, vtkContextView,
+                 vtkFixedPointVolumeRayCastMapper, vtkFloatArray, vtkFollower,
+                 vtkImageActor, vtkImageData, vtkImageMapper,
+                 vtkImageMapToColors, vtkImageResample, vtkImageReslice,
+                 vtkImplicitPlaneRepresentation, vtkImplicitPlaneWidget2,
+                 vtkInteractorStyleImage, vtkInteractorStyleTrackballCamera,
+                 vtkLineSource, vtkLookupTable, vtkMath, vtkMatrix4x4,
+                 vtkNamedColors,
+                 vtkOutlineFilter, vtkOutlineSource, vtkPiecewiseFunction,
+                 vtkPlane, vtkPointPicker, vtkPoints, vtkPolyData,
+                 vtkPolyDataMapper, vtkPolyDataNormals, vtkRenderer,
+                 vtkResampleWithDataSet, vtkScalarBarActor, vtkShepardMethod,
+                 vtkSphereSource, vtkStripper, vtkTable, vtkTrivialProducer,
+                 vtkVector2f, vtkVector2i, vtkVectorText, vtkVolume,
+                 vtkVolumeProperty, vtkWindowedSincPolyDataFilter,
                  vtkWorldPointPicker)
 from vtk.util.numpy_support import numpy_to_vtk
 
+from Neuroviz.Contours import (ExtractionPool, contourExtent, contourReach,
+                               createContour, createContours, createOctants,
+                               extractSurface, parseSmoothing, previewSmoothing,
+                               stripSurface, _sinc)
+from Neuroviz.Bricks import BrickIndex
+from Neuroviz.Frames import Frame, FrameCache, createFrame
+from Neuroviz.Memory import measureMemory
+from Neuroviz.Readers import (VolumeReader, arrayToImage, compactImage,
+                              createReader, downsampleImage, imageToArray)
+from Neuroviz.Slabs import createSlabIndices
+from Neuroviz.Stages import StageCache
+from Neuroviz.Statistics import computeStatistics
+from Neuroviz.Workers import Job, JobQueue
+
 logger = getLogger( __name__ )
 
 ################################################################################
@@ -52,6 +70,14 @@ class BasicScene( QObject ):
     volumetric data are visualized in different ways.
     """
 
+    ############################################################################
+
+    previewLoaded = pyqtSignal()
+    loadingProgressed = pyqtSignal( int )
+    loadingFinished = pyqtSignal( bool )
+    timePointChanged = pyqtSignal( int )
+    statisticsChanged = pyqtSignal()
+
     ########################################################################
 
     def __init__( self, renderWindow, *args, **kwargs ):
@@ -66,7 +92,12 @@ class BasicScene( QObject ):
         self._settings = QApplication.instance().settings
 
         self._observedObjectsAndTags = []   # To be able to change interaction style.
+        self._rendererTags = []             # To be able to replace the renderer.
+        self._renderer = None
         self._slices = [None, None, None]   # Contains the index of the x, y and z slices.
+        self._jobQueue = JobQueue( parent = self )
+        self._extractionPool = None         # The processes that extract the contours, if any.
+        self._isPoolReleasePending = False  # Whether the pool is released once no contour uses it.
 
         self.initializeScene()
 
@@ -75,40 +106,94 @@ class BasicScene( QObject ):
     def initializeScene( self, fileName = None, interactionStyle = None ):
         """
         Initializes the scene using the given (relative) filename and
-        interaction style (Opacity/Interactive/Automatic).
+        interaction style (Opacity/Interactive/Automatic/Volume).
+
+        The volume is loaded on a worker thread, so the GUI stays responsive.
+        A scene is built from a strided, downsampled copy of the volume first
+        (previewLoaded is emitted), after which the contours are replaced by
+        full resolution ones (loadingFinished is emitted). The progress is
+        reported by loadingProgressed (percentage).
         """
         logger.debug( f"initializeScene( {fileName}, {interactionStyle} )" )
 
+        self._jobQueue.cancelAll()
+
+        # The processes that extract the contours serve a single volume.
+        if self._extractionPool is not None: self._extractionPool.shutdown()
+        self._extractionPool = None
+        self._isPoolReleasePending = False
+
         if fileName is None:
             fileName = self._settings.value( f"{__class__.__name__}/FileName", "" , type = str )
 
         fullName = realpath( getcwd() + fileName )
 
-        if not isfile( fullName ) or not self._createReader( fullName ):
+        if not exists( fullName ) or not self._createReader( fullName ):
             logger.info( f"Unable to read file {fullName}! Creating empty renderer." )
             self._createNamedColors()
             self._createEmptyRenderer()
             return
 
-        logger.info( f"File {fullName} succesfully read!" )
+        logger.info( f"Loading file {fullName}..." )
         self._settings.setValue( f"{__class__.__name__}/FileName", fileName )
 
+        # Show the background while loading.
         self._createNamedColors()
-        self._createOutlineActor()
+        self._createEmptyRenderer()
+
         self._readContourInfo()
-        self._createContours()
-        self._createContourActors()
-        self._createOctants()
-        self._createOctantActors()
-        self._createImageResliceActors()
-        self._createRendererAndInteractor()
+        self._readLevelOfDetailInfo()
+        self._readTransparencyInfo()
+        self._readLoadingInfo()
+        self._readSlabInfo()
+        self._readObliqueSliceInfo()
+        self._readPlaybackInfo()
+        self._readMeshInfo()
+        self._readResolutionInfo()
+
+        self._data = vtkImageData()     # The (cropped) volume, read while loading.
+        self._dataExtent = None         # The extent the volume has been cropped to, if any.
+        self._cropReach = None          # The lowest value and margin it has been cropped for, if automatic.
+        self._bricks = None             # The brick index of the volume, built while loading.
+        self._slabIndices = None        # The slab index along each axis, built after loading.
+        self._slabProjections = [(None, None)] * 3  # The projected slab (center, image) along each axis.
+        self._deferredContours = set()  # The names of the contours that have not been built yet.
+        self._dirtyContours = set()     # The names of the contours edited in "Volume" style.
 
         if interactionStyle is None:
             interactionStyle = self._settings.value( f"{__class__.__name__}/InteractionStyle", "Opacity", type = str )
 
-        self.setInteractionStyle( interactionStyle )
+        self._loadPreview( interactionStyle )
 
-        self._settings.setValue( f"{__class__.__name__}/InteractionStyle", self._style )
+    ############################################################################
+
+    def isLoading( self ):
+        """
+        Check whether the volume is still being loaded.
+        """
+        return self._jobQueue.isBusy( "Loading" )
+
+    ############################################################################
+
+    def cancelLoading( self ):
+        """
+        Cancel loading the volume. The scene that has been built from the
+        downsampled volume is kept. If it has not been built yet, loading stops
+        as soon as it has been, as the controls of the scene need it.
+        """
+        logger.debug( f"cancelLoading()" )
+
+        if not self.isLoading(): return
+
+        if not self._isPreviewLoaded:
+            logger.info( f"Loading {self._reader.GetFileName()} stops once the downsampled scene has been built." )
+            self._isCancelPending = True
+            return
+
+        self._jobQueue.cancel( "Loading" )
+
+        logger.info( f"Loading {self._reader.GetFileName()} cancelled." )
+        self.loadingFinished.emit( False )
 
     ############################################################################
 
@@ -132,6 +217,17 @@ class BasicScene( QObject ):
 
     ############################################################################
 
+    def getSlice( self, axis ):
+        """
+        Get the output port of the (colored) slice along the given axis (0, 1
+        or 2 for the coronal, sagittal or transverse slice) and the matrix
+        that places it in the volume, e.g. to show the slice elsewhere as well
+        (see SliceScene). The matrix follows the position of the slice.
+        """
+        return self._imageResliceMappers[axis].GetOutputPort(), self._imageReslices[axis].GetResliceAxes()
+
+    ############################################################################
+
     def getInteractionStyle( self ):
         """
         Get the current interaction style for the scene.
@@ -152,6 +248,9 @@ class BasicScene( QObject ):
         -> "Automatic"      : The outline will be split up into 1/2/4/8 pieces,
                               depending on the amount of image planes and the
                               piece facing the camera will be removed automatically.
+        -> "Volume"         : The volume is rendered directly (ray casting on
+                              the CPU) instead of its contours, using a variable
+                              opacity for the "Head".
         """
         logger.debug( f"setInteractionStyle( {interactionStyle} )" )
 
@@ -159,10 +258,16 @@ class BasicScene( QObject ):
         for obj, tag in self._observedObjectsAndTags: obj.RemoveObserver( tag )
         self._observedObjectsAndTags = []
 
+        # The actors are added again, which loses their order, and a running
+        # measurement would measure another scene.
+        self._sortTranslucentActors( [] )
+        self._cancelMeasurement()
+
         self._renderer.RemoveAllViewProps()
         for actor in self._imageResliceActors:
             self._renderer.AddActor( actor )
             self._renderer.AddActor( self._outlineActor )
+        self._renderer.AddActor( self._obliqueSliceActor )
         self._interactor.SetInteractorStyle( vtkInteractorStyleTrackballCamera() )
 
         # Setup the scene (actors, interaction, observers) for opacity mode.
@@ -182,6 +287,11 @@ class BasicScene( QObject ):
             interactor = MouseInteractorToggleOpacity( self._renderer, self._octantActors, self._slices )
             self._interactor.SetInteractorStyle( interactor )
 
+        # Setup the scene (actors, interaction, observers) for volume mode.
+        elif interactionStyle == "Volume":
+            self._style = "Volume"
+            self._renderer.AddVolume( self._volume )
+
         # Setup the scene (actors, interaction, observers) for automatic mode.
         else:
             self._style = "Automatic"
@@ -195,6 +305,13 @@ class BasicScene( QObject ):
             self._observedObjectsAndTags.append( (cam, tag) )
             self._DOP = cam.GetDirectionOfProjection()
 
+        # Switch to the coarse actors while the camera is being manipulated.
+        style = self._interactor.GetInteractorStyle()
+        tag = style.AddObserver( "StartInteractionEvent", self._onInteractionStarted )
+        self._observedObjectsAndTags.append( (style, tag) )
+        tag = style.AddObserver( "EndInteractionEvent", self._onInteractionEnded )
+        self._observedObjectsAndTags.append( (style, tag) )
+
         self._renderer.ResetCamera()
         self._renderWindow.Render()
 
@@ -205,35 +322,261 @@ class BasicScene( QObject ):
         self.setActiveContour( self._activeContourName )
         self.setOpacity( self._opacity )
 
+        # The plane widget has been removed from the renderer along with the actors.
+        self._updateObliqueSliceVisibility()
+
         # Bounds become initialized only after the actors have been added.
         bounds = self.getBounds()
         self._min, self._max = bounds[::2], bounds[1::2]
 
-        if not self._style == "Opacity": self._updateOctantActors()
+        if self._style in ("Interactive", "Automatic"): self._updateOctantActors()
 
         self._renderWindow.Render()
 
+        # The contours edited in "Volume" style are built once they are shown,
+        # the ones that are hidden after the others.
+        if self._style != "Volume":
+            for name in self._contourNames:
+                if name not in self._dirtyContours: continue
+
+                shown = name in (self._contourNames[0], self._activeContourName)
+                self._buildContour( name, priority = 0 if shown else -1 )
+
+        # The contours may not have been shown when they were loaded.
+        if self._isMeshFormatPending: QTimer.singleShot( 0, self._measureMeshFormats )
+
     ############################################################################
 
     def getBounds( self ):
         """
         Get the bounds of the scene.
         """
-        extent = self._reader.GetOutput().GetExtent()
-        spacing = self._reader.GetOutput().GetSpacing()
-
-        return [ extent[i] * spacing[i // 2] for i in range( 6 ) ]
+        return list( self._data.GetBounds() )
 
     ############################################################################
 
-    def getContourNames( self ):
+    def getContourNames( self, includeHead = False ):
         """
-        Get the names of the contours, except the "Head" contour.
+        Get the names of the contours, except the "Head" contour unless asked
+        for.
         """
+        if includeHead: return list( self._contourNames )
+
         return self._contourNames[1:]
 
     ############################################################################
 
+    def getContourInfo( self, contourName ):
+        """
+        Get the value and smoothing (radius, stdDev, iters, passBand, angle
+        and the engine, if not the default one) of a contour based on its name.
+        The smoothing is None for contours that are not smoothed.
+        """
+        return self._contourValues[contourName], self._contourSmoothings.get( contourName )
+
+    ############################################################################
+
+    def setContourInfo( self, contourName, value, smoothing = None, preview = False ):
+        """
+        Change the value and smoothing of a contour based on its name. The
+        contour is extracted on a worker thread and shown as soon as it is
+        ready, cancelling the extraction of the same contour that is still
+        running (if any), see _buildContour. In "Volume" style, the contours
+        are not shown, so the contour is only marked as dirty and built once
+        the contours are shown again (see setInteractionStyle). Only the final
+        (non-preview) values are written to the settings. When the volume has
+        been cropped automatically and the contour reaches beyond the crop
+        (see Neuroviz.Contours.contourReach), e.g. when its value is lowered,
+        the volume is loaded again, such that it is cropped for the new value.
+        """
+        logger.debug( f"setContourInfo( {contourName}, {value}, {smoothing}, {preview} )" )
+
+        self._contourValues[contourName] = value
+        if smoothing is None: self._contourSmoothings.pop( contourName, None )
+        else: self._contourSmoothings[contourName] = smoothing
+
+        if not preview and self._cropReach is not None:
+            low, margin = contourReach( [value], [smoothing] )
+
+            if low < self._cropReach[0] or margin > self._cropReach[1]:
+                logger.info( f"Contour {contourName} reaches beyond the cropped volume, cropping it again..." )
+                self._writeContourInfo()
+                self.initializeScene( interactionStyle = self._style )
+                return
+
+        # The volume only needs new transfer functions.
+        if self._style == "Volume":
+            self._updateVolumeTransferFunctions()
+            self._renderWindow.Render()
+
+            self._jobQueue.cancel( contourName )
+            if contourName not in self._deferredContours: self._dirtyContours.add( contourName )
+        else:
+            self._buildContour( contourName, preview )
+
+        if not preview: self._writeContourInfo()
+
+        if not preview: self._updateStatistics()
+
+    ############################################################################
+
+    def getScalarRange( self ):
+        """
+        Get the range of the values in the volumetric data.
+        """
+        return self._data.GetScalarRange()
+
+    ############################################################################
+
+    def getStatistics( self ):
+        """
+        Get the statistics of the tissue of each contour (name) of the shown
+        time point: the number of voxels at or above its value (equal to its
+        value in "Discrete" mode), their physical volume (in mm³) and the
+        bounding box around them (xmin, xmax, ymin, ymax, zmin, zmax, None if
+        there are no voxels). Returns None while they are being measured,
+        statisticsChanged is emitted once they are ready.
+        """
+        discrete = self._contourMode == "Discrete"
+        keys = [(self._timePoint, discrete, self._contourValues[name]) for name in self._contourNames]
+        if any( key not in self._statistics for key in keys ): return None
+
+        origin, spacing = self._data.GetOrigin(), self._data.GetSpacing()
+        statistics = {}
+
+        for name, key in zip( self._contourNames, keys ):
+            voxels, volume, extent = self._statistics[key]
+            # The bounding box covers the voxels, rather than their centers.
+            bounds = None if extent is None else [origin[i // 2] + (x + (i % 2) - 0.5) * spacing[i // 2]
+                                                  for i, x in enumerate( extent )]
+            statistics[name] = (voxels, volume, bounds)
+
+        return statistics
+
+    ############################################################################
+
+    def getMemorySize( self ):
+        """
+        Get the (approximate) number of bytes taken by the data of the scene:
+        the volume (as read and as shown), the contours and octants, the
+        outputs of the pipelines of the outline and slices and the memoized
+        stages of the contour pipeline (see Neuroviz.Memory.measureMemory). The
+        frames of a time series are left out, as they have a budget of their
+        own.
+        """
+        stages = self._stageCache.getOutputs() if self._stageCache is not None else ()
+
+        return measureMemory( self._reader, self._data, self._previewImage, self._contours, self._octantSurface, self._octants,
+                              self._outline, self._imageReslices, self._imageResliceMappers, self._obliqueReslice,
+                              self._obliqueResliceMapper, stages )
+
+    ############################################################################
+
+    def getSlabInfo( self ):
+        """
+        Get the mode (None/Maximum/Minimum/Average) and thickness (in slices)
+        of the slabs that are projected onto the slices.
+        """
+        return self._slabMode, self._slabThickness
+
+    ############################################################################
+
+    def setSlabInfo( self, mode, thickness ):
+        """
+        Project thick slabs around the slices instead of the slices themselves,
+        using the given mode (None/Maximum/Minimum/Average) and thickness (in
+        slices). The slab indices are built on a worker thread, after which the
+        slices show the projections. When only the thickness changes, the
+        indices are reused (see _updateSlabIndices).
+        """
+        logger.debug( f"setSlabInfo( {mode}, {thickness} )" )
+
+        reuse = mode == self._slabMode
+        self._slabMode, self._slabThickness = mode, max( 1, thickness )
+        self._updateSlabIndices( reuse )
+
+    ############################################################################
+
+    def isObliqueSliceVisible( self ):
+        """
+        Check whether the oblique slice (and the widget to move it) is shown.
+        """
+        return self._obliqueSlice
+
+    ############################################################################
+
+    def setObliqueSliceVisible( self, visible ):
+        """
+        Show or hide the oblique slice, i.e. a slice that can be oriented
+        freely by dragging its plane in the 3D view.
+        """
+        logger.debug( f"setObliqueSliceVisible( {visible} )" )
+
+        self._obliqueSlice = visible
+        self._updateObliqueSliceVisibility()
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def getTimePoints( self ):
+        """
+        Get the number of time points of the volumetric data, which is 1 for a
+        single volume.
+        """
+        return self._timePoints
+
+    ############################################################################
+
+    def getTimePoint( self ):
+        """
+        Get the time point that is shown.
+        """
+        return self._timePoint
+
+    ############################################################################
+
+    def setTimePoint( self, index ):
+        """
+        Show the given time point of a time series. A time point that is not
+        cached yet is shown as soon as it has been built. Time points can only
+        be shown once the first one has been loaded in full resolution.
+        """
+        logger.debug( f"setTimePoint( {index} )" )
+
+        if self._frames is None or index == self._timePoint: return
+
+        self._frames.setPlayhead( index )
+        frame = self._frames.get( index )
+
+        if frame is None: self._pendingTimePoint = index
+        else: self._showFrame( frame )
+
+    ############################################################################
+
+    def isPlaying( self ):
+        """
+        Check whether the time series is being played back.
+        """
+        return self._playbackTimer.isActive()
+
+    ############################################################################
+
+    def setPlaying( self, playing ):
+        """
+        Start or stop playing back the time series at the playback rate. Every
+        tick of the timer shows the next time point if it has been prefetched,
+        such that the playback never waits for a frame to be built.
+        """
+        logger.debug( f"setPlaying( {playing} )" )
+
+        if playing and self._frames is not None:
+            self._playbackTimer.start( int( 1000 / self._playbackRate ) )
+        else:
+            self._playbackTimer.stop()
+
+    ############################################################################
+
     def getActiveContourName( self ):
         """
         Get the name of the currently active contour.
@@ -245,15 +588,19 @@ class BasicScene( QObject ):
     def setActiveContour( self, contourName ):
         """
         Set the active contour based on its name. Name "None" will display
-        nothing but the "Head" contour.
+        nothing but the "Head" contour. A contour that has been deferred while
+        loading (see _getDeferredContours) is built first.
         """
         for contour in self._contourActors[1:]: contour.SetVisibility( False )
 
+        if contourName in self._deferredContours: self._buildContour( contourName )
+
         if contourName != "None":
             newContourIndex = self._contourNames.index( contourName )
             self._contourActors[newContourIndex].SetVisibility( True )
 
         self._activeContourName = contourName
+        self._updateVolumeTransferFunctions()
         self._renderWindow.Render()
 
     ############################################################################
@@ -278,6 +625,8 @@ class BasicScene( QObject ):
 
         if self._style == "Opacity":
             self._contourActors[0].GetProperty().SetOpacity( self._opacity )
+        elif self._style == "Volume":
+            self._updateVolumeTransferFunctions()
         else:
             self._interactor.GetInteractorStyle().setOpacity( self._opacity )
 
@@ -297,12 +646,371 @@ class BasicScene( QObject ):
 
     def _createReader( self, fileName ):
         """
-        Creates a VTK file reader and check if the data is valid.
+        Creates a reader for the file (legacy VTK structured points, MetaImage,
+        NIfTI or a directory of PNG slices) and check if the data is valid.
+        Legacy VTK files are read from their side-car file (see
+        Neuroviz.Readers.LegacyVTKReader).
+        """
+        spacing = self._settings.value( f"{__class__.__name__}/StackSpacing", [1.0, 1.0, 1.0], type = list )
+        compress = self._settings.value( f"{__class__.__name__}/SideCarCompression", False, type = bool )
+        self._reader = createReader( fileName, [float( x ) for x in spacing], update = False, compress = compress )
+
+        return self._reader is not None
+
+    ############################################################################
+
+    def _readLoadingInfo( self ):
+        """
+        Read the loading settings from the settings: the maximum number of
+        voxels of the downsampled volume that is shown while loading, the
+        memory budget (in MB) of contouring in streaming mode, the number of
+        processes that extract the contours, the way the volume is cropped
+        (with the extent to crop to in "Manual" mode), the data types of the
+        volume ("Compact" or "Original", see _isCompacting), whether the
+        intermediate data is released once the scene is loaded ("Lean" or
+        "Default", see _releaseIntermediates) and when the contours are built
+        ("Eager", "Lazy" or "Background", see _getDeferredContours).
+        """
+        self._previewVoxels = self._settings.value( f"{__class__.__name__}/PreviewVoxels", 1000000, type = int )
+        self._memoryBudget = self._settings.value( f"{__class__.__name__}/MemoryBudget", 512, type = int )
+        self._processes = self._settings.value( f"{__class__.__name__}/Processes", 1, type = int )
+        self._cropMode = self._settings.value( f"{__class__.__name__}/CropMode", "Automatic", type = str )
+        self._cropExtent = self._settings.value( f"{__class__.__name__}/CropExtent", [], type = list )
+        self._cropExtent = [int( x ) for x in self._cropExtent]
+        self._dataTypes = self._settings.value( f"{__class__.__name__}/DataTypes", "Compact", type = str )
+        self._pipelineMode = self._settings.value( f"{__class__.__name__}/PipelineMode", "Default", type = str )
+        self._contourConstruction = self._settings.value( f"{__class__.__name__}/ContourConstruction", "Eager",
+                                                          type = str )
+
+    ############################################################################
+
+    def _getMemoryBudget( self ):
+        """
+        Get the memory budget (in bytes) of contouring, None if the volume is
+        not streamed (i.e. if the contour mode is not "Streaming").
+        """
+        if self._contourMode != "Streaming": return None
+
+        return self._memoryBudget * 2**20
+
+    ############################################################################
+
+    def _isCompacting( self ):
+        """
+        Whether the volume is converted to the smallest data type that holds
+        its voxels (see Neuroviz.Readers.compactImage), i.e. in "Compact" mode.
+        A streamed volume keeps its data type, as converting it would read the
+        whole memory-mapped volume into memory.
+        """
+        return self._dataTypes == "Compact" and self._contourMode != "Streaming"
+
+    ############################################################################
+
+    def _getDeferredContours( self ):
+        """
+        Get the names of the contours that are not built while loading, but
+        once they become the active contour (see setActiveContour) or, in
+        "Background" mode, once the scene is loaded (see
+        _buildDeferredContours): all contours but the "Head" and the active
+        one, none in "Eager" mode.
+        """
+        if self._contourConstruction == "Eager": return set()
+
+        active = self._settings.value( f"{__class__.__name__}/ActiveContour", "Brain", type = str )
+
+        return {name for name in self._contourNames[1:] if name != active}
+
+    ############################################################################
+
+    def _getContourValues( self ):
+        """
+        Get the value of each contour, None for the contours that have not been
+        built yet, which are skipped (see Neuroviz.Contours.createContours).
+        """
+        return [None if name in self._deferredContours else self._contourValues[name] for name in self._contourNames]
+
+    ############################################################################
+
+    def _loadPreview( self, interactionStyle ):
+        """
+        Read the volume and create the downsampled scene on a worker thread.
+        The scene is built using the given interaction style once it is ready.
+        """
+        logger.debug( f"_loadPreview( {interactionStyle} )" )
+
+        self._deferredContours = self._getDeferredContours()
+
+        values = [self._contourValues[name] for name in self._contourNames]
+        smoothings = [previewSmoothing( self._contourSmoothings.get( name ) ) for name in self._contourNames]
+        deferred = [i for i, name in enumerate( self._contourNames ) if name in self._deferredContours]
+
+        fullSmoothings = [self._contourSmoothings.get( name ) for name in self._contourNames]
+        cropExtent = self._cropExtent if self._cropMode == "Manual" else None
+        autoCrop = self._cropMode == "Automatic"
+
+        # Cropping copies the volume, which would read all of it from disk.
+        if self._contourMode == "Streaming":
+            cropExtent, autoCrop = None, False
+
+        job = Job( self._readPreview, self._reader, values, smoothings, self._contourMode == "Discrete",
+                   self._previewVoxels, autoCrop, fullSmoothings, cropExtent, self._isCompacting(), deferred )
+        job.signals.progressed.connect( partial( self._onLoadingProgressed, 0, 10 ) )
+        job.signals.finished.connect( partial( self._onPreviewLoaded, interactionStyle ) )
+        job.signals.failed.connect( self._onLoadingFailed )
+
+        self._jobQueue.submit( "Loading", job )
+
+        self._cropReach = contourReach( values, fullSmoothings ) if autoCrop else None
+        self._isPreviewLoaded, self._isCancelPending = False, False
+        self._loadingProgress = 0
+        self.loadingProgressed.emit( self._loadingProgress )
+
+    ############################################################################
+
+    @staticmethod
+    def _readPreview( reader, values, smoothings, discrete, maxVoxels, autoCrop = False, fullSmoothings = (),
+                      cropExtent = None, compact = False, deferred = (), job = None ):
+        """
+        Read and crop the volume and create a strided, downsampled copy of it
+        along with its contours (without levels of detail), except for the
+        deferred ones (indices), which are left empty. Runs on a worker
+        thread. Reading a memory-mapped volume only reads its header, the
+        voxels are paged in by the stages that visit them. The volume is
+        cropped to the given extent or, when cropped automatically, to the
+        part that the contours (with their full smoothings) can reach (see
+        contourExtent), and converted to its compact data type if asked for
+        (see _isCompacting). The brick index of the volume is only built along
+        with the full resolution contours (see _createFullResolution), such
+        that it does not hold up the downsampled scene. Returns the cropped
+        volume, the copy, the contours, the raw "Head" isosurface and the
+        extent it has been cropped to (None if not cropped).
+        """
+        reader.Update()
+        job.checkCancelled()
+
+        array = reader.GetArray()
+        logger.info( f"Read volume of {array.shape[2::-1]} {array.dtype} voxels ({array.nbytes / 2**20:.1f} MB)." )
+
+        if autoCrop: cropExtent = contourExtent( array, values, fullSmoothings )
+
+        # Only the cropped part of the volume is wrapped (and copied if it has
+        # been reoriented), see Neuroviz.Readers.VolumeReader.
+        volume = reader.GetTimePoint( 0, cropExtent )
+
+        if volume.GetDimensions() != array.shape[2::-1]:
+            logger.info( f"Cropped volume of {array.shape[2::-1]} voxels to {volume.GetDimensions()} voxels." )
+        else:
+            cropExtent = None
+
+        compacted = compactImage( volume ) if compact else volume
+
+        if compacted is not volume:
+            volume.ReleaseData()
+            volume = compacted
+
+        job.checkCancelled()
+
+        image = downsampleImage( volume, maxVoxels )
+        values = [None if i in deferred else value for i, value in enumerate( values )]
+        contours, rawSurface = createContours( image, values, smoothings, (), discrete, job = job )
+
+        return volume, image, contours, rawSurface, cropExtent
+
+    ############################################################################
+
+    def _loadFullResolution( self ):
+        """
+        Build the brick index of the volume and create the full resolution
+        contours on a worker thread, except for the deferred ones (see
+        _getDeferredContours). They replace the downsampled ones once they are
+        ready.
+        """
+        logger.debug( f"_loadFullResolution()" )
+
+        # Hand the worker its own (shallow) copy of the data, see setContourInfo.
+        image = vtkImageData()
+        image.ShallowCopy( self._data )
+
+        values = self._getContourValues()
+        smoothings = [self._contourSmoothings.get( name ) for name in self._contourNames]
+        focus = None
+        if self._focusContour in self._contourValues: focus = (self._contourValues[self._focusContour], self._focusMargin)
+
+        job = Job( self._createFullResolution, image, values, smoothings, self._lodReductions,
+                   self._contourMode == "Discrete", self._getMemoryBudget(), self._processes,
+                   self._getMeshOptimizations(), self._stageCache, self._getSampleRates(), focus,
+                   self._getExtractionPool( image ) )
+        job.signals.progressed.connect( partial( self._onLoadingProgressed, 10, 100 ) )
+        job.signals.finished.connect( partial( self._onFullResolutionLoaded, image, values, smoothings ) )
+        job.signals.failed.connect( self._onLoadingFailed )
+
+        self._jobQueue.submit( "Loading", job )
+
+    ############################################################################
+
+    @staticmethod
+    def _createFullResolution( image, values, smoothings, reductions, discrete, budget, processes, optimizations,
+                               cache, sampleRates, focus, pool, job = None ):
+        """
+        Build the brick index of the (cropped) volume and create its full
+        resolution contours (see Neuroviz.Contours.createContours), using the
+        brick index to skip empty space and the given extraction pool (if
+        any). The subsampled contours are extracted at full resolution around
+        the focus contour (value, margin), if any (see _getFocusExtent). Runs
+        on a worker thread. Returns the brick index, the contours and the raw
+        "Head" isosurface.
+        """
+        bricks = BrickIndex( imageToArray( image ) )
+        job.checkCancelled()
+
+        focusExtent = None if focus is None else bricks.boundingExtent( *focus )
+        contours, rawSurface = createContours( image, values, smoothings, reductions, discrete, bricks, budget,
+                                               processes, optimizations, cache, sampleRates, focusExtent, pool,
+                                               job )
+
+        return bricks, contours, rawSurface
+
+    ############################################################################
+
+    def _getExtractionPool( self, image ):
+        """
+        Get the pool of processes that extract the contours of the given
+        (shallow copy of the) volume, see Neuroviz.Contours.ExtractionPool.
+        The pool is created for the first volume that needs it and replaced
+        when the volume changes, e.g. when another time point is shown. Returns
+        None when a single process extracts the contours.
+        """
+        if self._processes <= 1: return None
+
+        if self._extractionPool is None or not self._extractionPool.matches( image ):
+            if self._extractionPool is not None: self._extractionPool.shutdown()
+            self._extractionPool = ExtractionPool( image, self._processes )
+
+        return self._extractionPool
+
+    ############################################################################
+
+    def _releaseIntermediates( self ):
+        """
+        Release the data that is no longer needed once the full resolution
+        scene is shown: the volume as read (unless it is shown as such or
+        other time points are read from it), the outputs of the reslicing of
+        the slices (which are kept as colors), the shared copy of the volume
+        of the extraction processes (see _releaseExtractionPool) and the
+        downsampled volume (unless streaming, which uses it for previews). The
+        reslicing releases its output after every execution from then on, and
+        executes again only when a slice moves. The memoized stages of the
+        contour pipeline are kept, as they are bounded by their own budget and
+        make edits fast. Logs the memory taken by the scene before and after.
+        """
+        before = self.getMemorySize()
+
+        if self._timePoints == 1 and self._data is not self._reader.GetOutputDataObject( 0 ):
+            self._reader.ReleaseData()
+
+        for reslice in (*self._imageReslices, self._obliqueReslice):
+            reslice.ReleaseDataFlagOn()
+            reslice.GetOutput().ReleaseData()
+
+        self._releaseExtractionPool()
+        if self._contourMode != "Streaming": self._previewImage = None
+
+        logger.info( f"Released intermediate data: {before / 2**20:.1f} MB -> "
+                     f"{self.getMemorySize() / 2**20:.1f} MB." )
+
+    ############################################################################
+
+    def _releaseExtractionPool( self ):
+        """
+        Stop the processes that extract the contours (see _getExtractionPool)
+        once no contour is being built (or waits to be built) by them, e.g.
+        the deferred contours in "Background" mode, see _onContourReleased.
+        A contour that is built afterwards creates them again.
+        """
+        if any( self._jobQueue.isBusy( name ) for name in self._contourNames ):
+            self._isPoolReleasePending = True
+            return
+
+        if self._extractionPool is not None: self._extractionPool.shutdown()
+        self._extractionPool = None
+        self._isPoolReleasePending = False
+
+    ############################################################################
+
+    def _onContourReleased( self ):
+        """
+        Release the processes that extract the contours once the last contour
+        that was being built by them is done, if asked for (see
+        _releaseExtractionPool). The queue forgets about the job after this,
+        so the release is checked once control returns to the event loop.
+        """
+        if self._isPoolReleasePending: QTimer.singleShot( 0, self._releaseExtractionPool )
+
+    ############################################################################
+
+    def _buildContour( self, contourName, preview = False, priority = 0 ):
+        """
+        Extract and build a contour with its current value and smoothing on a
+        worker thread (at the given priority) and show it once it is ready. A
+        preview is extracted from a subsampled volume with less smoothing,
+        which is fast enough to follow a slider being dragged. In streaming
+        mode, the downsampled volume that was shown while loading is used for
+        previews, as even subsampling visits the whole volume. A contour is no
+        longer deferred (see _getDeferredContours) or dirty (see
+        setContourInfo) once it is built, unless the build fails (see
+        _onContourFailed).
         """
-        self._reader = vtkGenericDataObjectReader()
-        self._reader.SetFileName( fileName )
+        logger.debug( f"_buildContour( {contourName}, {preview}, {priority} )" )
+
+        index = self._contourNames.index( contourName )
+        value, smoothing = self._contourValues[contourName], self._contourSmoothings.get( contourName )
+        source, bricks, budget = self._data, self._bricks, self._getMemoryBudget()
+
+        if preview:
+            reductions, sampleRate, optimization, focus = (), 2, None, None
+            smoothing = previewSmoothing( smoothing )
+            if budget is not None: source, bricks, budget, sampleRate = self._previewImage, None, None, 1
+        else:
+            reductions, optimization = self._lodReductions, self._getMeshOptimizations()[index]
+            sampleRate, focus = self._getSampleRates()[index], self._getFocusExtent()
+            deferred, dirty = contourName in self._deferredContours, contourName in self._dirtyContours
+            self._deferredContours.discard( contourName )
+            self._dirtyContours.discard( contourName )
+
+        # Hand the worker its own (shallow) copy of the data, as the pipeline
+        # information of a data object must not be changed by several threads.
+        image = vtkImageData()
+        image.ShallowCopy( source )
+
+        job = Job( createContour, image, value, smoothing, reductions, self._contourMode == "Discrete",
+                   sampleRate, withRawSurface = index == 0 and not preview, bricks = bricks, budget = budget,
+                   processes = 1 if preview else self._processes, optimization = optimization,
+                   cache = self._stageCache, focus = focus,
+                   pool = None if preview else self._getExtractionPool( image ) )
+        job.signals.finished.connect( partial( self._onContourCreated, index ) )
+        if not preview:
+            job.signals.failed.connect( partial( self._onContourFailed, contourName, deferred, dirty ) )
+            job.signals.released.connect( self._onContourReleased )
+
+        # The cached time points have the old contours. The shown time point
+        # is kept and gets the new contour once it is ready.
+        if self._frames is not None and not preview:
+            job.signals.finished.connect( partial( self._updateFrame, self._timePoint, index ) )
+            self._frames.clear( keep = self._timePoint )
+            self._frames.setPlayhead( self._timePoint )
+
+        self._jobQueue.submit( contourName, job, priority )
 
-        return self._reader.IsFileStructuredPoints()
+    ############################################################################
+
+    def _buildDeferredContours( self ):
+        """
+        Build the contours that have been deferred while loading (see
+        _getDeferredContours) on worker threads, at a lower priority than any
+        other job, such that they never hold up the contours that are shown.
+        """
+        for name in self._contourNames:
+            if name in self._deferredContours: self._buildContour( name, priority = -1 )
 
     ############################################################################
 
@@ -324,7 +1032,7 @@ class BasicScene( QObject ):
         Creates a white outline around the volumetric data for context.
         """
         self._outline = vtkOutlineFilter()
-        self._outline.SetInputConnection( self._reader.GetOutputPort() )
+        self._outline.SetInputConnection( self._image.GetOutputPort() )
 
         self._outlineMapper = vtkPolyDataMapper()
         self._outlineMapper.SetInputConnection( self._outline.GetOutputPort() )
@@ -336,10 +1044,11 @@ class BasicScene( QObject ):
 
     def _readContourInfo( self ):
         """
-        Read the contour values (name, value) and smoothings (name, values) from
-        the settings.
+        Read the contour mode, values (name, value) and smoothings (name, values)
+        from the settings.
         """
         self._contourNames = []
+        self._contourMode = self._settings.value( f"{__class__.__name__}/ContourMode", "Continuous", type = str )
         namesAndValues = self._settings.value( f"{__class__.__name__}/ContourValues", "Head->127", type = list )
         namesAndSmoothings = self._settings.value( f"{__class__.__name__}/ContourSmoothings", "Head->2/1.0/100/0.05/45.0", type = list )
 
@@ -363,72 +1072,323 @@ class BasicScene( QObject ):
         self._contourSmoothings = {}
         for nameAndSmoothing in namesAndSmoothings:
             name, smoothing = (x.strip() for x in nameAndSmoothing.split( "->" ))
-            s = smoothing.split( "/" )
-            smoothing = tuple( (int( s[0] ), float( s[1] ), int( s[2] ), float( s[3] ), float( s[4] )) )
-            self._contourSmoothings[name] = smoothing
+            self._contourSmoothings[name] = parseSmoothing( smoothing )
 
         self._nContours = len( self._contourNames )
 
     ############################################################################
 
-    def _createContours( self ):
+    def _writeContourInfo( self ):
         """
-        Create the smoothed contours (isosurfaces). Smoothing is done on the
-        input data using a Gaussian filter, and on the isosurfaces themselves
-        using a windowed sinc filter followed by normal creation to create a
-        smooth shading. The stripper creates triangle strips from the isosurface
-        that will render very fast.
+        Write the contour values (name, value) and smoothings (name, values) to
+        the settings.
         """
-        self._gaussians    = [None for _ in range( self._nContours )]
-        self._tempContours = [None for _ in range( self._nContours )]
-        self._filters      = [None for _ in range( self._nContours )]
-        self._normals      = [None for _ in range( self._nContours )]
-        self._contours     = [None for _ in range( self._nContours )]
+        namesAndValues = [f"{name}->{value}" for name, value in self._contourValues.items()]
+        namesAndSmoothings = [f"{name}->{'/'.join( str( x ) for x in smoothing )}"
+                              for name, smoothing in self._contourSmoothings.items()]
 
-        for i, (name, value) in enumerate( self._contourValues.items() ):
-            if name in self._contourSmoothings:
-                self._tempContours[i] = vtkContourFilter()
+        self._settings.setValue( f"{__class__.__name__}/ContourValues", namesAndValues )
+        self._settings.setValue( f"{__class__.__name__}/ContourSmoothings", namesAndSmoothings )
 
-                radius, stdDev, iters, passBand, angle = self._contourSmoothings[name]
+    ############################################################################
 
-                if radius != 0 and stdDev != 0:
-                    self._gaussians[i] = vtkImageGaussianSmooth()
-                    self._gaussians[i].SetInputConnection( self._reader.GetOutputPort() )
-                    self._gaussians[i].SetRadiusFactors( radius, radius, radius )
-                    self._gaussians[i].SetStandardDeviations( stdDev, stdDev, stdDev )
-                    self._tempContours[i].SetInputConnection( self._gaussians[i].GetOutputPort() )
-                else:
-                    self._tempContours[i].SetInputConnection( self._reader.GetOutputPort() )
-
-                self._tempContours[i].SetValue( 0, value )
-                self._tempContours[i].ComputeScalarsOff()
-                self._tempContours[i].ComputeGradientsOff()
-                self._tempContours[i].ComputeNormalsOff()
-
-                self._filters[i] = vtkWindowedSincPolyDataFilter()
-                self._filters[i].SetInputConnection( self._tempContours[i].GetOutputPort() )
-                self._filters[i].SetNumberOfIterations( iters )
-                self._filters[i].BoundarySmoothingOff()
-                self._filters[i].FeatureEdgeSmoothingOff()
-                self._filters[i].SetFeatureAngle( angle )
-                self._filters[i].SetPassBand( passBand )
-                self._filters[i].NonManifoldSmoothingOn()
-                self._filters[i].NormalizeCoordinatesOn()
-                self._filters[i].Update()
-
-                self._normals[i] = vtkPolyDataNormals()
-                self._normals[i].SetInputConnection( self._filters[i].GetOutputPort() )
-                self._normals[i].SetFeatureAngle( angle )
-
-                self._contours[i] = vtkStripper()
-                self._contours[i].SetInputConnection( self._normals[i].GetOutputPort() )
-            else:
-                self._contours[i] = vtkContourFilter()
-                self._contours[i].SetInputConnection( self._reader.GetOutputPort() )
-                self._contours[i].SetValue( 0 , value )
-                self._contours[i].ComputeScalarsOff()
-                self._contours[i].ComputeGradientsOff()
-                self._contours[i].ComputeNormalsOff()
+    def _readLevelOfDetailInfo( self ):
+        """
+        Read the level of detail settings from the settings: the frame rate to
+        maintain while interacting and the target reduction of each of the
+        (increasingly coarse) levels of detail.
+        """
+        self._targetFPS = self._settings.value( f"{__class__.__name__}/TargetFPS", 15.0, type = float )
+        self._lodReductions = self._settings.value( f"{__class__.__name__}/LODReductions", [0.75, 0.95], type = list )
+
+        # Handle the empty and one-element list cases.
+        if not isinstance( self._lodReductions, list ):
+            if not self._lodReductions: self._lodReductions = ()
+            else: self._lodReductions = (self._lodReductions,)
+
+        self._lodReductions = tuple( float( x ) for x in self._lodReductions )
+        self._lodLevel = 0              # The coarse level used on the next interaction.
+        self._isInteracting = False
+
+    ############################################################################
+
+    def _readTransparencyInfo( self ):
+        """
+        Read the transparency settings from the settings: the strategy used to
+        render translucent geometry and the number of peels of the capped depth
+        peeling strategy.
+        """
+        self._transparencyStrategy = self._settings.value( f"{__class__.__name__}/TransparencyStrategy", "Automatic", type = str )
+        self._cappedPeels = self._settings.value( f"{__class__.__name__}/CappedPeels", 4, type = int )
+
+        self._measuredStrategies = {}       # The measured strategy for each interaction style.
+        self._activeStrategy = None
+        self._isMeasuringStrategies = False
+        self._sortedActors = []             # The (back face culled) actors of the "SortedLayer" strategy.
+        self._measurement = None            # The frame time measurement that is running, if any.
+
+    ############################################################################
+
+    def _readSlabInfo( self ):
+        """
+        Read the slab settings from the settings: the mode (None/Maximum/
+        Minimum/Average) and thickness (in slices) of the slabs that are
+        projected onto the slices.
+        """
+        self._slabMode = self._settings.value( f"{__class__.__name__}/SlabMode", "None", type = str )
+        self._slabThickness = max( 1, self._settings.value( f"{__class__.__name__}/SlabThickness", 1, type = int ) )
+
+    ############################################################################
+
+    def _readObliqueSliceInfo( self ):
+        """
+        Read the oblique slice settings from the settings: whether it is shown,
+        the normal of its plane, the interpolation (Linear/Cubic) used once the
+        plane stops moving and the factor by which the grid is reduced while
+        the plane is being dragged.
+        """
+        self._obliqueSlice = self._settings.value( f"{__class__.__name__}/ObliqueSlice", False, type = bool )
+        self._obliqueNormal = self._settings.value( f"{__class__.__name__}/ObliqueNormal", [1.0, 1.0, 1.0], type = list )
+        self._obliqueNormal = [float( x ) for x in self._obliqueNormal]
+        self._obliqueInterpolation = self._settings.value( f"{__class__.__name__}/ObliqueInterpolation", "Cubic", type = str )
+        self._obliqueReduction = max( 1, self._settings.value( f"{__class__.__name__}/ObliqueReduction", 2, type = int ) )
+
+        self._obliqueRefineTimer = QTimer()   # Refines the slice when the plane stops, while still being held.
+        self._obliqueRefineTimer.setSingleShot( True )
+        self._obliqueRefineTimer.timeout.connect( self._onObliqueSliceStopped )
+
+    ############################################################################
+
+    def _readPlaybackInfo( self ):
+        """
+        Read the playback settings of time series from the settings: the rate
+        (in time points per second), the number of time points that are
+        prefetched ahead of the playhead and the memory budget (in MB) of the
+        cached time points.
+        """
+        self._playbackRate = max( 0.1, self._settings.value( f"{__class__.__name__}/PlaybackRate", 5.0, type = float ) )
+        self._prefetchFrames = self._settings.value( f"{__class__.__name__}/PrefetchFrames", 4, type = int )
+        self._frameCacheBudget = self._settings.value( f"{__class__.__name__}/FrameCacheBudget", 1024, type = int )
+
+        self._timePoints, self._timePoint = 1, 0
+        self._pendingTimePoint = None   # The time point to show once it has been built.
+        self._frames = None             # The cache of the time points, created once loaded.
+
+        self._playbackTimer = QTimer()
+        self._playbackTimer.timeout.connect( self._onPlaybackTimeout )
+
+    ############################################################################
+
+    def _readMeshInfo( self ):
+        """
+        Read the mesh optimization settings from the settings: whether the
+        contours are optimized, the number of triangles below which connected
+        components are dropped, the triangle budget (name, triangles) of each
+        contour, the format (Strips/Triangles/Automatic) of the optimized
+        meshes and the memory budget (in MB) of the memoized stages of the
+        contour pipeline (see Neuroviz.Stages.StageCache).
+        """
+        self._meshOptimization = self._settings.value( f"{__class__.__name__}/MeshOptimization", False, type = bool )
+        self._islandSize = self._settings.value( f"{__class__.__name__}/IslandSize", 0, type = int )
+        self._meshFormat = self._settings.value( f"{__class__.__name__}/MeshFormat", "Automatic", type = str )
+        namesAndBudgets = self._settings.value( f"{__class__.__name__}/TriangleBudgets", [], type = list )
+
+        # Handle the empty and one-element list cases.
+        if not isinstance( namesAndBudgets, list ):
+            namesAndBudgets = (namesAndBudgets,) if namesAndBudgets else ()
+
+        self._triangleBudgets = {}
+        for nameAndBudget in namesAndBudgets:
+            name, budget = (x.strip() for x in nameAndBudget.split( "->" ))
+            self._triangleBudgets[name] = int( budget )
+
+        self._isMeshFormatPending = False   # Whether the format still has to be measured.
+
+        stageCacheBudget = self._settings.value( f"{__class__.__name__}/StageCacheBudget", 512, type = int )
+        self._stageCache = StageCache( stageCacheBudget * 2 ** 20 )
+
+    ############################################################################
+
+    def _getMeshOptimizations( self ):
+        """
+        Get the optimization (island size, triangle budget, strips) of each
+        contour (see Neuroviz.Contours.buildContour), or None for each contour
+        if the meshes are not optimized. Plain triangles are used until the
+        "Automatic" format has been measured.
+        """
+        if not self._meshOptimization: return [None] * self._nContours
+
+        return [(self._islandSize, self._triangleBudgets.get( name ), self._meshFormat == "Strips")
+                for name in self._contourNames]
+
+    ############################################################################
+
+    def _readResolutionInfo( self ):
+        """
+        Read the resolution settings from the settings: the sample rate (name,
+        rate) of each contour that is extracted from a subsampled volume, the
+        name of the contour around which the contours are extracted at full
+        resolution nonetheless (none if empty) and the margin (in voxels)
+        around it.
+        """
+        namesAndRates = self._settings.value( f"{__class__.__name__}/ContourSampleRates", [], type = list )
+        self._focusContour = self._settings.value( f"{__class__.__name__}/FocusContour", "", type = str )
+        self._focusMargin = self._settings.value( f"{__class__.__name__}/FocusMargin", 16, type = int )
+
+        # Handle the empty and one-element list cases.
+        if not isinstance( namesAndRates, list ):
+            namesAndRates = (namesAndRates,) if namesAndRates else ()
+
+        self._contourSampleRates = {}
+        for nameAndRate in namesAndRates:
+            name, rate = (x.strip() for x in nameAndRate.split( "->" ))
+            self._contourSampleRates[name] = int( rate )
+
+    ############################################################################
+
+    def _getSampleRates( self ):
+        """
+        Get the sample rate of each contour (see _readResolutionInfo), 1 for
+        the contours without one. A streamed volume is never subsampled, as
+        subsampling visits the whole volume.
+        """
+        if self._contourMode == "Streaming": return [1] * self._nContours
+
+        return [max( self._contourSampleRates.get( name, 1 ), 1 ) for name in self._contourNames]
+
+    ############################################################################
+
+    def _getFocusExtent( self ):
+        """
+        Get the extent (in voxels) of the volume around the focus contour, grown
+        by the focus margin (see Neuroviz.Bricks.BrickIndex.boundingExtent),
+        within which the subsampled contours are extracted at full resolution.
+        None if there is no focus contour or if it is empty.
+        """
+        if self._focusContour not in self._contourValues or self._bricks is None: return None
+
+        return self._bricks.boundingExtent( self._contourValues[self._focusContour], self._focusMargin )
+
+    ############################################################################
+
+    def _createFrameCache( self, contours, rawSurface ):
+        """
+        Create the cache of the time points of a time series, starting from the
+        first time point that has just been loaded (along with its contours,
+        if they have not been edited in the meantime).
+        """
+        self._frames = FrameCache( self._timePoints, self._createFrameJob, self._jobQueue, self._prefetchFrames,
+                                   self._frameCacheBudget * 2 ** 20, parent = self )
+        self._frames.frameReady.connect( self._onFrameReady )
+
+        if contours is not None: self._frames.add( Frame( 0, self._data, self._bricks, contours, rawSurface ) )
+
+        self._frames.setPlayhead( self._timePoint )
+
+    ############################################################################
+
+    def _createFrameJob( self, index ):
+        """
+        Create the job that builds the given time point (see createFrame) with
+        the current contours (except for the deferred ones, see
+        _getDeferredContours), cropped like the first time point and focused
+        around the focus contour of the shown time point. The octants are cut
+        at the current slices.
+        """
+        values = self._getContourValues()
+        smoothings = [self._contourSmoothings.get( name ) for name in self._contourNames]
+
+        return Job( createFrame, self._reader, index, self._dataExtent, values, smoothings, self._lodReductions,
+                    self._contourMode == "Discrete", self._getMeshOptimizations(), self._isCompacting(),
+                    self._getSampleRates(), self._getFocusExtent(), self._getOctantBounds() )
+
+    ############################################################################
+
+    def _showFrame( self, frame ):
+        """
+        Show the volume, contours and octants of a (cached) time point. The
+        slices, volume and outline follow the volume of the time point. The
+        octants are only rebuilt from its raw "Head" isosurface if the frame
+        has been built for other slices. The slabs of the previous time point
+        are dropped, the slices show the slices themselves until the slab
+        indices of the time point have been built.
+        """
+        logger.debug( f"_showFrame( {frame.index} )" )
+
+        self._timePoint, self._pendingTimePoint = frame.index, None
+        self._data, self._bricks = frame.image, frame.bricks
+
+        self._image.SetOutput( frame.image )
+
+        for i, (mesh, lods) in enumerate( frame.contours ):
+            self._setContourMeshes( i, mesh, lods )
+
+        if frame.octants is not None and frame.octantBounds == self._getOctantBounds():
+            self._jobQueue.cancel( "Octants" )
+            self._octantSurface = frame.rawSurface
+            self._setOctantMeshes( frame.octants )
+            if self._style == "Automatic": self._updateOctantActorsVisibility( force = True )
+        else:
+            self._setOctantSurface( frame.rawSurface )
+
+        if self._slabIndices is not None:
+            self._slabIndices, self._slabProjections = None, [(None, None)] * 3
+            self._updateSlabIndices()
+
+        self._updateImageResliceActors()
+        self._updateStatistics()
+
+        self._frames.setPlayhead( frame.index )
+        self.timePointChanged.emit( frame.index )
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _updateSlabIndices( self, reuse = False ):
+        """
+        Build the slab indices of the volume for the current slab mode and
+        thickness on a worker thread. If asked for, the indices that are shown
+        are reused, such that a thickness they have been built for before is
+        a lookup (see Neuroviz.Slabs.SlabIndex.withThickness). The slices show
+        the slices themselves (again) if no slabs are projected.
+        """
+        self._jobQueue.cancel( "Slabs" )
+
+        if self._slabMode == "None" or self._slabThickness == 1:
+            self._onSlabIndicesCreated( None )
+            return
+
+        job = Job( createSlabIndices, imageToArray( self._data ), self._slabMode, self._slabThickness,
+                   self._getMemoryBudget(), self._slabIndices if reuse else None )
+        job.signals.finished.connect( self._onSlabIndicesCreated )
+        job.signals.failed.connect( self._onSlabIndicesFailed )
+
+        self._jobQueue.submit( "Slabs", job )
+
+    ############################################################################
+
+    def _updateStatistics( self ):
+        """
+        Measure the tissues of the contour values of the shown time point on a
+        worker thread, using its brick index to skip empty space. The
+        statistics are cached per time point and contour value, so only the
+        values that have not been measured yet are visited.
+        """
+        discrete = self._contourMode == "Discrete"
+        values = sorted( {value for value in self._contourValues.values()
+                          if (self._timePoint, discrete, value) not in self._statistics} )
+
+        if not values:
+            self.statisticsChanged.emit()
+            return
+
+        job = Job( computeStatistics, imageToArray( self._data ), values, self._data.GetSpacing(), discrete,
+                   self._bricks )
+        job.signals.finished.connect( partial( self._onStatisticsComputed, self._timePoint, discrete, values ) )
+        job.signals.failed.connect( self._onStatisticsFailed )
+
+        self._jobQueue.submit( "Statistics", job )
 
     ############################################################################
 
@@ -438,10 +1398,17 @@ class BasicScene( QObject ):
         interaction styles.
         """
         self._contourMappers = [vtkPolyDataMapper() for _ in range( self._nContours ) ]
-        for i, contourMapper in enumerate( self._contourMappers ):
-            contourMapper.SetInputConnection( self._contours[i].GetOutputPort() )
+        for contourMapper in self._contourMappers:
             contourMapper.ScalarVisibilityOff()
 
+        self._contourLODMappers = [[vtkPolyDataMapper() for _ in range( self._nContours )]
+                                   for _ in self._lodReductions]
+        for mappers in self._contourLODMappers:
+            for mapper in mappers: mapper.ScalarVisibilityOff()
+
+        for i, (mesh, lods) in enumerate( self._contours ):
+            self._setContourMeshes( i, mesh, lods )
+
         self._contourActors = [vtkActor() for _ in range( self._nContours ) ]
         for i, contourActor in enumerate( self._contourActors ):
             contourActor.SetMapper( self._contourMappers[i] )
@@ -450,61 +1417,29 @@ class BasicScene( QObject ):
 
     ############################################################################
 
-    def _createOctants( self ):
-        """
-        Creates "octants" which cut the original contour at the location of the
-        current slices.
-        """
-        name = self._contourNames[0]
-
-        # The boxes define the area to extract from the original contour, for
-        # each octant.
-        self._boxes = [vtkBox() for _ in range( 8 )]
-        for box in self._boxes: box.SetBounds( 0, 0, 0, 0, 0, 0 )
-
-        # Create the regular isosurface of the head.
-        self._contour = vtkContourFilter()
-        self._contour.SetInputConnection( self._reader.GetOutputPort() )
-        self._contour.SetValue( 0 , self._contourValues[name] )
-        self._contour.ComputeScalarsOff()
-        self._contour.ComputeGradientsOff()
-        self._contour.ComputeNormalsOff()
-
-        # Create the extractors for each octant.
-        self._extractions = [vtkExtractPolyDataGeometry() for _ in range( 8 )]
-        for i, extraction in enumerate( self._extractions ):
-            extraction.SetInputConnection( self._contour.GetOutputPort() )
-            extraction.SetImplicitFunction( self._boxes[i] )
-            extraction.ExtractInsideOn()
-            extraction.ExtractBoundaryCellsOn()
-
-        # Smooth out the octants after extraction using a windowed sinc filter.
-        # Doing this before extraction will result in strange boundary cells.
-        if name in self._contourSmoothings:
-            radius, stdDev, iters, passBand, angle = self._contourSmoothings[name]
-
-            self._extractionFilters = [vtkWindowedSincPolyDataFilter() for _ in range( 8 )]
-            for i, extractionFilter in enumerate( self._extractionFilters ):
-                extractionFilter.SetInputConnection( self._extractions[i].GetOutputPort() )
-                extractionFilter.SetNumberOfIterations( iters )
-                extractionFilter.BoundarySmoothingOff()
-                extractionFilter.FeatureEdgeSmoothingOff()
-                extractionFilter.SetFeatureAngle( angle )
-                extractionFilter.SetPassBand( passBand )
-                extractionFilter.NonManifoldSmoothingOn()
-                extractionFilter.NormalizeCoordinatesOn()
-                extractionFilter.Update()
-
-            self._extractionNormals = [vtkPolyDataNormals() for _ in range( 8 )]
-            for i, extractionNormal in enumerate( self._extractionNormals ):
-                extractionNormal.SetInputConnection( self._extractionFilters[i].GetOutputPort() )
-                extractionNormal.SetFeatureAngle( angle )
-
-            self._octants = [vtkStripper() for _ in range( 8 )]
-            for i, octant in enumerate( self._octants ):
-                octant.SetInputConnection( self._extractionNormals[i].GetOutputPort() )
-        else:
-            self._octants = self._extractions
+    def _setContourMeshes( self, index, mesh, lods ):
+        """
+        Let the mappers of a contour use the given mesh and decimated meshes.
+        The mesh itself is used for the levels of detail that are missing.
+        """
+        self._contours[index] = (mesh, lods)
+
+        self._contourMappers[index].SetInputData( mesh )
+
+        for level, mappers in enumerate( self._contourLODMappers ):
+            mappers[index].SetInputData( lods[level] if level < len( lods ) else mesh )
+
+    ############################################################################
+
+    def _createOctants( self, surface ):
+        """
+        Creates "octants" which cut the original contour (the given raw "Head"
+        isosurface) at the location of the current slices. The octants are
+        built on a worker thread whenever the slices change, so they start out
+        empty (see _updateOctantActors).
+        """
+        self._octantSurface = surface
+        self._octants = [(vtkPolyData(), []) for _ in range( 8 )]
 
     ############################################################################
 
@@ -514,10 +1449,16 @@ class BasicScene( QObject ):
         "Opacity".
         """
         self._octantMappers = [vtkPolyDataMapper() for _ in range( 8 )]
-        for i, octantMapper in enumerate( self._octantMappers ):
-            octantMapper.SetInputConnection( self._octants[i].GetOutputPort() )
+        for octantMapper in self._octantMappers:
             octantMapper.ScalarVisibilityOff()
 
+        self._octantLODMappers = [[vtkPolyDataMapper() for _ in range( 8 )]
+                                  for _ in self._lodReductions]
+        for mappers in self._octantLODMappers:
+            for mapper in mappers: mapper.ScalarVisibilityOff()
+
+        self._setOctantMeshes( self._octants )
+
         self._octantActors = [vtkActor() for _ in range( 8 )]
         for i, octantActor in enumerate( self._octantActors ):
             octantActor.SetMapper( self._octantMappers[i] )
@@ -525,13 +1466,96 @@ class BasicScene( QObject ):
 
     ############################################################################
 
+    def _setOctantMeshes( self, octants ):
+        """
+        Let the mappers of the octants use the given meshes and decimated
+        meshes. All octants are swapped at once, before the next frame, such
+        that rendering never shows (or waits for) partially built octants.
+        """
+        self._octants = octants
+
+        for i, (mesh, lods) in enumerate( octants ):
+            self._octantMappers[i].SetInputData( mesh )
+
+            for level, mappers in enumerate( self._octantLODMappers ):
+                mappers[i].SetInputData( lods[level] if level < len( lods ) else mesh )
+
+    ############################################################################
+
+    def _createVolume( self ):
+        """
+        Creates a volume that is rendered directly by a multi-threaded ray cast
+        mapper on the CPU, so no GPU is needed. The transfer functions map the
+        contour values onto the colors of the contours, such that thresholds can
+        be changed without extracting any geometry. Used in the "Volume"
+        interaction style.
+        """
+        spacing = min( self._data.GetSpacing() )
+
+        # The image and ray sample distances are adapted automatically to the
+        # time that is allocated for a frame: coarse while the camera is being
+        # manipulated (see TargetFPS), fine once it stops.
+        self._volumeMapper = vtkFixedPointVolumeRayCastMapper()
+        self._volumeMapper.SetInputConnection( self._image.GetOutputPort() )
+        self._volumeMapper.AutoAdjustSampleDistancesOn()
+        self._volumeMapper.SetSampleDistance( spacing )
+        self._volumeMapper.SetInteractiveSampleDistance( 4 * spacing )
+        self._volumeMapper.SetMinimumImageSampleDistance( 1.0 )
+        self._volumeMapper.SetMaximumImageSampleDistance( 8.0 )
+
+        self._volumeColors = vtkColorTransferFunction()
+        self._volumeOpacities = vtkPiecewiseFunction()
+
+        self._volumeProperty = vtkVolumeProperty()
+        self._volumeProperty.SetColor( self._volumeColors )
+        self._volumeProperty.SetScalarOpacity( self._volumeOpacities )
+        self._volumeProperty.SetInterpolationTypeToLinear()
+        self._volumeProperty.ShadeOn()
+
+        self._volume = vtkVolume()
+        self._volume.SetMapper( self._volumeMapper )
+        self._volume.SetProperty( self._volumeProperty )
+
+    ############################################################################
+
+    def _updateVolumeTransferFunctions( self ):
+        """
+        Update the transfer functions of the volume. The scalar range starting
+        at each contour value is shown in the color of that contour. The "Head"
+        uses the current opacity value, the active contour is (nearly) opaque
+        and the other contours are not shown.
+        """
+        if self._style != "Volume": return
+
+        self._volumeColors.RemoveAllPoints()
+        self._volumeOpacities.RemoveAllPoints()
+
+        valuesAndNames = sorted( (v, n) for n, v in self._contourValues.items() )
+        previousOpacity = 0.0
+
+        self._volumeOpacities.AddPoint( 0, 0.0 )
+
+        for value, name in valuesAndNames:
+            if name == self._contourNames[0]: opacity = 0.1 * self._opacity
+            elif name == self._activeContourName: opacity = 0.9
+            else: opacity = 0.0
+
+            # Use steep ramps to have a clear transition between contours.
+            self._volumeOpacities.AddPoint( value - 0.5, previousOpacity )
+            self._volumeOpacities.AddPoint( value, opacity )
+            self._volumeColors.AddRGBPoint( value, *self._colors.GetColor3d( name ) )
+
+            previousOpacity = opacity
+
+    ############################################################################
+
     def _createImageResliceActors( self ):
         """
         Creates three orthogonal planes that cut through the volumetric data.
         Does not use the VTKImagePlaneWidget to be able to control the reslicing
         purely from the GUI. This creates a smoother interaction.
         """
-        self._center = self._reader.GetOutput().GetCenter()
+        self._center = self._data.GetCenter()
 
         # The matrices define the normals and position of each of the planes.
         coronal = vtkMatrix4x4()
@@ -555,7 +1579,7 @@ class BasicScene( QObject ):
         orientations = [coronal, sagittal, transverse]
 
         self._imageResliceLut = vtkLookupTable()
-        self._imageResliceLut.SetRange( 0, 255 )
+        self._imageResliceLut.SetRange( self.getScalarRange() )
         self._imageResliceLut.SetValueRange( 0.0, 1.0 )
         self._imageResliceLut.SetSaturationRange( 0.0, 0.0 )
         self._imageResliceLut.SetRampToLinear()
@@ -563,7 +1587,7 @@ class BasicScene( QObject ):
 
         self._imageReslices = [vtkImageReslice() for _ in range( 3 )]
         for i, imageReslice in enumerate( self._imageReslices ):
-            imageReslice.SetInputConnection( self._reader.GetOutputPort() )
+            imageReslice.SetInputConnection( self._image.GetOutputPort() )
             imageReslice.SetResliceAxes( orientations[i] )
             imageReslice.SetOutputDimensionality( 2 )
             imageReslice.SetInterpolationModeToLinear()
@@ -580,6 +1604,61 @@ class BasicScene( QObject ):
 
     ############################################################################
 
+    def _createObliqueSliceActor( self ):
+        """
+        Creates a plane that cuts through the volumetric data in any direction.
+        The slice is resampled on a fixed square grid that covers the volume in
+        every direction, such that the output buffers of the reslicing are
+        reused from frame to frame. Only the part of the grid that covers the
+        volume is displayed, and thus resampled.
+        """
+        self._obliqueAxes = vtkMatrix4x4()
+
+        self._obliqueReslice = vtkImageReslice()
+        self._obliqueReslice.SetInputConnection( self._image.GetOutputPort() )
+        self._obliqueReslice.SetResliceAxes( self._obliqueAxes )
+        self._obliqueReslice.SetOutputDimensionality( 2 )
+        self._obliqueReslice.SetOutputOrigin( 0.0, 0.0, 0.0 )
+        self._obliqueReslice.SetBackgroundLevel( self.getScalarRange()[0] )
+
+        self._obliqueResliceMapper = vtkImageMapToColors()
+        self._obliqueResliceMapper.SetLookupTable( self._imageResliceLut )
+        self._obliqueResliceMapper.SetInputConnection( self._obliqueReslice.GetOutputPort() )
+
+        self._obliqueSliceActor = vtkImageActor()
+        self._obliqueSliceActor.GetMapper().SetInputConnection( self._obliqueResliceMapper.GetOutputPort() )
+        self._obliqueSliceActor.SetUserMatrix( self._obliqueAxes )
+
+        self._setObliqueSliceQuality( reduced = False )
+
+    ############################################################################
+
+    def _createObliqueSliceWidget( self ):
+        """
+        Creates the widget to move the oblique slice in the 3D view: drag the
+        normal to rotate the plane, the plane to push it along its normal and
+        the center to move it within the plane.
+        """
+        representation = vtkImplicitPlaneRepresentation()
+        representation.SetPlaceFactor( 1.0 )
+        representation.PlaceWidget( self._data.GetBounds() )
+        representation.SetOrigin( self._data.GetCenter() )
+        representation.SetNormal( self._obliqueNormal )
+        representation.OutlineTranslationOff()
+        representation.ScaleEnabledOff()
+        representation.OutsideBoundsOff()
+        representation.DrawPlaneOff()
+
+        self._obliqueSliceWidget = vtkImplicitPlaneWidget2()
+        self._obliqueSliceWidget.SetInteractor( self._interactor )
+        self._obliqueSliceWidget.SetRepresentation( representation )
+        self._obliqueSliceWidget.AddObserver( "InteractionEvent", self._onObliqueSliceMoved )
+        self._obliqueSliceWidget.AddObserver( "EndInteractionEvent", self._onObliqueSliceReleased )
+
+        self._updateObliqueSliceActor()
+
+    ############################################################################
+
     def _createRendererAndInteractor( self ):
         """
         Create a renderer and interactor for the scene.
@@ -590,132 +1669,922 @@ class BasicScene( QObject ):
 
         self._renderWindow.AddRenderer( self._renderer )
 
-        # Enable depth peeling to correctly render translucent polygonal
-        # geometry. See https://vtk.org/Wiki/VTK/Depth_Peeling.
+        # Allow depth peeling to correctly render translucent polygonal
+        # geometry. See https://vtk.org/Wiki/VTK/Depth_Peeling. Whether it is
+        # used is decided before every frame (see _onRenderStarted).
         self._renderWindow.SetAlphaBitPlanes( True )
         self._renderWindow.SetMultiSamples( 0 )
-        self._renderer.SetUseDepthPeeling( True )
-        self._renderer.SetMaximumNumberOfPeels( 100 )
         self._renderer.SetOcclusionRatio( 0.1 )
+        self._rendererTags.append( self._renderer.AddObserver( "StartEvent", self._onRenderStarted ) )
+
+        # Measure the frame times to adapt the level of detail while interacting.
+        self._rendererTags.append( self._renderer.AddObserver( "EndEvent", self._onRenderEnded ) )
+        self._interactor.SetDesiredUpdateRate( self._targetFPS )
+
+        self._interactor.Initialize()
+        self._interactor.Start()
+
+    ############################################################################
+
+    def _createEmptyRenderer( self ):
+        """
+        Creates an empty renderer for the scene.
+        """
+        self._removeRenderer()
+
+        self._renderer = vtkRenderer()
+        self._renderer.SetBackground( self._colors.GetColor3d( "Background" ) )
+
+        self._renderWindow.AddRenderer( self._renderer )
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _removeRenderer( self ):
+        """
+        Remove the renderer (if any) from the render window, along with its
+        observers, such that a rebuilt scene does not render (or measure) the
+        previous one.
+        """
+        if self._renderer is None: return
+
+        for tag in self._rendererTags: self._renderer.RemoveObserver( tag )
+        self._rendererTags = []
+
+        self._renderWindow.RemoveRenderer( self._renderer )
+        self._renderer = None
+
+    ############################################################################
+
+    def _setLevelOfDetail( self, level = None ):
+        """
+        Let the contour and octant actors use the decimated meshes of the given
+        level of detail, or the full resolution meshes if no level is given.
+        """
+        logger.debug( f"_setLevelOfDetail( {level} )" )
+
+        if level is None:
+            contourMappers, octantMappers = self._contourMappers, self._octantMappers
+        else:
+            contourMappers = self._contourLODMappers[level]
+            octantMappers = self._octantLODMappers[level]
+
+        for actor, mapper in zip( self._contourActors, contourMappers ):
+            actor.SetMapper( mapper )
+
+        for actor, mapper in zip( self._octantActors, octantMappers ):
+            actor.SetMapper( mapper )
+
+    ############################################################################
+
+    def _getTranslucentActors( self ):
+        """
+        Get the visible actors of the renderer that are translucent.
+        """
+        actors = self._renderer.GetActors()
+        actors = [actors.GetItemAsObject( i ) for i in range( actors.GetNumberOfItems() )]
+
+        return [actor for actor in actors if actor.GetVisibility() and actor.GetProperty().GetOpacity() < 1]
+
+    ############################################################################
+
+    def _applyTransparencyStrategy( self, strategy ):
+        """
+        Configure the renderer to render translucent geometry using the given
+        strategy.
+
+        -> "Opaque"         : There is no translucent geometry, so no depth
+                              peeling is done.
+        -> "DepthPeeling"   : Depth peeling until (nearly) all layers are
+                              peeled. Exact, but expensive.
+        -> "CappedPeeling"  : Depth peeling with a limited number of peels.
+        -> "SortedLayer"    : Only the front layer of each translucent actor is
+                              rendered (back faces are culled), the actors are
+                              blended from back to front.
+        """
+        logger.debug( f"_applyTransparencyStrategy( {strategy} )" )
+
+        self._renderer.SetUseDepthPeeling( strategy in ("DepthPeeling", "CappedPeeling") )
+        self._renderer.SetMaximumNumberOfPeels( self._cappedPeels if strategy == "CappedPeeling" else 100 )
+
+        if strategy != "SortedLayer": self._sortTranslucentActors( [] )
+
+        self._activeStrategy = strategy
+
+    ############################################################################
+
+    def _sortTranslucentActors( self, actors ):
+        """
+        Cull the back faces of the given translucent actors and (re)add them to
+        the renderer from back to front, such that they are blended in the
+        right order. Actors that are no longer translucent are restored. The
+        renderer is only changed when the order has changed.
+        """
+        position = np.array( self._renderer.GetActiveCamera().GetPosition() ) if actors else None
+        distance = lambda actor : np.linalg.norm( np.array( actor.GetCenter() ) - position )
+
+        actors = sorted( actors, key = distance, reverse = True )
+        if actors == self._sortedActors: return
+
+        for actor in self._sortedActors: actor.GetProperty().BackfaceCullingOff()
+
+        self._sortedActors = actors
+
+        for actor in self._sortedActors:
+            actor.GetProperty().BackfaceCullingOn()
+            self._renderer.RemoveActor( actor )
+            self._renderer.AddActor( actor )
+
+    ############################################################################
+
+    def _measureTransparencyStrategies( self ):
+        """
+        Measure the frame time of each strategy for the translucent geometry in
+        the current interaction style (see _measureFrameTimes). The most exact
+        strategy that meets the target frame rate is chosen, or the fastest one
+        if none does. The choice is remembered for the interaction style. The
+        measurement waits for the one that is running (if any) to finish.
+        """
+        logger.debug( f"_measureTransparencyStrategies()" )
+
+        if not self._isMeasuringStrategies: return
+
+        if self._measurement is not None:
+            QTimer.singleShot( 100, self._measureTransparencyStrategies )
+            return
+
+        translucentActors = self._getTranslucentActors()
+
+        if not translucentActors or self._style in self._measuredStrategies:
+            self._isMeasuringStrategies = False
+            return
+
+        def applyStrategy( strategy ):
+            self._applyTransparencyStrategy( strategy )
+            if strategy == "SortedLayer": self._sortTranslucentActors( translucentActors )
+
+        self._measureFrameTimes( ("DepthPeeling", "CappedPeeling", "SortedLayer"), applyStrategy,
+                                 partial( self._onTransparencyStrategiesMeasured, self._style ) )
+
+    ############################################################################
+
+    def _onTransparencyStrategiesMeasured( self, style, frameTimes ):
+        """
+        Choose the strategy for translucent geometry in the given interaction
+        style, given the frame time of each strategy.
+        """
+        budget = 1.0 / self._targetFPS
+        fastest = min( frameTimes, key = frameTimes.get )
+        strategy = next( (s for s, t in frameTimes.items() if t <= budget), fastest )
+
+        self._measuredStrategies[style] = strategy
+        self._isMeasuringStrategies = False
+
+        timings = ", ".join( f"{s} {1000 * t:.1f} ms" for s, t in frameTimes.items() )
+        logger.info( f"Using {strategy} ({1000 * frameTimes[strategy]:.1f} ms) for translucent geometry in \"{style}\" style ({timings})." )
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _measureFrameTimes( self, options, apply, finish, frames = 5 ):
+        """
+        Measure the frame time of each of the given options (e.g. strategies),
+        which are set up by calling apply with the option. The frames are
+        rendered one at a time from a timer, such that the GUI stays
+        responsive, and only once the scene has been loaded and while the
+        camera is not being manipulated. The first frame of each option
+        includes setting it up, so the median of the given number of frames
+        after it is taken. Finally, finish is called with the frame time of
+        each option.
+        """
+        pending = [(option, i) for option in options for i in range( frames + 1 )]
+        self._measurement = (pending, {option: [] for option in options}, apply, finish)
+
+        QTimer.singleShot( 0, partial( self._onMeasurementTimeout, self._measurement ) )
+
+    ############################################################################
+
+    def _cancelMeasurement( self ):
+        """
+        Cancel the running measurement (see _measureFrameTimes), if any. A
+        measurement of the transparency strategies is started again by the
+        next frame.
+        """
+        self._measurement = None
+        self._isMeasuringStrategies = False
+
+    ############################################################################
+
+    def _measureMeshFormats( self ):
+        """
+        Measure the frame time of the optimized contours as plain (cache
+        ordered) triangles and as triangle strips, which are created from them
+        once (see _measureFrameTimes). The fastest format is kept and used for
+        the contours from now on. The measurement waits until the contours are
+        shown and for the measurement that is running (if any) to finish. The
+        format remains pending until it has been measured, such that a
+        cancelled measurement is started again (see setInteractionStyle).
+        """
+        logger.debug( f"_measureMeshFormats()" )
+
+        if not self._isMeshFormatPending or self._meshFormat != "Automatic": return
+        if not any( self._renderer.HasViewProp( actor ) for actor in self._contourActors ): return
+
+        if self._measurement is not None:
+            QTimer.singleShot( 100, self._measureMeshFormats )
+            return
+
+        meshes = {"Triangles": [mesh for mesh, _ in self._contours]}
+        meshes["Strips"] = [stripSurface( mesh ) for mesh in meshes["Triangles"]]
+
+        def applyFormat( meshFormat ):
+            for i, mesh in enumerate( meshes[meshFormat] ): self._contourMappers[i].SetInputData( mesh )
+
+        self._measureFrameTimes( tuple( meshes ), applyFormat, partial( self._onMeshFormatsMeasured, meshes ) )
+
+    ############################################################################
+
+    def _onMeshFormatsMeasured( self, meshes, frameTimes ):
+        """
+        Keep the fastest format for the contours, given the meshes and the
+        frame time of each format. Contours that have been replaced during the
+        measurement keep their new meshes.
+        """
+        self._meshFormat = min( frameTimes, key = frameTimes.get )
+        self._isMeshFormatPending = False
+
+        for i, (mesh, lods) in enumerate( self._contours ):
+            if mesh is meshes["Triangles"][i]: mesh = meshes[self._meshFormat][i]
+            self._setContourMeshes( i, mesh, lods )
+
+        sizes = {f: sum( mesh.GetActualMemorySize() for mesh in formatMeshes ) / 1024
+                 for f, formatMeshes in meshes.items()}
+        timings = ", ".join( f"{f} {1000 * t:.1f} ms ({sizes[f]:.1f} MB)" for f, t in frameTimes.items() )
+        logger.info( f"Using {self._meshFormat} ({1000 * frameTimes[self._meshFormat]:.1f} ms) for the contours ({timings})." )
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _updateOctantActors( self ):
+        """
+        Update the octant actors so they match the current slice positions.
+        The octants are optimized like the "Head" (see _getMeshOptimizations)
+        and replaced once they have been built.
+        """
+        logger.debug( f"_updateOctantActors()" )
+
+        # Build the octants into new meshes on a worker thread, cancelling the
+        # build for the previous slice positions. The worker gets its own
+        # (shallow) copy of the surface, see setContourInfo.
+        surface = vtkPolyData()
+        surface.ShallowCopy( self._octantSurface )
+
+        job = Job( createOctants, surface, self._getOctantBounds(), self._contourSmoothings.get( self._contourNames[0] ),
+                   self._lodReductions, self._getMeshOptimizations()[0] )
+        job.signals.finished.connect( self._onOctantsCreated )
+        job.signals.failed.connect( self._onOctantsFailed )
+
+        self._jobQueue.submit( "Octants", job )
+
+    ############################################################################
+
+    def _getOctantBounds( self ):
+        """
+        Get the bounds of the octants at the current slice positions, in the
+        order of the octant actors.
+        """
+        slices = [None for _ in range( 3 )]
+
+        # If slicing along an axis is disabled, cut the contour right in the
+        # middle. This will make sure all octants are used instead of removing
+        # some. The handling of the octants as one unit will be done in the
+        # MouseInteractorToggleOpacity class.
+        for i, slice in enumerate( self._slices ):
+            if slice is None: slices[i] = (self._min[i] + self._max[i]) // 2
+            else: slices[i] = slice
+
+        xRanges = ((self._min[0], slices[0]), (slices[0], self._max[0]))
+        yRanges = ((self._min[1], slices[1]), (slices[1], self._max[1]))
+        zRanges = ((self._min[2], slices[2]), (slices[2], self._max[2]))
+
+        # The octant with index 4 * i + 2 * j + k lies in the i'th x-range, the
+        # j'th y-range and the k'th z-range.
+        return [(*xRange, *yRange, *zRange) for xRange in xRanges for yRange in yRanges for zRange in zRanges]
+
+    ############################################################################
+
+    def _updateOctantActorsVisibility( self, DOP = None, force = False ):
+        """
+        Update the octant actor such that the octant facing the camera is
+        not shown. Updates the octants on sign changes of the DOP vector
+        (Direction Of Projection). Forcing an update is also supported to allow
+        for changes in slicing. Used in the "Automatic" interaction style.
+        """
+        logger.debug( f"_updateOctantActorsVisibility( {DOP}, {force} )" )
+
+        if not force:
+            signChanged = False
+
+            for i in range( 3 ):
+                if self._slices[i] is not None:
+                    if self._DOP[i] >= 0:
+                        if DOP[i] < 0: signChanged = True
+                    elif DOP[i] >= 0: signChanged = True
+
+            if signChanged: self._DOP = DOP
+            else: return
+
+        # Contains the id's of the octants which need not to be shown.
+        notToShow = set( range( 8 ) )
+
+        if self._slices[0] is not None:
+            if self._DOP[0] >= 0: notToShow &= {0, 1, 2, 3}
+            else: notToShow &= {4, 5, 6, 7}
+
+        if self._slices[1] is not None:
+            if self._DOP[1] >= 0: notToShow &= {0, 1, 4, 5}
+            else: notToShow &= {2, 3, 6, 7}
+
+        if self._slices[2] is not None:
+            if self._DOP[2] >= 0: notToShow &= {0, 2, 4, 6}
+            else: notToShow &= {1, 3, 5, 7}
+
+        toShow = set( range( 8 ) ) - notToShow
+
+        for index in toShow: self._octantActors[index].SetVisibility( True )
+
+        for index in notToShow: self._octantActors[index].SetVisibility( False )
+
+    ############################################################################
+
+    def _updateImageResliceActors( self ):
+        """
+        Update the position of the image planes that cut through the volumetric
+        data. Only the slabs of the slices that have moved to another slice are
+        projected again (see _projectSlab).
+        """
+        logger.debug( f"_updateImageResliceActors()" )
+
+        for i, (slice, imageReslice) in enumerate( zip( self._slices, self._imageReslices ) ):
+            if slice is None:
+                self._imageResliceActors[i].SetVisibility( False )
+            else:
+                self._imageResliceActors[i].SetVisibility( True )
+
+                # Update the center of the slice in the user matrix.
+                matrix = imageReslice.GetResliceAxes()
+                matrix.SetElement( i, 3, self._slices[i] )
+
+                if self._slabIndices is None:
+                    imageReslice.SetInputConnection( self._image.GetOutputPort() )
+                else:
+                    projection = self._projectSlab( i, self._slices[i] )
+                    if imageReslice.GetInput() is not projection: imageReslice.SetInputData( projection )
+
+    ############################################################################
+
+    def _projectSlab( self, axis, position ):
+        """
+        Project the slab around the slice at the given position along the
+        given axis (0, 1 or 2 for the x-, y- or z-axis) onto a single slice at
+        that position. The last projection along each axis is kept, which is
+        only moved as long as the slab stays around the same slice.
+        """
+        origin, spacing = list( self._data.GetOrigin() ), self._data.GetSpacing()
+        slices = self._data.GetDimensions()[axis]
+
+        center = min( max( round( (position - origin[axis]) / spacing[axis] ), 0 ), slices - 1 )
+        origin[axis] = position
+
+        lastCenter, image = self._slabProjections[axis]
+
+        if center == lastCenter:
+            image.SetOrigin( *origin )
+        else:
+            projection = np.expand_dims( self._slabIndices[axis].project( center ), 2 - axis )
+            image = arrayToImage( projection, spacing, origin )
+            self._slabProjections[axis] = (center, image)
+
+        return image
+
+    ############################################################################
+
+    def _setObliqueSliceQuality( self, reduced ):
+        """
+        Let the oblique slice be resampled using nearest neighbour
+        interpolation on a grid that is reduced by the oblique reduction factor
+        (while its plane is being dragged), or using the oblique interpolation
+        on the grid of the volume otherwise.
+        """
+        spacing = min( self._data.GetSpacing() )
+        if reduced: spacing *= self._obliqueReduction
+
+        # Half of the diagonal of the volume, in samples of the grid.
+        bounds = self._data.GetBounds()
+        size = int( np.ceil( np.linalg.norm( np.subtract( bounds[1::2], bounds[::2] ) ) / 2 / spacing ) )
+
+        self._obliqueReslice.SetOutputSpacing( spacing, spacing, spacing )
+        self._obliqueReslice.SetOutputExtent( -size, size, -size, size, 0, 0 )
+
+        if reduced: self._obliqueReslice.SetInterpolationModeToNearestNeighbor()
+        elif self._obliqueInterpolation == "Linear": self._obliqueReslice.SetInterpolationModeToLinear()
+        else: self._obliqueReslice.SetInterpolationModeToCubic()
+
+    ############################################################################
+
+    def _updateObliqueSliceActor( self ):
+        """
+        Update the orientation and position of the oblique slice to the plane
+        of its widget. The center of the grid is the center of the volume,
+        projected onto the plane, and only the part of the grid that covers
+        the volume is displayed.
+        """
+        representation = self._obliqueSliceWidget.GetRepresentation()
+        normal, origin = np.array( representation.GetNormal() ), np.array( representation.GetOrigin() )
+
+        u, v = [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
+        vtkMath.Perpendiculars( normal, u, v, 0.0 )
+
+        center = np.array( self._data.GetCenter() )
+        center -= np.dot( center - origin, normal ) * normal
+
+        for i in range( 3 ):
+            for j, axis in enumerate( (u, v, normal, center) ):
+                self._obliqueAxes.SetElement( i, j, axis[i] )
+
+        # Display the bounding box of the corners of the volume within the plane.
+        bounds = self._data.GetBounds()
+        corners = np.array( [(x, y, z) for x in bounds[0:2] for y in bounds[2:4] for z in bounds[4:6]] ) - center
+        spacing = self._obliqueReslice.GetOutputSpacing()[0]
+        extent = self._obliqueReslice.GetOutputExtent()
+
+        displayExtent = []
+        for axis in (u, v):
+            coordinates = corners @ axis / spacing
+            displayExtent += [max( int( np.floor( coordinates.min() ) ), extent[0] ),
+                              min( int( np.ceil( coordinates.max() ) ), extent[1] )]
+
+        self._obliqueSliceActor.SetDisplayExtent( *displayExtent, 0, 0 )
+
+    ############################################################################
+
+    def _updateObliqueSliceVisibility( self ):
+        """
+        Show or hide the oblique slice and its widget.
+        """
+        self._obliqueSliceActor.SetVisibility( self._obliqueSlice )
+
+        # Re-enabling adds the representation of the widget to the renderer again.
+        self._obliqueSliceWidget.SetEnabled( False )
+        self._obliqueSliceWidget.SetEnabled( self._obliqueSlice )
+
+    ############################################################################
+
+    def _onCameraMoved( self, camera, event ):
+        """
+        Update the contour extraction actor based on the current direction of
+        projection. Used in the "Automatic" interaction style.
+        """
+        logger.debug( f"_onCameraMoved( {camera.GetClassName()}, {event})" )
+
+        self._updateOctantActorsVisibility( camera.GetDirectionOfProjection() )
+
+    ############################################################################
+
+    def _onInteractionStarted( self, style, event ):
+        """
+        Switch to the decimated meshes when the user starts interacting.
+        """
+        logger.debug( f"_onInteractionStarted( {style.GetClassName()}, {event} )" )
+
+        if not self._lodReductions: return
+
+        self._isInteracting = True
+        self._setLevelOfDetail( self._lodLevel )
+
+    ############################################################################
+
+    def _onInteractionEnded( self, style, event ):
+        """
+        Restore the full resolution meshes when the user stops interacting.
+        """
+        logger.debug( f"_onInteractionEnded( {style.GetClassName()}, {event} )" )
+
+        if not self._isInteracting: return
+
+        self._isInteracting = False
+        self._setLevelOfDetail( None )
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _onMeasurementTimeout( self, measurement ):
+        """
+        Render the next frame of a measurement (see _measureFrameTimes), unless
+        it has been cancelled or replaced.
+        """
+        if measurement is not self._measurement: return
+
+        pending, renderTimes, apply, finish = measurement
+
+        if self.isLoading() or self._isInteracting:
+            QTimer.singleShot( 100, partial( self._onMeasurementTimeout, measurement ) )
+            return
+
+        option, i = pending.pop( 0 )
+        if i == 0: apply( option )
+
+        self._renderWindow.Render()
+        if i > 0: renderTimes[option].append( self._renderer.GetLastRenderTimeInSeconds() )
+
+        if pending:
+            QTimer.singleShot( 0, partial( self._onMeasurementTimeout, measurement ) )
+            return
+
+        self._measurement = None
+        finish( {option: float( np.median( times ) ) for option, times in renderTimes.items()} )
+
+    ############################################################################
+
+    def _onContourCreated( self, index, result ):
+        """
+        Show a contour that has been created on a worker thread. A new raw
+        "Head" isosurface replaces the one that is cut into octants.
+        """
+        logger.debug( f"_onContourCreated( {index} )" )
+
+        mesh, lods, rawSurface = result
+        self._setContourMeshes( index, mesh, lods )
+
+        if rawSurface is not None: self._setOctantSurface( rawSurface )
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _onContourFailed( self, contourName, deferred, dirty, error ):
+        """
+        Keep showing the previous contour when a contour could not be built.
+        A contour that was deferred or dirty is so again, such that it is
+        built once it is asked for or shown again.
+        """
+        logger.warning( f"Unable to build contour {contourName}: {error}" )
+
+        if deferred: self._deferredContours.add( contourName )
+        if dirty: self._dirtyContours.add( contourName )
+
+    ############################################################################
+
+    def _updateFrame( self, timePoint, index, result ):
+        """
+        Let the cached frame of the given time point (if it is still cached)
+        use a contour that has been created for it on a worker thread. A new
+        raw "Head" isosurface replaces the one of the frame, whose octants are
+        then cut again when the frame is shown.
+        """
+        frame = self._frames.get( timePoint )
+        if frame is None: return
+
+        mesh, lods, rawSurface = result
+        contours = list( frame.contours )
+        contours[index] = (mesh, lods)
+
+        if rawSurface is None:
+            frame = Frame( timePoint, frame.image, frame.bricks, contours, frame.rawSurface, frame.octants,
+                           frame.octantBounds )
+        else:
+            frame = Frame( timePoint, frame.image, frame.bricks, contours, rawSurface )
+
+        self._frames.add( frame )
+
+    ############################################################################
+
+    def _setOctantSurface( self, surface ):
+        """
+        Let the octants cut the given raw "Head" isosurface, which has been
+        extracted using the current smoothing of the "Head" (see
+        Neuroviz.Contours.createContour), the rest of which is applied to the
+        octants. The octants are rebuilt right away if they are shown,
+        otherwise when they are shown again.
+        """
+        self._octantSurface = surface
+
+        if self._style in ("Interactive", "Automatic"): self._updateOctantActors()
+
+    ############################################################################
+
+    def _onOctantsCreated( self, octants ):
+        """
+        Show the octants that have been built on a worker thread.
+        """
+        logger.debug( f"_onOctantsCreated()" )
+
+        self._setOctantMeshes( octants )
+
+        if self._style == "Automatic":
+            self._updateOctantActorsVisibility( force = True )
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _onOctantsFailed( self, error ):
+        """
+        Keep showing the previous octants when the octants could not be built.
+        They are built again when the slices move.
+        """
+        logger.warning( f"Unable to build the octants: {error}" )
+
+    ############################################################################
+
+    def _onObliqueSliceMoved( self, widget, event ):
+        """
+        Let the oblique slice follow its plane while it is being dragged, on
+        the reduced grid. The slice is refined as soon as the plane stops.
+        """
+        self._setObliqueSliceQuality( reduced = True )
+        self._updateObliqueSliceActor()
+
+        self._obliqueRefineTimer.start( 200 )
+
+    ############################################################################
+
+    def _onObliqueSliceReleased( self, widget, event ):
+        """
+        Refine the oblique slice when its plane is released.
+        """
+        logger.debug( f"_onObliqueSliceReleased( {widget.GetClassName()}, {event} )" )
+
+        self._obliqueRefineTimer.stop()
+        self._onObliqueSliceStopped()
+
+    ############################################################################
+
+    def _onObliqueSliceStopped( self ):
+        """
+        Resample the oblique slice at full quality, once its plane has stopped
+        moving, and store the normal of the plane.
+        """
+        logger.debug( f"_onObliqueSliceStopped()" )
+
+        self._setObliqueSliceQuality( reduced = False )
+        self._updateObliqueSliceActor()
+        self._renderWindow.Render()
+
+        normal = self._obliqueSliceWidget.GetRepresentation().GetNormal()
+        self._settings.setValue( f"{__class__.__name__}/ObliqueNormal", list( normal ) )
+
+    ############################################################################
+
+    def _onFrameReady( self, index ):
+        """
+        Show a time point that has been built on a worker thread, if it has
+        been asked for in the meantime.
+        """
+        if index == self._pendingTimePoint: self._showFrame( self._frames.get( index ) )
+
+    ############################################################################
+
+    def _onPlaybackTimeout( self ):
+        """
+        Show the next time point (wrapping around at the end of the series),
+        unless it has not been prefetched yet, in which case the current time
+        point is held until the next tick.
+        """
+        index = (self._timePoint + 1) % self._timePoints
+        frame = self._frames.get( index )
+
+        if frame is None: logger.debug( f"Time point {index} is not ready, holding time point {self._timePoint}." )
+        else: self._showFrame( frame )
+
+    ############################################################################
+
+    def _onSlabIndicesCreated( self, indices ):
+        """
+        Let the slices show the projections of the slabs, using the slab
+        indices that have been built on a worker thread (or the slices
+        themselves if None).
+        """
+        logger.debug( f"_onSlabIndicesCreated()" )
+
+        self._slabIndices = indices
+        self._slabProjections = [(None, None)] * 3
+
+        self._updateImageResliceActors()
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _onSlabIndicesFailed( self, error ):
+        """
+        Let the slices show the slices themselves when the slab indices could
+        not be built. They are built again when the slabs change.
+        """
+        logger.warning( f"Unable to build the slab indices: {error}" )
+
+        self._onSlabIndicesCreated( None )
+
+    ############################################################################
+
+    def _onStatisticsComputed( self, timePoint, discrete, values, statistics ):
+        """
+        Cache the statistics that have been measured on a worker thread.
+        """
+        logger.debug( f"_onStatisticsComputed( {timePoint}, {discrete}, {values} )" )
+
+        for value, result in zip( values, statistics ):
+            self._statistics[(timePoint, discrete, value)] = result
+
+        self.statisticsChanged.emit()
+
+    ############################################################################
+
+    def _onStatisticsFailed( self, error ):
+        """
+        Report statistics that could not be measured. Nothing is cached for
+        them, so they are measured again by the next update (see
+        _updateStatistics).
+        """
+        logger.warning( f"Unable to measure the statistics: {error}" )
+
+    ############################################################################
+
+    def _onPreviewLoaded( self, interactionStyle, result ):
+        """
+        Build the scene from the downsampled volume and its contours, using the
+        given interaction style. The full resolution contours are created next.
+        """
+        logger.debug( f"_onPreviewLoaded( {interactionStyle} )" )
+
+        logger.info( f"File {self._reader.GetFileName()} succesfully read!" )
+
+        self._data, self._previewImage, self._contours, rawSurface, self._dataExtent = result
+        if self._dataExtent is None: self._cropReach = None
+        self._timePoints = self._reader.GetNumberOfTimePoints() if isinstance( self._reader, VolumeReader ) else 1
+        image = self._previewImage
+
+        # The pipelines take the volume from this producer, such that the full
+        # resolution volume can replace the downsampled one later on.
+        self._image = vtkTrivialProducer()
+        self._image.SetOutput( image )
+
+        self._removeRenderer()
+
+        self._createOutlineActor()
+        self._createContourActors()
+        self._createOctants( rawSurface )
+        self._createOctantActors()
+        self._createVolume()
+        self._createImageResliceActors()
+        self._createObliqueSliceActor()
+        self._createRendererAndInteractor()
+        self._createObliqueSliceWidget()
+
+        self.setInteractionStyle( interactionStyle )
+        self._updateSlabIndices()
+
+        self._statistics = {}           # The statistics of each time point and contour value.
+        self._updateStatistics()
+
+        self._settings.setValue( f"{__class__.__name__}/InteractionStyle", self._style )
+
+        self._isPreviewLoaded = True
+        self.previewLoaded.emit()
 
-        self._interactor.Initialize()
-        self._interactor.Start()
+        if self._isCancelPending:
+            logger.info( f"Loading {self._reader.GetFileName()} cancelled." )
+            self.loadingFinished.emit( False )
+        else:
+            self._loadFullResolution()
 
     ############################################################################
 
-    def _createEmptyRenderer( self ):
+    def _onFullResolutionLoaded( self, image, values, smoothings, result ):
         """
-        Creates an empty renderer for the scene.
+        Replace the downsampled volume and contours by the full resolution
+        ones. Contours that have been edited or built in the meantime are
+        skipped, as they are being extracted already. In "Background" mode, the
+        deferred contours are built next (see _buildDeferredContours).
         """
-        self._renderer = vtkRenderer()
-        self._renderer.SetBackground( self._colors.GetColor3d( "Background" ) )
+        logger.debug( f"_onFullResolutionLoaded()" )
 
-        self._renderWindow.AddRenderer( self._renderer )
-        self._renderWindow.Render()
+        self._bricks, contours, rawSurface = result
+        edited = False
 
-    ############################################################################
+        # The brick index tells right away which contours are empty.
+        present = self._bricks.valuesPresent( self._contourValues.values() )
+        for name, value in self._contourValues.items():
+            if value not in present: logger.warning( f"Contour {name} ({value}) does not occur in the volume!" )
 
-    def _updateOctantActors( self ):
-        """
-        Update the octant actors so they match the current slice positions.
-        """
-        logger.debug( f"_updateOctantActors()" )
+        self._image.SetOutput( image )
 
-        slices = [None for _ in range( 3 )]
+        for i, name in enumerate( self._contourNames ):
+            if values[i] is None: continue
 
-        # If slicing along an axis is disabled, cut the contour right in the
-        # middle. This will make sure all octants are used instead of removing
-        # some. The handling of the octants as one unit will be done in the
-        # MouseInteractorToggleOpacity class.
-        for i, slice in enumerate( self._slices ):
-            if slice is None: slices[i] = (self._min[i] + self._max[i]) // 2
-            else: slices[i] = slice
+            if (self._contourValues[name], self._contourSmoothings.get( name )) != (values[i], smoothings[i]):
+                edited = True
+                continue
 
-        xRanges = ((self._min[0], slices[0]), (slices[0], self._max[0]))
-        yRanges = ((self._min[1], slices[1]), (slices[1], self._max[1]))
-        zRanges = ((self._min[2], slices[2]), (slices[2], self._max[2]))
+            self._setContourMeshes( i, *contours[i] )
+            if i == 0: self._setOctantSurface( rawSurface )
 
-        for i, xRange in enumerate( xRanges ):
-            for j, yRange in enumerate( yRanges ):
-                for k, zRange in enumerate( zRanges ):
-                    self._boxes[4 * i + 2 * j + k].SetBounds( *xRange, *yRange, *zRange )
+        self._renderWindow.Render()
 
-        if self._style == "Automatic":
-            self._updateOctantActorsVisibility( force = True )
+        if self._meshOptimization and self._meshFormat == "Automatic" and not edited:
+            self._isMeshFormatPending = True
+            QTimer.singleShot( 0, self._measureMeshFormats )
+
+        if self._timePoints > 1: self._createFrameCache( None if edited else contours, rawSurface )
+        # The deferred contours are submitted first, such that the processes
+        # that extract them are kept until they have been built.
+        if self._contourConstruction == "Background": self._buildDeferredContours()
+        if self._pipelineMode == "Lean": self._releaseIntermediates()
+
+        logger.info( f"File {self._reader.GetFileName()} loaded in full resolution." )
+        self.loadingProgressed.emit( 100 )
+        self.loadingFinished.emit( True )
 
     ############################################################################
 
-    def _updateOctantActorsVisibility( self, DOP = None, force = False ):
+    def _onLoadingProgressed( self, start, end, progress ):
         """
-        Update the octant actor such that the octant facing the camera is
-        not shown. Updates the octants on sign changes of the DOP vector
-        (Direction Of Projection). Forcing an update is also supported to allow
-        for changes in slicing. Used in the "Automatic" interaction style.
+        Report the progress of a loading stage, which covers the given range
+        of the overall progress (percentage). Only increases are reported, as
+        the filters that are executed within a range each start from zero.
         """
-        logger.debug( f"_updateOctantActorsVisibility( {DOP}, {force} )" )
+        progress = int( start + (end - start) * progress )
 
-        if not force:
-            signChanged = False
+        if progress > self._loadingProgress:
+            self._loadingProgress = progress
+            self.loadingProgressed.emit( progress )
 
-            for i in range( 3 ):
-                if self._slices[i] is not None:
-                    if self._DOP[i] >= 0:
-                        if DOP[i] < 0: signChanged = True
-                    elif DOP[i] >= 0: signChanged = True
+    ############################################################################
 
-            if signChanged: self._DOP = DOP
-            else: return
+    def _onLoadingFailed( self, error ):
+        """
+        Report that the volume could not be loaded.
+        """
+        logger.warning( f"Unable to load {self._reader.GetFileName()}: {error}" )
 
-        # Contains the id's of the octants which need not to be shown.
-        notToShow = set( range( 8 ) )
+        self.loadingFinished.emit( False )
 
-        if self._slices[0] is not None:
-            if self._DOP[0] >= 0: notToShow &= {0, 1, 2, 3}
-            else: notToShow &= {4, 5, 6, 7}
+    ############################################################################
 
-        if self._slices[1] is not None:
-            if self._DOP[1] >= 0: notToShow &= {0, 1, 4, 5}
-            else: notToShow &= {2, 3, 6, 7}
+    def _onRenderStarted( self, renderer, event ):
+        """
+        Choose how to render the translucent geometry of the upcoming frame.
+        Depth peeling is turned off when nothing is translucent. Otherwise the
+        configured strategy is used or, if it is "Automatic", the strategy that
+        has been measured for the current interaction style. Depth peeling is
+        used until the measurement (which needs to render) has been done.
+        """
+        if self._isMeasuringStrategies: return
 
-        if self._slices[2] is not None:
-            if self._DOP[2] >= 0: notToShow &= {0, 2, 4, 6}
-            else: notToShow &= {1, 3, 5, 7}
+        translucentActors = self._getTranslucentActors()
 
-        toShow = set( range( 8 ) ) - notToShow
+        if not translucentActors:
+            strategy = "Opaque"
+        elif self._transparencyStrategy != "Automatic":
+            strategy = self._transparencyStrategy
+        elif self._style in self._measuredStrategies:
+            strategy = self._measuredStrategies[self._style]
+        else:
+            strategy = "DepthPeeling"
+            self._isMeasuringStrategies = True
+            QTimer.singleShot( 0, self._measureTransparencyStrategies )
 
-        for index in toShow: self._octantActors[index].SetVisibility( True )
+        if strategy != self._activeStrategy:
+            logger.debug( f"Rendering translucent geometry using {strategy}." )
+            self._applyTransparencyStrategy( strategy )
 
-        for index in notToShow: self._octantActors[index].SetVisibility( False )
+        if strategy == "SortedLayer": self._sortTranslucentActors( translucentActors )
 
     ############################################################################
 
-    def _updateImageResliceActors( self ):
+    def _onRenderEnded( self, renderer, event ):
         """
-        Update the position of the image planes that cut through the volumetric
-        data.
+        Adapt the level of detail to the measured frame time while interacting.
+        A coarser level is used when the target frame rate is not met, a finer
+        one when the frame rate is comfortably above the target. The level is
+        remembered for the next interaction.
         """
-        logger.debug( f"_updateImageResliceActors()" )
-
-        for i, (slice, imageReslice) in enumerate( zip( self._slices, self._imageReslices ) ):
-            if slice is None:
-                self._imageResliceActors[i].SetVisibility( False )
-            else:
-                self._imageResliceActors[i].SetVisibility( True )
+        if not self._isInteracting: return
 
-                # Update the center of the slice in the user matrix.
-                matrix = imageReslice.GetResliceAxes()
-                matrix.SetElement( i, 3, self._slices[i] )
+        frameTime = renderer.GetLastRenderTimeInSeconds()
+        budget = 1.0 / self._targetFPS
 
-    ############################################################################
+        if frameTime > budget and self._lodLevel < len( self._lodReductions ) - 1:
+            self._lodLevel += 1
+        elif frameTime < 0.5 * budget and self._lodLevel > 0:
+            self._lodLevel -= 1
+        else:
+            return
 
-    def _onCameraMoved( self, camera, event ):
-        """
-        Update the contour extraction actor based on the current direction of
-        projection. Used in the "Automatic" interaction style.
-        """
-        logger.debug( f"_onCameraMoved( {camera.GetClassName()}, {event})" )
+        logger.debug( f"Frame took {1000 * frameTime:.1f} ms, switching to level of detail {self._lodLevel}." )
 
-        self._updateOctantActorsVisibility( camera.GetDirectionOfProjection() )
+        self._setLevelOfDetail( self._lodLevel )
 
 ################################################################################
 ################################################################################
@@ -843,6 +2712,272 @@ class MouseInteractorToggleOpacity( vtkInteractorStyleTrackballCamera ):
 ################################################################################
 ################################################################################
 
+class SliceScene( QObject ):
+
+    """
+    Composes a 2D scene that shows one of the orthogonal slices of the "Basic"
+    scene along with a crosshair at the positions of the other two slices.
+    The slice is taken from the output of the reslicing of the "Basic" scene
+    (see BasicScene.getSlice), so it is computed once and shown in both
+    scenes. Clicking (or dragging) in the scene picks a position in the
+    volume, through which the other two slices can be moved.
+    """
+
+    ############################################################################
+
+    positionPicked = pyqtSignal( float, float, float )
+
+    ############################################################################
+
+    def __init__( self, renderWindow, axis, *args, **kwargs ):
+        """
+        Initializes the scene of the slice along the given axis (0, 1 or 2 for
+        the coronal, sagittal or transverse slice).
+        """
+        logger.info( f"Creating {__class__.__name__}..." )
+
+        super().__init__( *args, **kwargs )
+
+        self._renderWindow = renderWindow
+        self._settings = QApplication.instance().settings
+        self._axis = axis
+        self._axes = None                   # The matrix that places the slice in the volume.
+        self._producerAndTag = None         # The observed producer of the slice, to replace it.
+        self._isRenderPending = False       # Whether a render has been scheduled.
+
+        self._createNamedColors()
+        self._createImageActor()
+        self._createCrosshairActors()
+        self._createRendererAndInteractor()
+
+    ############################################################################
+
+    def setSlice( self, outputPort, axes ):
+        """
+        Show the slice with the given output port and matrix (see
+        BasicScene.getSlice). The scene is rendered again whenever the slice
+        has been computed again, e.g. when it is moved or when another time
+        point is shown. The producer of the previous slice is no longer
+        observed.
+        """
+        logger.debug( f"setSlice()" )
+
+        self._axes = axes
+
+        if self._producerAndTag is not None:
+            producer, tag = self._producerAndTag
+            producer.RemoveObserver( tag )
+
+        producer = outputPort.GetProducer()
+        self._producerAndTag = (producer, producer.AddObserver( "EndEvent", self._onSliceUpdated ))
+
+        self._imageActor.GetMapper().SetInputConnection( outputPort )
+        self._imageActor.SetVisibility( True )
+        producer.Update()
+
+        # Show the slice with the z-axis of the volume pointing up, if it lies
+        # in the slice.
+        viewUp = (axes.GetElement( 2, 0 ), axes.GetElement( 2, 1 ), 0)
+        if viewUp == (0, 0, 0): viewUp = (0, 1, 0)
+
+        camera = self._renderer.GetActiveCamera()
+        camera.ParallelProjectionOn()
+        camera.SetViewUp( viewUp )
+        self._renderer.ResetCamera()
+
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def updateSlices( self, slices ):
+        """
+        Update the scene for the given positions of the slices (None if a
+        slice is hidden): the slice is hidden along with its 3D counterpart
+        and the crosshair shows the positions of the other two slices.
+        """
+        logger.debug( f"updateSlices( {slices} )" )
+
+        if self._axes is None: return
+
+        self._imageActor.SetVisibility( slices[self._axis] is not None )
+
+        bounds = self._imageActor.GetBounds()
+        others = [axis for axis in range( 3 ) if axis != self._axis]
+
+        for axis, source, actor in zip( others, self._crosshairSources, self._crosshairActors ):
+            actor.SetVisibility( slices[axis] is not None and slices[self._axis] is not None )
+            if slices[axis] is None: continue
+
+            # The axis of the slice that runs along the axis of the volume.
+            i = 0 if self._axes.GetElement( axis, 0 ) != 0 else 1
+            position = (slices[axis] - self._axes.GetElement( axis, 3 )) / self._axes.GetElement( axis, i )
+
+            if i == 0:
+                source.SetPoint1( position, bounds[2], 1 )
+                source.SetPoint2( position, bounds[3], 1 )
+            else:
+                source.SetPoint1( bounds[0], position, 1 )
+                source.SetPoint2( bounds[1], position, 1 )
+
+        self._renderer.ResetCameraClippingRange()
+        self._renderWindow.Render()
+
+    ############################################################################
+
+    def _createNamedColors( self ):
+        """
+        Creates named colors for convenience.
+        """
+        self._colors = vtkNamedColors()
+        self._colors.SetColor( "Crosshair", (1.0000, 0.8000, 0.0000, 1.0000) )
+        self._colors.SetColor( "Background", (0.1000, 0.1000, 0.2000, 1.0000) )
+
+    ############################################################################
+
+    def _createImageActor( self ):
+        """
+        Creates the actor that shows the slice in the coordinates of the slice
+        itself, i.e. without the matrix that places it in the volume.
+        """
+        self._imageActor = vtkImageActor()
+        self._imageActor.SetVisibility( False )
+
+    ############################################################################
+
+    def _createCrosshairActors( self ):
+        """
+        Creates the lines of the crosshair, one for each of the other two
+        slices, just in front of the slice.
+        """
+        self._crosshairSources = [vtkLineSource() for _ in range( 2 )]
+
+        self._crosshairActors = [vtkActor() for _ in range( 2 )]
+        for source, actor in zip( self._crosshairSources, self._crosshairActors ):
+            mapper = vtkPolyDataMapper()
+            mapper.SetInputConnection( source.GetOutputPort() )
+
+            actor.SetMapper( mapper )
+            actor.GetProperty().SetColor( self._colors.GetColor3d( "Crosshair" ) )
+            actor.SetVisibility( False )
+
+    ############################################################################
+
+    def _createRendererAndInteractor( self ):
+        """
+        Create a renderer and interactor for the scene.
+        """
+        self._renderer = vtkRenderer()
+        self._renderer.SetBackground( self._colors.GetColor3d( "Background" ) )
+        self._renderer.AddActor( self._imageActor )
+        for actor in self._crosshairActors: self._renderer.AddActor( actor )
+
+        self._renderWindow.AddRenderer( self._renderer )
+
+        self._interactor = self._renderWindow.GetInteractor()
+        self._interactor.SetInteractorStyle( MouseInteractorPickSlice( self._renderer, self._pickPosition ) )
+        self._interactor.Initialize()
+        self._interactor.Start()
+
+    ############################################################################
+
+    def _pickPosition( self, xPos, yPos ):
+        """
+        Emit the position in the volume of the picked point of the slice.
+        """
+        logger.debug( f"_pickPosition( {xPos}, {yPos} )" )
+
+        if self._axes is None or not self._imageActor.GetVisibility(): return
+
+        self._renderer.SetDisplayPoint( xPos, yPos, 0 )
+        self._renderer.DisplayToWorld()
+        x, y, _, w = self._renderer.GetWorldPoint()
+
+        position = self._axes.MultiplyPoint( (x / w, y / w, 0, 1) )
+
+        self.positionPicked.emit( *position[:3] )
+
+    ############################################################################
+
+    def _onSliceUpdated( self, algorithm, event ):
+        """
+        Render the scene again once the slice has been computed again. The
+        render is scheduled, as the slice is computed while another scene
+        renders.
+        """
+        if self._isRenderPending: return
+
+        self._isRenderPending = True
+        QTimer.singleShot( 0, self._onRenderTimeout )
+
+    ############################################################################
+
+    def _onRenderTimeout( self ):
+        """
+        Render the scene that has been scheduled.
+        """
+        self._isRenderPending = False
+        self._renderWindow.Render()
+
+################################################################################
+################################################################################
+
+class MouseInteractorPickSlice( vtkInteractorStyleImage ):
+
+    """
+    Custom mouse interactor used in the slice scenes. Picks a point of the
+    slice on a left click, and keeps picking while the mouse is dragged. The
+    other buttons pan and zoom the slice.
+    """
+
+    ############################################################################
+
+    def __init__( self, renderer, callback, parent = None ):
+        """
+        Initializes the interaction style.
+        """
+        logger.info( f"Creating {__class__.__name__}..." )
+
+        self._renderer, self._callback = renderer, callback
+        self._isPicking = False
+
+        self.AddObserver( "LeftButtonPressEvent", self._onLeftButtonPress )
+        self.AddObserver( "LeftButtonReleaseEvent", self._onLeftButtonRelease )
+        self.AddObserver( "MouseMoveEvent", self._onMouseMove )
+
+    ############################################################################
+
+    def _onLeftButtonPress( self, object, event ):
+        """
+        Pick the clicked point, instead of changing the window and level.
+        """
+        logger.debug( f"_onLeftButtonPress( {object.GetClassName()}, {event} )" )
+
+        self._isPicking = True
+        self._callback( *self.GetInteractor().GetEventPosition() )
+
+    ############################################################################
+
+    def _onLeftButtonRelease( self, object, event ):
+        """
+        Stop picking.
+        """
+        logger.debug( f"_onLeftButtonRelease( {object.GetClassName()}, {event} )" )
+
+        self._isPicking = False
+
+    ############################################################################
+
+    def _onMouseMove( self, object, event ):
+        """
+        Pick the point under the mouse while it is being dragged, pan or zoom
+        otherwise.
+        """
+        if self._isPicking: self._callback( *self.GetInteractor().GetEventPosition() )
+        else: self.OnMouseMove()
+
+################################################################################
+################################################################################
+
 class EEGScene( QObject ):
 
     """
@@ -887,7 +3022,7 @@ class EEGScene( QObject ):
 
         fullName = realpath( getcwd() + fileName )
 
-        if not isfile( fullName ) or not self._createReader( fullName ):
+        if not exists( fullName ) or not self._createReader( fullName ):
             logger.info( f"Unable to read file {fullName}! Creating empty renderer." )
             self._createNamedColors()
             self._createEmptyRenderer()
@@ -920,6 +3055,9 @@ class EEGScene( QObject ):
         self._renderWindow.Render()
         self._chartXYWindow.Render()
 
+        if self._settings.value( f"{__class__.__name__}/PipelineMode", "Default", type = str ) == "Lean":
+            self._releaseIntermediates()
+
     ############################################################################
 
     def addElectrode( self, position ):
@@ -966,10 +3104,18 @@ class EEGScene( QObject ):
         """
         Get the bounds of the scene.
         """
-        extent = self._reader.GetOutput().GetExtent()
-        spacing = self._reader.GetOutput().GetSpacing()
+        return list( self._bounds )
+
+    ############################################################################
 
-        return [ extent[i] * spacing[i // 2] for i in range( 6 ) ]
+    def getMemorySize( self ):
+        """
+        Get the (approximate) number of bytes taken by the data of the scene:
+        the volume and the outputs of the pipelines of the outline and contour
+        (see Neuroviz.Memory.measureMemory).
+        """
+        return measureMemory( self._reader, self._outline, self._contour, self._filter, self._normal,
+                              self._smoothedContour, self._contourMapper.GetInput() )
 
     ############################################################################
 
@@ -986,12 +3132,16 @@ class EEGScene( QObject ):
 
     def _createReader( self, fileName ):
         """
-        Creates a VTK file reader and check if the data is valid.
+        Creates a reader for the file (legacy VTK structured points, MetaImage,
+        NIfTI or a directory of PNG slices) and check if the data is valid.
+        Legacy VTK files are read from their side-car file (see
+        Neuroviz.Readers.LegacyVTKReader).
         """
-        self._reader = vtkGenericDataObjectReader()
-        self._reader.SetFileName( fileName )
+        spacing = self._settings.value( f"{__class__.__name__}/StackSpacing", [1.0, 1.0, 1.0], type = list )
+        compress = self._settings.value( f"{__class__.__name__}/SideCarCompression", False, type = bool )
+        self._reader = createReader( fileName, [float( x ) for x in spacing], compress = compress )
 
-        return self._reader.IsFileStructuredPoints()
+        return self._reader is not None
 
     ############################################################################
 
@@ -1008,8 +3158,12 @@ class EEGScene( QObject ):
         """
         Creates a white outline around the volumetric data for context.
         """
-        self._outline = vtkOutlineFilter()
-        self._outline.SetInputConnection( self._reader.GetOutputPort() )
+        self._bounds = self._reader.GetBounds()
+
+        # The outline is built from the bounds, such that the volume can be
+        # released (see _releaseIntermediates).
+        self._outline = vtkOutlineSource()
+        self._outline.SetBounds( self._bounds )
 
         self._outlineMapper = vtkPolyDataMapper()
         self._outlineMapper.SetInputConnection( self._outline.GetOutputPort() )
@@ -1026,8 +3180,7 @@ class EEGScene( QObject ):
         """
         self._contourValue = self._settings.value( f"{__class__.__name__}/ContourValue", "169", type = int )
         self._contourSmoothing = self._settings.value( f"{__class__.__name__}/ContourSmoothing", "0/0.0/20/0.5/45.0", type = str )
-        s = tuple( x.strip() for x in self._contourSmoothing.split( "/" ) )
-        self._contourSmoothing = tuple( (int( s[0] ), float( s[1] ), int( s[2] ), float( s[3] ), float( s[4] )) )
+        self._contourSmoothing = parseSmoothing( self._contourSmoothing )
 
     ############################################################################
 
@@ -1035,46 +3188,49 @@ class EEGScene( QObject ):
         """
         Creates an isosurface (contour) from the input data. If smoothing is
         enabled in the settings, smooth the data first using a Geussian filter.
+        The data is cropped to the part that the contour can reach, and only
+        the bricks of it that may cross the contour value are visited. In
+        "Compact" mode, the cropped data is converted to the smallest data type
+        that holds its voxels (see Neuroviz.Readers.compactImage).
         """
-        self._gaussian = vtkImageGaussianSmooth()
-        self._contour = vtkContourFilter()
+        dataTypes = self._settings.value( f"{__class__.__name__}/DataTypes", "Compact", type = str )
 
-        radius, stdDev, iters, passBand, angle = self._contourSmoothing
+        extent = contourExtent( self._reader.GetArray(), [self._contourValue], [self._contourSmoothing] )
+        image = self._reader.GetTimePoint( 0, extent )
+        if dataTypes == "Compact": image = compactImage( image )
 
-        if radius != 0 and stdDev != 0:
-            self._gaussian.SetInputConnection( self._reader.GetOutputPort() )
-            self._gaussian.SetRadiusFactors( radius, radius, radius )
-            self._gaussian.SetStandardDeviations( stdDev, stdDev, stdDev )
-            self._contour.SetInputConnection( self._gaussian.GetOutputPort() )
-        else:
-            self._contour.SetInputConnection( self._reader.GetOutputPort() )
+        self._bricks = BrickIndex( imageToArray( image ) )
 
-        self._contour.SetValue( 0, self._contourValue )
-        self._contour.ComputeScalarsOff()
-        self._contour.ComputeGradientsOff()
-        self._contour.ComputeNormalsOff()
+        self._contour = vtkTrivialProducer()
+        self._contour.SetOutput( extractSurface( image, self._contourValue, self._contourSmoothing, bricks = self._bricks ) )
 
     ############################################################################
 
     def _smoothContour( self ):
         """
         Smooth the contours using a windowed sinc filter with the provided
-        settings. The windowed sinc filter is followed by normal creation to
-        create a smooth shading. The stripper creates triangle strips from the
-        isosurface that will render very fast.
-        """
-        radius, stdDev, iters, passBand, angle = self._contourSmoothing
-
-        self._filter = vtkWindowedSincPolyDataFilter()
-        self._filter.SetInputConnection( self._contour.GetOutputPort() )
-        self._filter.SetNumberOfIterations( iters )
-        self._filter.BoundarySmoothingOff()
-        self._filter.FeatureEdgeSmoothingOff()
-        self._filter.SetFeatureAngle( angle )
-        self._filter.SetPassBand( passBand )
-        self._filter.NonManifoldSmoothingOn()
-        self._filter.NormalizeCoordinatesOn()
-        self._filter.Update()
+        settings, or the sparse smoothing engine if it is selected, which is
+        shared with the other scenes (see Neuroviz.Contours._sinc). The
+        windowed sinc filter is followed by normal creation to create a smooth
+        shading. The stripper creates triangle strips from the isosurface that
+        will render very fast.
+        """
+        radius, stdDev, iters, passBand, angle = self._contourSmoothing[:5]
+
+        if self._contourSmoothing[5:] == ("Sparse",):
+            self._filter = vtkTrivialProducer()
+            self._filter.SetOutput( _sinc( self._contour.GetOutput(), self._contourSmoothing ) )
+        else:
+            self._filter = vtkWindowedSincPolyDataFilter()
+            self._filter.SetInputConnection( self._contour.GetOutputPort() )
+            self._filter.SetNumberOfIterations( iters )
+            self._filter.BoundarySmoothingOff()
+            self._filter.FeatureEdgeSmoothingOff()
+            self._filter.SetFeatureAngle( angle )
+            self._filter.SetPassBand( passBand )
+            self._filter.NonManifoldSmoothingOn()
+            self._filter.NormalizeCoordinatesOn()
+            self._filter.Update()
 
         self._normal = vtkPolyDataNormals()
         self._normal.SetInputConnection( self._filter.GetOutputPort() )
@@ -1085,6 +3241,33 @@ class EEGScene( QObject ):
 
     ############################################################################
 
+    def _releaseIntermediates( self ):
+        """
+        Release the data that is no longer needed once the contour is shown,
+        in "Lean" pipeline mode: the volume (see
+        Neuroviz.Readers.VolumeReader.ReleaseData) and the outputs of the
+        windowed sinc filter and the normals (kept as triangle strips). These
+        filters release their outputs after every execution from then on, such
+        that they are only executed again when a filter downstream of them
+        needs to. The raw contour is kept, as it has no filter to build it
+        again. Logs the memory taken by the scene before and after.
+        """
+        before = self.getMemorySize()
+
+        self._reader.ReleaseData()
+
+        intermediates = [self._normal]
+        if isinstance( self._filter, vtkWindowedSincPolyDataFilter ): intermediates.append( self._filter )
+
+        for algorithm in intermediates:
+            algorithm.ReleaseDataFlagOn()
+            algorithm.GetOutputDataObject( 0 ).ReleaseData()
+
+        logger.info( f"Released intermediate data: {before / 2**20:.1f} MB -> "
+                     f"{self.getMemorySize() / 2**20:.1f} MB." )
+
+    ############################################################################
+
     def _interpolateContour( self ):
         """
         Interpolate the scalar values of the contour based on the values and
@@ -1111,7 +3294,7 @@ class EEGScene( QObject ):
         self._electrodes.GetPointData().SetScalars( self._values )
 
         # Add one to the bounds to include points right on the bounds.
-        bounds = list( self._contour.GetOutput().GetBounds() )
+        bounds = list( self._contour.GetOutputDataObject( 0 ).GetBounds() )
         bounds = [ x + y for x, y in zip( bounds, [-1, 1, -1, 1, -1, 1] ) ]
 
         self._shepard = vtkShepardMethod()
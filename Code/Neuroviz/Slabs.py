@@ -0,0 +1,228 @@
+"""
+File name:  Slabs.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Classes that project thick slabs of volumetric data (e.g. maximum
+            intensity projections), such that a slab can follow a slice that
+            is being dragged.
+"""
+
+################################################################################
+################################################################################
+
+from copy import copy
+from logging import getLogger
+
+import numpy as np
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+def createSlabIndices( array, mode, thickness, budget = None, indices = None, job = None ):
+    """
+    Create the slab index (see SlabIndex) of the given (z, y, x) array along
+    each of the x-, y- and z-axis, such that their tables take at most the
+    given budget (in bytes, None if unlimited) together: each index gets an
+    equal share of the budget that is left, the share of an index without a
+    table goes to the next ones. The indices of the array that have been
+    built for another thickness (if any, in the same mode) are reused instead
+    (see SlabIndex.withThickness). Can be run on a worker thread.
+    """
+    if indices is not None:
+        return [index.withThickness( thickness ) for index in indices]
+
+    indices = []
+
+    for axis in range( 3 ):
+        if job is not None: job.checkCancelled()
+
+        share = None if budget is None else budget // (3 - axis)
+        indices.append( SlabIndex( array, axis, mode, thickness, share ) )
+        if budget is not None and indices[-1].hasTable(): budget -= share
+
+    return indices
+
+################################################################################
+################################################################################
+
+class SlabIndex:
+
+    """
+    Projects the slabs of slices of a volume along one of its axes onto a
+    single slice: the maximum ("Maximum"), minimum ("Minimum") or average
+    ("Average") of the slices within the slab. Every slab is projected in
+    constant time per pixel, whatever its position.
+
+    Averages are taken from the cumulative sums of the slices, which serve
+    any thickness. Maxima and minima are taken from a sparse table, whose
+    level k holds the maxima (minima) of all runs of 2^k consecutive slices.
+    A slab is covered by two (overlapping) runs of the level with 2^k the
+    largest power of two not above its thickness. The levels are built (one
+    pass over the volume each) when a thickness first needs them, and kept
+    for other thicknesses (see withThickness), such that changing the
+    thickness back and forth is a lookup.
+
+    A level is about as large as the volume. The levels that do not fit the
+    memory budget are released again, the lowest ones first. If not even the
+    first one fits, the slabs are projected from the slices themselves,
+    which takes time in proportion to the thickness.
+    """
+
+    ############################################################################
+
+    def __init__( self, array, axis, mode = "Maximum", thickness = 1, budget = None ):
+        """
+        Build the index of the given (z, y, x) array along the given axis (0,
+        1 or 2 for the x-, y- or z-axis) for slabs of the given thickness (in
+        slices), with a table that takes at most the given budget (in bytes,
+        None if unlimited).
+        """
+        if mode not in ("Maximum", "Minimum", "Average"): raise ValueError( f"Unknown slab mode {mode}!" )
+
+        self._mode, self._axis, self._budget = mode, axis, budget
+
+        slices = np.moveaxis( array, 2 - axis, 0 )
+        self._slices = len( slices )
+
+        # Small integers are summed exactly in 32 bits for any thickness, other
+        # values in single precision (double for 64-bit values).
+        if mode != "Average": dtype = slices.dtype
+        elif np.issubdtype( slices.dtype, np.integer ) and slices.dtype.itemsize <= 2: dtype = np.dtype( np.int32 )
+        else: dtype = np.dtype( np.float32 if slices.dtype.itemsize <= 4 else np.float64 )
+
+        self._function = {"Maximum": np.maximum, "Minimum": np.minimum, "Average": np.add}[mode]
+        self._source, self._table, self._levels, self._dtype = slices, None, None, dtype
+
+        if budget is not None and (self._slices + 1) * slices[0].size * dtype.itemsize > budget:
+            logger.info( f"Projecting {mode.lower()} slabs along axis {axis} without an index, as it does not "
+                         f"fit the memory budget." )
+        elif mode == "Average":
+            self._table = np.zeros( (self._slices + 1, *slices.shape[1:]), dtype = dtype )
+            np.cumsum( slices, axis = 0, out = self._table[1:] )
+        else:
+            # Level 0 (runs of a single slice) is the volume itself.
+            self._levels = [slices] + [None] * (self._slices.bit_length() - 1)
+
+        self._setThickness( thickness )
+
+    ############################################################################
+
+    def withThickness( self, thickness ):
+        """
+        Get the index of the same volume for slabs of the given thickness,
+        which shares the table (or levels of it) built so far. The index
+        itself is left untouched, such that it can be used by another thread
+        in the meantime.
+        """
+        index = copy( self )
+        if self._levels is not None: index._levels = list( self._levels )
+
+        index._setThickness( thickness )
+
+        return index
+
+    ############################################################################
+
+    def getThickness( self ):
+        """
+        Get the number of slices of a slab, which is at most the number of
+        slices of the volume.
+        """
+        return self._thickness
+
+    ############################################################################
+
+    def hasTable( self ):
+        """
+        Check whether the slabs are projected using a table, rather than from
+        the slices themselves.
+        """
+        return self._table is not None or self._levels is not None
+
+    ############################################################################
+
+    def getSize( self ):
+        """
+        Get the number of bytes taken by the table of the index (zero if the
+        slabs are projected without it), i.e. by the levels that are kept.
+        """
+        if self._table is not None: return self._table.nbytes
+        if self._levels is None: return 0
+
+        return sum( level.nbytes for level in self._levels[1:] if level is not None )
+
+    ############################################################################
+
+    def getSlab( self, center ):
+        """
+        Get the first and last slice (inclusive) of the slab around the given
+        slice. Slabs near the border of the volume are moved inwards, such that
+        they keep their thickness.
+        """
+        first = min( max( center - self._thickness // 2, 0 ), self._slices - self._thickness )
+
+        return first, first + self._thickness - 1
+
+    ############################################################################
+
+    def project( self, center ):
+        """
+        Project the slab around the given slice (see getSlab). Returns a 2D
+        array with the remaining axes in (z, y, x) order.
+        """
+        first, last = self.getSlab( center )
+
+        if self._table is not None:
+            return (self._table[last + 1] - self._table[first]) / self._thickness
+
+        if self._levels is None:
+            projection = self._function.reduce( self._source[first:last + 1], axis = 0, dtype = self._dtype )
+            return projection / self._thickness if self._mode == "Average" else projection
+
+        level, run = self._levels[self._level], 2 ** self._level
+
+        return self._function( level[first], level[last - run + 1] )
+
+    ############################################################################
+
+    def _setThickness( self, thickness ):
+        """
+        Let the slabs have the given thickness (in slices), building the
+        level of the table it needs (if any) from the highest level below it
+        that is kept.
+        """
+        self._thickness = max( 1, min( thickness, self._slices ) )
+        self._level = self._thickness.bit_length() - 1
+
+        if self._levels is None: return
+
+        below = max( k for k in range( self._level + 1 ) if self._levels[k] is not None )
+
+        for k in range( below + 1, self._level + 1 ):
+            run = 2 ** (k - 1)
+            self._levels[k] = self._function( self._levels[k - 1][:-run], self._levels[k - 1][run:] )
+
+            # The level below is no longer needed to build this one.
+            self._releaseLevels( k )
+
+        if below < self._level:
+            logger.info( f"Built {self._mode.lower()} slab index of {self._thickness} slices along axis "
+                         f"{self._axis}." )
+
+    ############################################################################
+
+    def _releaseLevels( self, level ):
+        """
+        Release the levels of the table (except the volume itself and the
+        given level) that do not fit the memory budget, the lowest ones first.
+        """
+        for k in range( 1, len( self._levels ) ):
+            if self._budget is None or self.getSize() <= self._budget: return
+            if k != level: self._levels[k] = None
+
+################################################################################
+################################################################################
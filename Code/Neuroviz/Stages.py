@@ -0,0 +1,154 @@
+"""
+File name:  Stages.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Classes that memoize the outputs of the stages of the contour
+            pipeline (see Neuroviz.Contours), such that changing a parameter
+            only executes the stage it belongs to and the stages after it.
+"""
+
+################################################################################
+################################################################################
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+from vtk import vtkDataObject
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+class StageCache:
+
+    """
+    Memoizes the outputs of the stages of a pipeline in memory. Every output
+    is keyed by the name of its stage, the parameters of the stage and the key
+    of its input: the key of the output of the previous stage or, for the
+    first stage, the fingerprint of the volume (see fingerprint). The key of
+    an output thus covers all parameters upstream of it. Outputs are kept
+    until they exceed the memory budget, in which case the least recently used
+    outputs are dropped. The cache can be used by several worker threads at
+    once.
+
+    Data objects are handed out as shallow copies, such that the cached ones
+    are never connected to a pipeline (e.g. a mapper) elsewhere.
+    """
+
+    ############################################################################
+
+    def __init__( self, budget = None ):
+        """
+        Initialize the cache with the given budget (in bytes, None if
+        unlimited).
+        """
+        logger.info( f"Creating {__class__.__name__}..." )
+
+        self._budget = budget
+        self._outputs = OrderedDict()   # From least to most recently used.
+        self._sizes = {}                # The size of each cached output.
+        self._lock = Lock()
+
+    ############################################################################
+
+    @staticmethod
+    def fingerprint( image ):
+        """
+        Get the fingerprint of a volume (vtkImageData): the modification time
+        of its voxels along with its geometry. Modification times are unique
+        and shallow copies share the voxels, so every copy of a volume has the
+        same fingerprint and any other volume has another one.
+        """
+        scalars = image.GetPointData().GetScalars()
+
+        return (scalars.GetMTime(), image.GetExtent(), image.GetSpacing(), image.GetOrigin())
+
+    ############################################################################
+
+    def compute( self, key, function, *args, **kwargs ):
+        """
+        Get the output with the given key, calling the function with the given
+        arguments to compute it if it is not cached.
+        """
+        with self._lock:
+            output = self._outputs.get( key )
+            if output is not None: self._outputs.move_to_end( key )
+
+        if output is not None:
+            logger.debug( f"Reusing the output of stage {key[0]}." )
+            return self._copy( output )
+
+        output = function( *args, **kwargs )
+        self.add( key, output )
+
+        return output
+
+    ############################################################################
+
+    def getOutputs( self ):
+        """
+        Get the cached outputs, e.g. to measure the memory they take.
+        """
+        with self._lock:
+            return list( self._outputs.values() )
+
+    ############################################################################
+
+    def add( self, key, output ):
+        """
+        Add an output that has been computed elsewhere, e.g. along with other
+        outputs in a single pass.
+        """
+        with self._lock:
+            self._outputs[key] = self._copy( output )
+            self._sizes[key] = self._getSize( output )
+            self._evict()
+
+    ############################################################################
+
+    def _evict( self ):
+        """
+        Drop the least recently used outputs until the cached outputs fit the
+        budget. The most recent output is kept, even if it exceeds the budget
+        by itself.
+        """
+        if self._budget is None: return
+
+        while len( self._outputs ) > 1 and sum( self._sizes.values() ) > self._budget:
+            key, _ = self._outputs.popitem( last = False )
+            del self._sizes[key]
+
+    ############################################################################
+
+    @classmethod
+    def _copy( cls, output ):
+        """
+        Get a shallow copy of a data object, or of each data object of a tuple
+        or list of them.
+        """
+        if isinstance( output, (tuple, list) ): return type( output )( cls._copy( x ) for x in output )
+        if not isinstance( output, vtkDataObject ): return output
+
+        copy = output.NewInstance()
+        copy.ShallowCopy( output )
+
+        return copy
+
+    ############################################################################
+
+    @classmethod
+    def _getSize( cls, output ):
+        """
+        Get the (approximate) number of bytes taken by an output.
+        """
+        if isinstance( output, (tuple, list) ): return sum( cls._getSize( x ) for x in output )
+        if not isinstance( output, vtkDataObject ): return 0
+
+        return 1024 * output.GetActualMemorySize()
+
+################################################################################
+################################################################################
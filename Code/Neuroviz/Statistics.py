@@ -0,0 +1,163 @@
+"""
+File name:  Statistics.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Functions that measure the tissues of volumetric data (number of
+            voxels, physical volume and bounding box) for a set of contour
+            values, in a single pass over the volume.
+"""
+
+################################################################################
+################################################################################
+
+from logging import getLogger
+
+import numpy as np
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+def computeStatistics( array, values, spacing, discrete = False, bricks = None, slabSize = 16, job = None ):
+    """
+    Measure the tissue of each of the given values of a (z, y, x) array: the
+    voxels at or above the value or, in discrete mode, equal to the value
+    (label). All values are measured in a single pass, in which every voxel
+    is binned by the values (see _binVoxels) and the bins are counted and
+    projected onto the axes. Only the bricks of the brick index (if any) that
+    may contain such voxels are visited, otherwise the volume is visited a
+    slab of slices at a time. Returns a (voxels, volume, extent) tuple for
+    each value, with the volume using the given (x, y, z) spacing and the
+    extent (x0, x1, y0, y1, z0, z1, in voxels) None if there are no voxels.
+    Can be run on a worker thread.
+    """
+    levels, inverse = np.unique( np.asarray( values ), return_inverse = True )
+    n, shape = len( levels ), array.shape[:3]
+
+    lookup = _lookupTable( array.dtype, levels, discrete )
+    counts = np.zeros( n + 1, dtype = np.int64 )
+
+    # Whether each slice along the z-, y- and x-axis holds voxels of a level.
+    profiles = [np.zeros( (n, size), dtype = bool ) for size in shape]
+
+    for block, offsets in _blocks( array, levels, discrete, bricks, slabSize ):
+        if job is not None: job.checkCancelled()
+
+        bins = _binVoxels( block, levels, discrete, lookup )
+        counts += np.bincount( bins.ravel(), minlength = n + 1 )
+
+        for level, presence in enumerate( _projectBins( bins, n, discrete ) ):
+            for axis in range( 3 ):
+                profiles[axis][level, offsets[axis]:offsets[axis] + block.shape[axis]] |= presence[axis]
+
+    # The voxels at or above a level are in its bin or in any of the higher ones.
+    if not discrete: counts = np.cumsum( counts[::-1] )[::-1]
+
+    voxelVolume = float( np.prod( spacing ) )
+    statistics = []
+
+    for level in range( n ):
+        voxels = int( counts[level + 1] )
+        extent = None
+
+        if voxels > 0:
+            ranges = [np.nonzero( profile[level] )[0] for profile in profiles[::-1]]
+            extent = tuple( int( x ) for r in ranges for x in (r[0], r[-1]) )
+
+        statistics.append( (voxels, voxels * voxelVolume, extent) )
+
+    logger.info( f"Measured {len( values )} tissues in a volume of {shape[::-1]} voxels." )
+
+    return [statistics[i] for i in inverse]
+
+################################################################################
+################################################################################
+
+def _lookupTable( dtype, levels, discrete ):
+    """
+    Get the bin (see _binVoxels) of every value of the given data type, for
+    integers of at most 16 bits. Binning by table lookup is a lot faster than
+    searching the levels. Returns None for the other data types.
+    """
+    if dtype.kind not in "iu" or dtype.itemsize > 2: return None
+
+    # The table is indexed by the unsigned view of the voxels.
+    unsigned = np.dtype( f"u{dtype.itemsize}" )
+    values = np.arange( 2 ** (8 * dtype.itemsize), dtype = unsigned ).view( dtype )
+
+    return _binVoxels( values, levels, discrete )
+
+################################################################################
+
+def _binVoxels( block, levels, discrete, lookup = None ):
+    """
+    Bin the voxels of a block by the (sorted) levels: bin k > 0 holds the
+    voxels from the k'th level up to the next one or, in discrete mode, the
+    voxels equal to the k'th level. Bin 0 holds the remaining voxels.
+    """
+    if lookup is not None: return lookup[block.view( f"u{block.dtype.itemsize}" )]
+
+    dtype = np.uint8 if len( levels ) < 255 else np.int32
+    bins = np.searchsorted( levels, block, side = "right" ).astype( dtype )
+
+    if discrete: bins[levels[np.maximum( bins.astype( np.int64 ) - 1, 0 )] != block] = 0
+
+    return bins
+
+################################################################################
+
+def _projectBins( bins, n, discrete ):
+    """
+    Project the bins of a (z, y, x) block onto the z-, y- and x-axis. Returns
+    for each of the n levels whether each slice along each axis holds voxels
+    of the level.
+    """
+    if not discrete:
+        # A voxel at or above a level is in its bin or in a higher one, so the
+        # highest bin of each slice tells which levels it holds.
+        highest = bins.max( axis = 0 )
+        maxima = (bins.reshape( len( bins ), -1 ).max( axis = 1 ), highest.max( axis = 1 ), highest.max( axis = 0 ))
+
+        return [[maximum > level for maximum in maxima] for level in range( n )]
+
+    projections = []
+
+    for level in range( n ):
+        mask = bins == level + 1
+        rows = mask.any( axis = 0 )
+        projections.append( [mask.reshape( len( mask ), -1 ).any( axis = 1 ), rows.any( axis = 1 ), rows.any( axis = 0 )] )
+
+    return projections
+
+################################################################################
+
+def _blocks( array, levels, discrete, bricks = None, slabSize = 16 ):
+    """
+    Iterate over the blocks of a (z, y, x) array that may hold voxels of the
+    levels, along with their (z, y, x) offsets. With a brick index, a block is
+    the box around the bricks of a slab of bricks that may hold such voxels.
+    Otherwise, every slab of slices is a block.
+    """
+    shape = array.shape[:3]
+
+    if bricks is None:
+        for z in range( 0, shape[0], slabSize ):
+            yield np.asarray( array[z:z + slabSize] ), (z, 0, 0)
+        return
+
+    size = bricks.getBrickSize()
+    active = bricks.bricksInRange( levels[0], levels[-1] if discrete else None )
+
+    for k, slab in enumerate( active ):
+        if not slab.any(): continue
+
+        ys, xs = np.nonzero( slab.any( axis = 1 ) )[0], np.nonzero( slab.any( axis = 0 ) )[0]
+        z, y, x = k * size, ys[0] * size, xs[0] * size
+
+        yield np.asarray( array[z:z + size, y:(ys[-1] + 1) * size, x:(xs[-1] + 1) * size] ), (z, y, x)
+
+################################################################################
+################################################################################
@@ -0,0 +1,267 @@
+"""
+File name:  Workers.py
+Author:     Gerbrand De Laender
+Date:       18/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Classes that run (cancellable) jobs on worker threads, such that
+            heavy computations never block the GUI thread.
+"""
+
+################################################################################
+################################################################################
+
+from functools import partial
+from logging import getLogger
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+logger = getLogger( __name__ )
+
+################################################################################
+################################################################################
+
+class JobCancelled( Exception ):
+
+    """
+    Raised inside a job to stop it as soon as it has been cancelled.
+    """
+
+################################################################################
+################################################################################
+
+class JobSignals( QObject ):
+
+    """
+    Signals of a job. They live in the thread that created the job (normally
+    the GUI thread), so connected slots are called in that thread. The results
+    of cancelled jobs are never delivered.
+    """
+
+    ############################################################################
+
+    finished = pyqtSignal( object )
+    failed = pyqtSignal( str )
+    progressed = pyqtSignal( float )
+    released = pyqtSignal()
+
+    _done = pyqtSignal( object, object )
+
+    ############################################################################
+
+    def __init__( self, job, *args, **kwargs ):
+        """
+        Initialize the signals of the given job.
+        """
+        super().__init__( *args, **kwargs )
+
+        self._job = job
+        self._done.connect( self._onDone )
+
+    ############################################################################
+
+    @pyqtSlot( object, object )
+    def _onDone( self, result, error ):
+        """
+        Deliver the result (or error) of the job, unless it has been cancelled
+        in the meantime.
+        """
+        self.released.emit()
+
+        if self._job.isCancelled(): return
+
+        if error is None: self.finished.emit( result )
+        else: self.failed.emit( error )
+
+################################################################################
+################################################################################
+
+class Job( QRunnable ):
+
+    """
+    A unit of work that runs on a worker thread. The function is called with
+    the given arguments and the job itself as "job" keyword argument, such
+    that it can watch VTK filters and bail out when the job is cancelled.
+    """
+
+    ############################################################################
+
+    def __init__( self, function, *args, **kwargs ):
+        """
+        Initialize the job.
+        """
+        super().__init__()
+
+        self._function, self._args, self._kwargs = function, args, kwargs
+        self._cancelled = False
+        self._progressRange = (0.0, 1.0)
+
+        self.signals = JobSignals( self )
+
+    ############################################################################
+
+    def run( self ):
+        """
+        Run the function and report back to the thread that created the job.
+        """
+        result, error = None, None
+
+        try:
+            if not self._cancelled:
+                result = self._function( *self._args, job = self, **self._kwargs )
+        except JobCancelled:
+            pass
+        except Exception as e:
+            logger.exception( f"Job {self._function.__name__} failed!" )
+            error = str( e )
+
+        self.signals._done.emit( result, error )
+
+    ############################################################################
+
+    def cancel( self ):
+        """
+        Cancel the job. A running function stops at the next check.
+        """
+        self._cancelled = True
+
+    ############################################################################
+
+    def isCancelled( self ):
+        """
+        Check whether the job has been cancelled.
+        """
+        return self._cancelled
+
+    ############################################################################
+
+    def checkCancelled( self ):
+        """
+        Stop the running function if the job has been cancelled.
+        """
+        if self._cancelled: raise JobCancelled()
+
+    ############################################################################
+
+    def watch( self, algorithm ):
+        """
+        Watch the progress of a VTK algorithm that is executed by the job. The
+        progress is reported and the algorithm is aborted when the job has
+        been cancelled.
+        """
+        algorithm.AddObserver( "ProgressEvent", self._onProgress )
+
+    ############################################################################
+
+    def setProgressRange( self, start, end ):
+        """
+        Map the progress of the watched algorithms onto the given range, such
+        that a job that executes several algorithms one after the other can
+        report its overall progress.
+        """
+        self._progressRange = (start, end)
+
+    ############################################################################
+
+    def reportProgress( self, progress ):
+        """
+        Report the progress (between 0.0 and 1.0) of work that is not done by
+        a watched algorithm, mapped onto the progress range.
+        """
+        start, end = self._progressRange
+        self.signals.progressed.emit( start + (end - start) * progress )
+
+    ############################################################################
+
+    def _onProgress( self, algorithm, event ):
+        """
+        Abort the algorithm when the job has been cancelled, report the
+        progress otherwise.
+        """
+        if self._cancelled:
+            algorithm.SetAbortExecute( 1 )
+        else:
+            self.reportProgress( algorithm.GetProgress() )
+
+################################################################################
+################################################################################
+
+class JobQueue( QObject ):
+
+    """
+    Runs jobs on a pool of worker threads. Each job is submitted under a key,
+    a newer job with the same key supersedes (cancels) the older one.
+    """
+
+    ############################################################################
+
+    def __init__( self, maxThreadCount = None, *args, **kwargs ):
+        """
+        Initialize the queue.
+        """
+        logger.info( f"Creating {__class__.__name__}..." )
+
+        super().__init__( *args, **kwargs )
+
+        self._pool = QThreadPool( self )
+        if maxThreadCount is not None: self._pool.setMaxThreadCount( maxThreadCount )
+
+        self._jobs = {}         # The current job for each key.
+        self._running = set()   # Keeps all started jobs alive until released.
+
+    ############################################################################
+
+    def submit( self, key, job, priority = 0 ):
+        """
+        Start the job, cancelling the previous job with the same key. Jobs
+        with a higher priority are started first.
+        """
+        logger.debug( f"submit( {key}, {priority} )" )
+
+        self.cancel( key )
+
+        self._jobs[key] = job
+        self._running.add( job )
+        job.signals.released.connect( partial( self._onJobReleased, key, job ) )
+
+        self._pool.start( job, priority )
+
+    ############################################################################
+
+    def cancel( self, key ):
+        """
+        Cancel the current job with the given key, if any.
+        """
+        job = self._jobs.pop( key, None )
+        if job is not None: job.cancel()
+
+    ############################################################################
+
+    def cancelAll( self ):
+        """
+        Cancel all current jobs.
+        """
+        for key in list( self._jobs ): self.cancel( key )
+
+    ############################################################################
+
+    def isBusy( self, key = None ):
+        """
+        Check whether there is a current job (with the given key).
+        """
+        if key is None: return bool( self._jobs )
+
+        return key in self._jobs
+
+    ############################################################################
+
+    def _onJobReleased( self, key, job ):
+        """
+        Forget about a job once it has stopped running.
+        """
+        self._running.discard( job )
+
+        if self._jobs.get( key ) is job: del self._jobs[key]
+
+################################################################################
+################################################################################
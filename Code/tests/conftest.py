@@ -0,0 +1,152 @@
+"""
+File name:  conftest.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Configuration of the tests, which import the Neuroviz package from
+            the Code directory, like Main.py does. The scenes are rendered off
+            screen, on a copy of the configuration file and a small synthetic
+            volume.
+"""
+
+################################################################################
+################################################################################
+
+import os
+import sys
+from os.path import dirname, join, realpath
+from shutil import copy
+from time import monotonic
+
+sys.path.insert( 0, dirname( dirname( realpath( __file__ ) ) ) )
+os.environ.setdefault( "QT_QPA_PLATFORM", "offscreen" )
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import QEventLoop, QSettings, QTimer
+from PyQt5.QtWidgets import QApplication
+from vtk import (vtkGenericRenderWindowInteractor, vtkMetaImageWriter,
+                 vtkRenderWindow)
+
+from Neuroviz.Readers import arrayToImage
+
+################################################################################
+################################################################################
+
+def balls( size = 48, dtype = np.uint8 ):
+    """
+    Get a (z, y, x) volume whose values fall off from 255 at its center by 8
+    per voxel, such that the contour at value v is a ball of radius
+    (255 - v) / 8 around the center.
+    """
+    z, y, x = np.mgrid[:size, :size, :size] - (size - 1) / 2
+
+    return np.clip( 255 - 8 * np.sqrt( x ** 2 + y ** 2 + z ** 2 ), 0, 255 ).round().astype( dtype )
+
+################################################################################
+
+def pump( milliseconds = 10 ):
+    """
+    Process the events of the application for the given time.
+    """
+    loop = QEventLoop()
+    QTimer.singleShot( milliseconds, loop.quit )
+    loop.exec_()
+
+################################################################################
+
+def waitUntil( condition, timeout = 60.0 ):
+    """
+    Process the events of the application until the condition holds. Fails
+    the test after the given timeout (in seconds).
+    """
+    end = monotonic() + timeout
+
+    while not condition():
+        if monotonic() > end: pytest.fail( "Timed out waiting for the scene." )
+        pump()
+
+################################################################################
+################################################################################
+
+@pytest.fixture( scope = "session" )
+def application():
+    """
+    The application, whose settings are replaced by each test (see settings).
+    """
+    return QApplication.instance() or QApplication( [] )
+
+################################################################################
+
+@pytest.fixture
+def settings( application, tmp_path, monkeypatch ):
+    """
+    A copy of the configuration file in a temporary directory, which is the
+    working directory of the test, using a volume of balls (see balls) that
+    is rendered in a fixed way (no measurements).
+    """
+    copy( join( dirname( dirname( realpath( __file__ ) ) ), "Neuroviz.ini" ), tmp_path )
+    monkeypatch.chdir( tmp_path )
+
+    writer = vtkMetaImageWriter()
+    writer.SetInputData( arrayToImage( balls() ) )
+    writer.SetFileName( str( tmp_path / "volume.mhd" ) )
+    writer.SetCompression( False )
+    writer.Write()
+
+    application.settings = QSettings( str( tmp_path / "Neuroviz.ini" ), QSettings.IniFormat )
+
+    for key, value in {"FileName": "/volume.mhd", "TransparencyStrategy": "DepthPeeling",
+                       "MeshFormat": "Triangles", "InteractionStyle": "Opacity"}.items():
+        application.settings.setValue( f"BasicScene/{key}", value )
+
+    return application.settings
+
+################################################################################
+
+@pytest.fixture
+def renderWindow():
+    """
+    An off screen render window with an interactor.
+    """
+    renderWindow = vtkRenderWindow()
+    renderWindow.SetOffScreenRendering( True )
+    renderWindow.SetSize( 200, 200 )
+
+    interactor = vtkGenericRenderWindowInteractor()
+    interactor.SetRenderWindow( renderWindow )
+
+    yield renderWindow
+
+    renderWindow.Finalize()
+
+################################################################################
+
+@pytest.fixture
+def createScene( settings, renderWindow ):
+    """
+    A function that creates a "Basic" scene with the settings and waits until
+    it has been loaded (unless asked not to). The jobs of the scene are
+    cancelled and waited for at the end of the test.
+    """
+    from Neuroviz.Scenes import BasicScene
+
+    scenes = []
+
+    def create( wait = True ):
+        scenes.append( BasicScene( renderWindow ) )
+        if wait: waitUntil( lambda : not scenes[-1].isLoading() )
+
+        return scenes[-1]
+
+    yield create
+
+    for scene in scenes:
+        scene._jobQueue.cancelAll()
+        scene._jobQueue._pool.waitForDone()
+
+    pump()
+
+################################################################################
+################################################################################
@@ -0,0 +1,593 @@
+"""
+File name:  test_BasicScene.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the "Basic" scene (see Neuroviz.Scenes.BasicScene), on a
+            volume of balls (see conftest.balls).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+from vtk import vtkImageData
+
+from conftest import balls, waitUntil
+from Neuroviz.Meshes import polyDataToArrays
+from Neuroviz.Readers import imageToArray, writeMetaImage
+
+################################################################################
+################################################################################
+
+def _radius( mesh ):
+    """
+    Get the mean distance of the points of a mesh to their center.
+    """
+    points, _ = polyDataToArrays( mesh )
+
+    return float( np.linalg.norm( points - points.mean( axis = 0 ), axis = 1 ).mean() ) if len( points ) else 0.0
+
+################################################################################
+
+def _contourRadius( scene, contourName ):
+    """
+    Get the radius of the shown contour of the given name.
+    """
+    return _radius( scene._contours[scene._contourNames.index( contourName )][0] )
+
+################################################################################
+
+def test_setContourInfo( createScene ):
+    """
+    Editing a contour replaces it by the contour of the last value, the
+    extraction of a superseded value is cancelled.
+    """
+    scene = createScene()
+    shown, onContourCreated = [], scene._onContourCreated
+
+    def showContour( index, result ):
+        shown.append( index )
+        onContourCreated( index, result )
+
+    scene._onContourCreated = showContour
+
+    scene.setContourInfo( "Lesion", 200, preview = True )
+    scene.setContourInfo( "Lesion", 200 )
+    scene.setContourInfo( "Lesion", 127 )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert shown == [3]
+    assert abs( _contourRadius( scene, "Lesion" ) - 16 ) < 1
+    assert "Lesion->127" in scene._settings.value( "BasicScene/ContourValues", type = list )
+
+################################################################################
+
+def test_setContourInfoInVolumeStyle( createScene ):
+    """
+    A contour that is edited in "Volume" style is built once the contours are
+    shown again.
+    """
+    scene = createScene()
+    scene.setInteractionStyle( "Volume" )
+
+    scene.setContourInfo( "Lesion", 127 )
+    assert not scene._jobQueue.isBusy( "Lesion" )
+
+    scene.setInteractionStyle( "Opacity" )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert abs( _contourRadius( scene, "Lesion" ) - 16 ) < 1
+
+################################################################################
+
+def test_cropVolume( createScene, settings ):
+    """
+    An automatically cropped volume holds the contours, which are those of
+    the whole volume. A manually cropped volume is cropped to its extent.
+    """
+    settings.setValue( "BasicScene/ContourValues", ["Head->150", "Grey matter->160", "Brain->169", "Lesion->200"] )
+    radii = {}
+
+    for mode in ("None", "Automatic", "Manual"):
+        settings.setValue( "BasicScene/CropMode", mode )
+        settings.setValue( "BasicScene/CropExtent", [8, 39, 4, 35, 0, 47] )
+        scene = createScene()
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+        radii[mode] = [_contourRadius( scene, name ) for name in scene._contourNames]
+
+        if mode == "None": assert scene._data.GetDimensions() == (48, 48, 48)
+        if mode == "Automatic": assert max( scene._data.GetDimensions() ) < 48
+        if mode == "Manual": assert np.allclose( scene._data.GetBounds(), (8, 39, 4, 35, 0, 47) )
+
+    assert np.allclose( radii["Automatic"], radii["None"], atol = 1e-3 )
+
+################################################################################
+
+def test_loadReorientedVolume( createScene, settings, tmp_path ):
+    """
+    A reoriented volume is only copied within the crop of its contours, the
+    output of the reader (the whole volume) is never wrapped.
+    """
+    array = balls()[:, :, :40]
+    header = {"ObjectType": "Image", "NDims": 3, "DimSize": "40 48 48", "ElementType": "MET_UCHAR",
+              "TransformMatrix": "-1 0 0 0 1 0 0 0 -1", "ElementDataFile": "LOCAL"}
+
+    with open( tmp_path / "flipped.mha", "wb" ) as f:
+        f.write( "".join( f"{key} = {value}\n" for key, value in header.items() ).encode( "latin-1" ) )
+        f.write( array.tobytes() )
+
+    settings.setValue( "BasicScene/FileName", "/flipped.mha" )
+    settings.setValue( "BasicScene/ContourValues", ["Head->150", "Grey matter->160", "Brain->169", "Lesion->200"] )
+    scene = createScene()
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert not isinstance( scene._reader.GetOutputDataObject( 0 ), vtkImageData )
+    assert scene._data.GetDimensions()[0] < 40
+    assert np.array_equal( imageToArray( scene._data ), array[::-1, :, ::-1][tuple(
+        slice( scene._dataExtent[2 * i], scene._dataExtent[2 * i + 1] + 1 ) for i in (2, 1, 0) )] )
+    assert abs( _contourRadius( scene, "Brain" ) - 10.75 ) < 1
+
+################################################################################
+
+def test_loadStreaming( createScene, settings ):
+    """
+    In "Streaming" mode, the contours are those of "Continuous" mode, while
+    the volume is neither cropped nor copied.
+    """
+    radii = {}
+
+    for mode in ("Continuous", "Streaming"):
+        settings.setValue( "BasicScene/ContourMode", mode )
+        settings.setValue( "BasicScene/MemoryBudget", 0 )
+        scene = createScene()
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+        radii[mode] = [_contourRadius( scene, name ) for name in scene._contourNames]
+
+    assert np.shares_memory( imageToArray( scene._data ), scene._reader.GetArray() )
+    assert scene._data.GetDimensions() == (48, 48, 48)
+    assert np.allclose( radii["Streaming"], radii["Continuous"], atol = 0.05 )
+
+################################################################################
+
+def test_releaseExtractionPool( createScene, settings, monkeypatch ):
+    """
+    In "Lean" mode, the processes that extract the contours are kept until
+    the deferred contours have been built in the background, rather than
+    being started again for them.
+    """
+    from Neuroviz.Contours import ExtractionPool
+
+    starts, start = [], ExtractionPool._start
+    monkeypatch.setattr( ExtractionPool, "_start", lambda pool : (starts.append( pool ), start( pool )) )
+
+    for key, value in {"Processes": 2, "PipelineMode": "Lean", "ContourConstruction": "Background",
+                       "ContourValues": ["Head->100", "Grey matter->127", "Brain->169", "Lesion->200"]}.items():
+        settings.setValue( f"BasicScene/{key}", value )
+
+    scene = createScene()
+    waitUntil( lambda : not scene._jobQueue.isBusy() and scene._extractionPool is None )
+
+    assert len( starts ) == 1 and scene._deferredContours == set()
+    assert starts[0]._executor is None
+
+    for name, radius in (("Head", 19.4), ("Grey matter", 16), ("Brain", 10.75), ("Lesion", 6.9)):
+        assert abs( _contourRadius( scene, name ) - radius ) < 1
+
+################################################################################
+
+def test_loadProgressively( createScene, settings ):
+    """
+    The scene is built from a downsampled volume first, after which the full
+    resolution volume replaces it. The progress only increases.
+    """
+    settings.setValue( "BasicScene/PreviewVoxels", 1000 )
+    scene = createScene( wait = False )
+
+    events = []
+    scene.previewLoaded.connect( lambda : events.append( ("Preview", scene._image.GetOutputDataObject( 0 ).GetDimensions()) ) )
+    scene.loadingProgressed.connect( lambda progress : events.append( ("Progress", progress) ) )
+    scene.loadingFinished.connect( lambda success : events.append( ("Finished", success) ) )
+
+    waitUntil( lambda : not scene.isLoading() )
+
+    previews = [i for i, (e, _) in enumerate( events ) if e == "Preview"]
+    assert len( previews ) == 1 and np.prod( events[previews[0]][1] ) <= 1000
+    assert events[-1] == ("Finished", True)
+
+    progress = [p for e, p in events if e == "Progress"]
+    assert progress == sorted( progress ) and progress[-1] == 100
+    assert scene._image.GetOutputDataObject( 0 ).GetDimensions() == scene._data.GetDimensions()
+
+################################################################################
+
+def test_cancelLoading( createScene, settings ):
+    """
+    Loading that is cancelled before the downsampled scene has been built
+    stops once it has been, such that the scene can be used.
+    """
+    settings.setValue( "BasicScene/PreviewVoxels", 1000 )
+    scene = createScene( wait = False )
+
+    finished = []
+    scene.loadingFinished.connect( finished.append )
+    scene.cancelLoading()
+
+    waitUntil( lambda : not scene.isLoading() and finished )
+
+    assert finished == [False]
+    assert scene._image.GetOutputDataObject( 0 ) is scene._previewImage
+    assert _contourRadius( scene, "Head" ) > 0
+
+################################################################################
+
+def test_measureTransparencyStrategies( createScene, settings ):
+    """
+    In "Automatic" mode, a strategy is measured for the translucent contours
+    of the interaction style and used from then on.
+    """
+    settings.setValue( "BasicScene/TransparencyStrategy", "Automatic" )
+    scene = createScene()
+
+    scene._renderWindow.Render()
+    waitUntil( lambda : "Opacity" in scene._measuredStrategies )
+
+    assert scene._measuredStrategies["Opacity"] in ("DepthPeeling", "CappedPeeling", "SortedLayer")
+
+    scene._renderWindow.Render()
+    assert scene._activeStrategy == scene._measuredStrategies["Opacity"]
+
+################################################################################
+
+def test_onTransparencyStrategiesMeasured( createScene ):
+    """
+    The most exact strategy that meets the target frame rate is chosen, or the
+    fastest one if none does.
+    """
+    scene = createScene()
+    budget = 1.0 / scene._targetFPS
+
+    scene._onTransparencyStrategiesMeasured( "Opacity", {"DepthPeeling": 2 * budget, "CappedPeeling": budget / 2,
+                                                         "SortedLayer": budget / 4} )
+    scene._onTransparencyStrategiesMeasured( "Interactive", {"DepthPeeling": 4 * budget, "CappedPeeling": 3 * budget,
+                                                             "SortedLayer": 2 * budget} )
+
+    assert scene._measuredStrategies == {"Opacity": "CappedPeeling", "Interactive": "SortedLayer"}
+
+################################################################################
+
+def test_sortTranslucentActors( createScene ):
+    """
+    Translucent actors are rendered from back to front, the renderer is only
+    changed when their order changes.
+    """
+    scene = createScene()
+    for actor in scene._contourActors: actor.GetProperty().SetOpacity( 0.5 )
+
+    actors = scene._getTranslucentActors()
+    assert len( actors ) > 1
+
+    scene._sortTranslucentActors( actors )
+    collection = scene._renderer.GetActors()
+    modified = collection.GetMTime()
+    scene._sortTranslucentActors( actors[::-1] )
+
+    assert collection.GetMTime() == modified
+
+    camera = np.array( scene._renderer.GetActiveCamera().GetPosition() )
+    distances = [np.linalg.norm( np.array( actor.GetCenter() ) - camera ) for actor in scene._sortedActors]
+    assert distances == sorted( distances, reverse = True )
+
+################################################################################
+
+def test_updateOctantActors( createScene, settings ):
+    """
+    Only the octants of the last slice positions are delivered, the build for
+    superseded positions is cancelled. The eight octants are swapped at once,
+    the mappers keep the previous octants until then.
+    """
+    settings.setValue( "BasicScene/InteractionStyle", "Interactive" )
+    scene = createScene()
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    delivered, setOctantMeshes = [], scene._setOctantMeshes
+
+    def swapOctants( octants ):
+        delivered.append( octants )
+        setOctantMeshes( octants )
+
+    scene._setOctantMeshes = swapOctants
+    previous = [mapper.GetInput() for mapper in scene._octantMappers]
+
+    scene.updateSlices( [10, 20, 30] )
+    scene.updateSlices( [30, 20, 10] )
+    assert [mapper.GetInput() for mapper in scene._octantMappers] == previous
+
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert len( delivered ) == 1 and len( delivered[0] ) == 8
+    assert all( mapper.GetInput() is mesh for mapper, (mesh, _) in zip( scene._octantMappers, delivered[0] ) )
+
+    # The octant in the lowest x-range ends at the last x-position.
+    points, _ = polyDataToArrays( delivered[0][0][0] )
+    assert len( points ) > 0 and points[:, 0].max() < 32
+
+################################################################################
+
+def test_setSlabInfo( createScene, settings ):
+    """
+    The slices show the projections of the slabs around them. Changing the
+    thickness reuses the slab indices, whose levels are kept.
+    """
+    settings.setValue( "BasicScene/CropMode", "None" )
+    scene = createScene()
+    scene.updateSlices( [24, 24, 24] )
+    array = balls()
+
+    scene.setSlabInfo( "Maximum", 8 )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+    indices = scene._slabIndices
+
+    scene.setSlabInfo( "Maximum", 3 )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert all( index.getThickness() == 3 for index in scene._slabIndices )
+    assert all( new._levels[3] is old._levels[3] for new, old in zip( scene._slabIndices, indices ) )
+
+    projection = imageToArray( scene._imageReslices[2].GetInput() )[0]
+    assert np.array_equal( projection, array[23:26].max( axis = 0 ) )
+
+    scene.setSlabInfo( "Minimum", 3 )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert scene._slabIndices[0]._levels[1] is not indices[0]._levels[1]
+    assert np.array_equal( imageToArray( scene._imageReslices[2].GetInput() )[0], array[23:26].min( axis = 0 ) )
+
+################################################################################
+
+def test_moveObliqueSlice( createScene, settings ):
+    """
+    The oblique slice is resampled on a reduced grid, using nearest neighbour
+    interpolation, while its plane is being dragged, and refined once it
+    stops. The output of the reslicing is reused.
+    """
+    settings.setValue( "BasicScene/ObliqueSlice", True )
+    settings.setValue( "BasicScene/CropMode", "None" )
+    scene = createScene()
+
+    reslice, widget = scene._obliqueReslice, scene._obliqueSliceWidget
+    output = reslice.GetOutput()
+
+    widget.GetRepresentation().SetNormal( 0.0, 0.0, 1.0 )
+    widget.GetRepresentation().SetOrigin( 23.5, 23.5, 24.0 )
+    widget.InvokeEvent( "InteractionEvent" )
+    scene._renderWindow.Render()
+
+    assert reslice.GetInterpolationModeAsString() == "NearestNeighbor"
+    assert reslice.GetOutputSpacing()[0] == 2.0 and reslice.GetOutputExtent()[:2] == (-21, 21)
+    reduced = output.GetNumberOfPoints()
+
+    waitUntil( lambda : reslice.GetInterpolationModeAsString() == "Cubic" )
+    scene._renderWindow.Render()
+
+    assert reslice.GetOutputSpacing()[0] == 1.0 and reslice.GetOutputExtent()[:2] == (-41, 41)
+    assert reslice.GetOutput() is output and output.GetNumberOfPoints() > 3 * reduced
+    assert [float( x ) for x in settings.value( "BasicScene/ObliqueNormal", type = list )] == [0.0, 0.0, 1.0]
+
+    # The center of the grid lies between the central voxels of the balls.
+    center = output.GetScalarComponentAsDouble( 0, 0, 0, 0 )
+    assert abs( center - balls()[24, 23:25, 23:25].mean() ) < 4
+
+################################################################################
+
+def test_measureMeshFormats( createScene, settings ):
+    """
+    Optimized contours fit their triangle budgets and are shown in the
+    fastest of the measured formats, as strips or as plain triangles.
+    """
+    for key, value in {"MeshOptimization": True, "MeshFormat": "Automatic", "ContourConstruction": "Eager",
+                       "TriangleBudgets": ["Head->2000", "Grey matter->1000", "Brain->500", "Lesion->500"]}.items():
+        settings.setValue( f"BasicScene/{key}", value )
+
+    scene = createScene()
+    waitUntil( lambda : not scene._jobQueue.isBusy() and not scene._isMeshFormatPending )
+
+    assert scene._meshFormat in ("Strips", "Triangles")
+
+    for (mesh, _), budget in zip( scene._contours, (2000, 1000, 500) ):
+        assert 0 < mesh.GetNumberOfCells() <= budget
+        assert (mesh.GetNumberOfStrips() > 0) == (scene._meshFormat == "Strips")
+
+################################################################################
+
+def test_getStatistics( createScene, settings ):
+    """
+    The statistics of the tissues are measured once, on a worker thread, and
+    match the voxels at or above the contour values.
+    """
+    settings.setValue( "BasicScene/CropMode", "None" )
+    scene = createScene( wait = False )
+
+    changed = []
+    scene.statisticsChanged.connect( lambda : changed.append( scene.getStatistics() ) )
+    waitUntil( lambda : not scene._jobQueue.isBusy() and changed )
+
+    statistics, array = scene.getStatistics(), balls()
+    assert changed == [statistics]
+
+    for name in scene._contourNames:
+        voxels, volume, bounds = statistics[name]
+        mask = array >= scene._contourValues[name]
+
+        assert voxels == mask.sum() and volume == voxels
+        if voxels == 0: assert bounds is None
+        else: assert bounds[0] == np.nonzero( mask.any( axis = (0, 1) ) )[0][0] - 0.5
+
+################################################################################
+
+def test_compactVolume( createScene, settings ):
+    """
+    In "Compact" mode, a label volume stored as float64 is kept as uint8,
+    which leaves the contours unchanged.
+    """
+    writeMetaImage( "labels.mha", balls().astype( np.float64 ), (1.0, 1.0, 1.0), (0.0, 0.0, 0.0) )
+    settings.setValue( "BasicScene/FileName", "/labels.mha" )
+    radii = {}
+
+    for dataTypes in ("Original", "Compact"):
+        settings.setValue( "BasicScene/DataTypes", dataTypes )
+        scene = createScene()
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+        radii[dataTypes] = [_contourRadius( scene, name ) for name in scene._contourNames]
+        assert scene._data.GetScalarTypeAsString() == ("unsigned char" if dataTypes == "Compact" else "double")
+
+    assert np.allclose( radii["Compact"], radii["Original"], atol = 1e-3 )
+
+################################################################################
+
+def test_reuseStages( createScene, monkeypatch ):
+    """
+    Going back to an earlier value of a contour reuses the stages of its
+    pipeline instead of extracting the contour again.
+    """
+    import Neuroviz.Contours
+
+    scene, extracted = createScene(), []
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    extractSurface = Neuroviz.Contours.extractSurface
+    monkeypatch.setattr( Neuroviz.Contours, "extractSurface",
+                         lambda image, value, *args, **kwargs : extracted.append( value ) or
+                                                                extractSurface( image, value, *args, **kwargs ) )
+
+    for value in (200, 254, 200):
+        scene.setContourInfo( "Lesion", value )
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert extracted == [200]
+    assert abs( _contourRadius( scene, "Lesion" ) - 55 / 8 ) < 1
+    assert scene._stageCache.getOutputs()
+
+################################################################################
+
+def test_releaseIntermediates( createScene, settings ):
+    """
+    In "Lean" pipeline mode, the volume as read, the outputs of the reslicing
+    and the downsampled volume are released once the scene is loaded, which
+    takes less memory. The memoized stages are kept and the slices still
+    move.
+    """
+    settings.setValue( "BasicScene/CropMode", "Manual" )
+    settings.setValue( "BasicScene/CropExtent", [4, 43, 4, 43, 4, 43] )
+    sizes = {}
+
+    for mode in ("Default", "Lean"):
+        settings.setValue( "BasicScene/PipelineMode", mode )
+        scene = createScene()
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+        sizes[mode] = scene.getMemorySize()
+
+    assert sizes["Lean"] < sizes["Default"]
+    assert scene._reader._array is None and scene._data.GetPointData().GetScalars() is not None
+    assert all( reslice.GetReleaseDataFlag() for reslice in scene._imageReslices )
+    assert scene._previewImage is None and scene._stageCache.getOutputs()
+
+    scene.updateSlices( [10, 20, 30] )
+    scene._renderWindow.Render()
+
+    colors = imageToArray( scene._imageResliceMappers[2].GetOutput() )
+    assert colors.size > 0 and colors.max() > 0
+
+################################################################################
+
+def test_contourSampleRates( createScene, settings ):
+    """
+    A subsampled contour has fewer triangles at the same distance from the
+    center, except around the focus contour, where it is extracted at full
+    resolution.
+    """
+    settings.setValue( "BasicScene/ContourValues", ["Head->100", "Grey matter->127", "Brain->169", "Lesion->200"] )
+    settings.setValue( "BasicScene/FocusMargin", 0 )
+    triangles = {}
+
+    for focus in (None, "", "Lesion"):
+        if focus is None: settings.remove( "BasicScene/ContourSampleRates" )
+        else: settings.setValue( "BasicScene/ContourSampleRates", ["Grey matter->2"] )
+        settings.setValue( "BasicScene/FocusContour", focus or "" )
+
+        scene = createScene()
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+        points, triangles[focus] = polyDataToArrays( scene._contours[scene._contourNames.index( "Grey matter" )][0] )
+        assert np.all( np.abs( np.linalg.norm( points - 23.5, axis = 1 ) - 16 ) < 0.5 )
+
+    assert len( triangles[""] ) < len( triangles["Lesion"] ) < len( triangles[None] )
+
+################################################################################
+
+def test_setActiveContourInLazyMode( createScene, settings ):
+    """
+    In "Lazy" mode, only the "Head" and the active contour are built while
+    loading, the others once they become the active contour.
+    """
+    settings.setValue( "BasicScene/ContourValues", ["Head->100", "Grey matter->127", "Brain->169", "Lesion->200"] )
+    settings.setValue( "BasicScene/ContourConstruction", "Lazy" )
+    settings.setValue( "BasicScene/ActiveContour", "Brain" )
+    scene = createScene()
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert scene._deferredContours == {"Grey matter", "Lesion"}
+    assert _contourRadius( scene, "Grey matter" ) == 0.0 and abs( _contourRadius( scene, "Brain" ) - 86 / 8 ) < 1
+
+    scene.setActiveContour( "Grey matter" )
+    assert scene._deferredContours == {"Lesion"}
+
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+    assert abs( _contourRadius( scene, "Grey matter" ) - 16 ) < 1
+
+################################################################################
+
+def test_onJobsFailed( createScene, settings, monkeypatch ):
+    """
+    A contour that could not be built is deferred again, such that it is built
+    once it is asked for again. The slices show the slices themselves when
+    the slab indices could not be built and the octants are kept when the new
+    ones could not be built.
+    """
+    import Neuroviz.Scenes
+
+    settings.setValue( "BasicScene/ContourConstruction", "Lazy" )
+    settings.setValue( "BasicScene/InteractionStyle", "Interactive" )
+    scene = createScene()
+    scene.setSlabInfo( "Maximum", 8 )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+    assert scene._slabIndices is not None
+
+    def fail( *args, job = None, **kwargs ):
+        raise MemoryError( "Out of memory." )
+
+    with monkeypatch.context() as patch:
+        for name in ("createContour", "createSlabIndices", "createOctants"): patch.setattr( Neuroviz.Scenes, name, fail )
+        octants = [mapper.GetInput() for mapper in scene._octantMappers]
+
+        scene.setActiveContour( "Grey matter" )
+        scene.setSlabInfo( "Minimum", 8 )
+        scene.updateSlices( [10, 20, 30] )
+        waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert "Grey matter" in scene._deferredContours and _contourRadius( scene, "Grey matter" ) == 0.0
+    assert scene._slabIndices is None
+    assert [mapper.GetInput() for mapper in scene._octantMappers] == octants
+
+    scene.setActiveContour( "Grey matter" )
+    waitUntil( lambda : not scene._jobQueue.isBusy() )
+
+    assert "Grey matter" not in scene._deferredContours and _contourRadius( scene, "Grey matter" ) > 0.0
+
+################################################################################
+################################################################################
@@ -0,0 +1,91 @@
+"""
+File name:  test_Bricks.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the brick index (see Neuroviz.Bricks).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+
+from Neuroviz.Bricks import BrickIndex
+
+################################################################################
+################################################################################
+
+def test_range():
+    """
+    The range of the index is the range of the volume.
+    """
+    array = np.random.default_rng( 0 ).integers( -100, 100, (20, 30, 40) ).astype( np.int16 )
+
+    assert BrickIndex( array, 8 ).getRange() == (array.min(), array.max())
+
+################################################################################
+
+def test_activeBricks():
+    """
+    Every brick with a cell that crosses the value is active.
+    """
+    array = np.zeros( (32, 32, 32), dtype = np.uint8 )
+    array[10:20, 5:9, 17:30] = 200
+    active = BrickIndex( array, 8 ).activeBricks( 100 )
+
+    # The cell between voxels z and z + 1 belongs to the brick of voxel z.
+    for z, y, x in zip( *np.nonzero( np.diff( array > 100, axis = 0 ) ) ):
+        assert active[z // 8, y // 8, x // 8]
+
+    assert not active[3, 3, 0]
+
+################################################################################
+
+def test_activeExtents():
+    """
+    The active extents cover the voxels of the active bricks, slab by slab,
+    and overlap at most by the plane of voxels that consecutive slabs share.
+    """
+    array = np.zeros( (32, 32, 32), dtype = np.uint8 )
+    array[4:12, 5:9, 17:30] = 200
+    array[20:28, 20:30, 2:6] = 200
+    extents = BrickIndex( array, 8 ).activeExtents( 100 )
+
+    assert extents[0][4] == 0 and extents[-1][5] == 31
+    assert all( a[5] <= b[4] for a, b in zip( extents, extents[1:] ) )
+
+    for z, y, x in zip( *np.nonzero( array ) ):
+        assert any( e[0] <= x <= e[1] and e[2] <= y <= e[3] and e[4] <= z <= e[5] for e in extents )
+
+################################################################################
+
+def test_boundingExtent():
+    """
+    The bounding extent covers the voxels above the value, grown by the margin
+    and clipped to the volume.
+    """
+    array = np.zeros( (32, 40, 48), dtype = np.float32 )
+    array[10:20, 5:9, 17:30] = 1.0
+    bricks = BrickIndex( array, 8 )
+
+    x0, x1, y0, y1, z0, z1 = bricks.boundingExtent( 0.5 )
+    assert x0 <= 17 and x1 >= 29 and y0 <= 5 and y1 >= 8 and z0 <= 10 and z1 >= 19
+
+    assert bricks.boundingExtent( 0.5, 100 ) == (0, 47, 0, 39, 0, 31)
+    assert bricks.boundingExtent( 2.0 ) is None
+
+################################################################################
+
+def test_valuesPresent():
+    """
+    Only the values that are crossed by a brick are present.
+    """
+    array = np.zeros( (16, 16, 16), dtype = np.uint8 )
+    array[4:8, 4:8, 4:8] = 100
+
+    assert list( BrickIndex( array, 8 ).valuesPresent( [50, 150] ) ) == [50]
+
+################################################################################
+################################################################################
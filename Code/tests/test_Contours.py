@@ -0,0 +1,257 @@
+"""
+File name:  test_Contours.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the extraction of the contours (see Neuroviz.Contours).
+"""
+
+################################################################################
+################################################################################
+
+from threading import Timer
+
+import numpy as np
+import pytest
+
+from conftest import balls
+from Neuroviz.Bricks import BrickIndex
+from Neuroviz.Contours import (ExtractionPool, _budgetSlices, _regions, _subsampledSmoothing, contourExtent,
+                               createContour, createOctants, extractLabelSurfaces, extractSurface,
+                               optimizeSurface)
+from Neuroviz.Meshes import polyDataToArrays
+from Neuroviz.Readers import arrayToImage, imageToArray
+
+################################################################################
+################################################################################
+
+def _labels():
+    """
+    Get a label volume of two nested balls: label 1 around label 2.
+    """
+    z, y, x = np.mgrid[:32, :32, :32]
+    radius = np.sqrt( (x - 15.5) ** 2 + (y - 15.5) ** 2 + (z - 15.5) ** 2 )
+
+    return np.select( [radius < 6, radius < 12], [2, 1], 0 ).astype( np.uint8 )
+
+################################################################################
+
+def test_extractLabelSurfaces():
+    """
+    The surface of every label is extracted in a single pass, with an empty
+    surface for a missing label.
+    """
+    surfaces = [polyDataToArrays( s ) for s in extractLabelSurfaces( arrayToImage( _labels() ), [1, 2, 3] )]
+
+    for (points, triangles), radius in zip( surfaces, (12, 6) ):
+        distances = np.linalg.norm( points[np.unique( triangles )] - 15.5, axis = 1 )
+        assert len( triangles ) > 0 and np.all( distances < radius + 1 )
+
+    # The surface of the outer label reaches out to the outer ball.
+    assert np.linalg.norm( surfaces[0][0] - 15.5, axis = 1 ).max() > 11
+    assert len( surfaces[2][1] ) == 0
+
+################################################################################
+
+def test_extractSurfaceWithBricks():
+    """
+    Skipping the bricks that do not cross the value leaves the isosurface
+    unchanged, with or without smoothing.
+    """
+    image = arrayToImage( balls( 64 ) )
+    bricks = BrickIndex( imageToArray( image ), 8 )
+
+    for smoothing in (None, (2, 1.0, 50, 0.05, 45.0)):
+        for value in (127, 230):
+            points, triangles = polyDataToArrays( extractSurface( image, value, smoothing ) )
+            skipped, skippedTriangles = polyDataToArrays( extractSurface( image, value, smoothing, bricks = bricks ) )
+
+            assert len( skippedTriangles ) == len( triangles ) > 0
+            assert np.allclose( np.unique( skipped.round( 4 ), axis = 0 ), np.unique( points.round( 4 ), axis = 0 ) )
+
+################################################################################
+
+def test_extractSurfaceWithBudget():
+    """
+    Streaming the image through the filters in slabs leaves the isosurface
+    unchanged, also when the bricks that do not cross the value are skipped.
+    """
+    image = arrayToImage( balls( 64 ) )
+    bricks = BrickIndex( imageToArray( image ), 8 )
+    smoothing = (2, 1.0, 50, 0.05, 45.0)
+
+    points, triangles = polyDataToArrays( extractSurface( image, 127, smoothing ) )
+
+    for budget in (64 * 64 * 4 * 12, 1):
+        for streamed in (extractSurface( image, 127, smoothing, budget = budget ),
+                         extractSurface( image, 127, smoothing, bricks = bricks, budget = budget )):
+            streamedPoints, streamedTriangles = polyDataToArrays( streamed )
+
+            assert len( streamedTriangles ) == len( triangles )
+            assert np.allclose( np.unique( streamedPoints.round( 4 ), axis = 0 ), np.unique( points.round( 4 ), axis = 0 ) )
+
+################################################################################
+
+def test_regions():
+    """
+    The inner extents of the regions tile the image in slabs that fit the
+    budget along with their margin, the outer extents add the margin.
+    """
+    image = arrayToImage( balls( 40 ) )
+    smoothing = (2, 1.0, 50, 0.05, 45.0)
+    budget = 44 * 44 * 4 * 14
+
+    assert _budgetSlices( (0, 39, 0, 39, 0, 39), 2, 4, budget ) == 10
+    assert _budgetSlices( (0, 39, 0, 39, 0, 39), 2, 4, 1 ) == 2
+
+    regions = _regions( image, 127, smoothing, budget = budget )
+    assert len( regions ) > 1
+    assert regions[0][1][4] == 0 and regions[-1][1][5] == 39
+
+    for (outer, inner), (nextOuter, nextInner) in zip( regions, regions[1:] ):
+        assert inner[5] == nextInner[4]
+
+    for outer, inner in regions:
+        assert inner[5] - inner[4] + 1 <= 10
+        assert outer == [0, 39, 0, 39, max( inner[4] - 2, 0 ), min( inner[5] + 2, 39 )]
+
+################################################################################
+
+def test_ExtractionPool():
+    """
+    The processes of the pool extract watertight surfaces, which match the
+    surfaces extracted by a single process. An extraction fails when the pool
+    is shut down, after which the pool is started again.
+    """
+    image = arrayToImage( balls( 64 ) )
+    pool = ExtractionPool( image, 2 )
+
+    try:
+        for value, smoothing in ((127, None), (200, (2, 1.0, 50, 0.05, 45.0))):
+            points, triangles = polyDataToArrays( extractSurface( image, value, smoothing ) )
+            (pooled, pooledTriangles), = [polyDataToArrays( s ) for s in pool.extract( [value], [smoothing],
+                                                                                          sincs = [False] )]
+
+            assert len( pooledTriangles ) == len( triangles )
+            assert np.allclose( np.unique( pooled.round( 4 ), axis = 0 ), np.unique( points.round( 4 ), axis = 0 ) )
+
+            # Every edge of a watertight surface is shared by two triangles.
+            edges = np.sort( pooledTriangles[:, [0, 1, 1, 2, 2, 0]].reshape( -1, 2 ), axis = 1 )
+            assert np.all( np.unique( edges, axis = 0, return_counts = True )[1] == 2 )
+
+        shutdown = Timer( 0.2, pool.shutdown )
+        shutdown.start()
+
+        with pytest.raises( RuntimeError ):
+            for _ in range( 100 ): pool.extract( [127] * 8, [(2, 1.0, 50, 0.05, 45.0)] * 8 )
+
+        shutdown.join()
+        assert pool.extract( [127], [None] )[0].GetNumberOfCells() > 0
+    finally:
+        pool.shutdown()
+
+################################################################################
+
+def test_contourExtent():
+    """
+    Cropping the volume to the extent that the contours can reach leaves the
+    contours unchanged.
+    """
+    array, smoothing = balls( 64 ), (2, 1.0, 50, 0.05, 45.0)
+    extent = contourExtent( array, [150, 200], [smoothing, None] )
+
+    assert extent is not None and extent[1] - extent[0] < 63
+    assert contourExtent( array, [256], [None] ) is None
+
+    cropped = array[extent[4]:extent[5] + 1, extent[2]:extent[3] + 1, extent[0]:extent[1] + 1]
+    origin = extent[::2]
+
+    for value in (150, 200):
+        points, triangles = polyDataToArrays( extractSurface( arrayToImage( array ), value, smoothing ) )
+        croppedPoints, croppedTriangles = polyDataToArrays( extractSurface( arrayToImage( cropped, origin = origin ),
+                                                                            value, smoothing ) )
+
+        assert len( croppedTriangles ) == len( triangles )
+        assert np.allclose( np.unique( croppedPoints.round( 4 ), axis = 0 ), np.unique( points.round( 4 ), axis = 0 ) )
+
+################################################################################
+
+def test_createOctants():
+    """
+    The octants of a surface are cut by their bounds, such that together they
+    cover the whole surface.
+    """
+    _, _, surface = createContour( arrayToImage( balls() ), 127, withRawSurface = True )
+    bounds = [(*x, *y, *z) for x in ((0, 20), (20, 47)) for y in ((0, 30), (30, 47)) for z in ((0, 10), (10, 47))]
+
+    octants = createOctants( surface, bounds )
+    assert len( octants ) == 8
+
+    for (mesh, _), (x0, x1, y0, y1, z0, z1) in zip( octants, bounds ):
+        points, triangles = polyDataToArrays( mesh )
+        centers = points[triangles].mean( axis = 1 )
+        assert len( triangles ) > 0
+        assert np.all( (centers >= (x0 - 1, y0 - 1, z0 - 1)) & (centers <= (x1 + 1, y1 + 1, z1 + 1)) )
+
+    # Only the cells on the boundaries of the octants are cut more than once.
+    count = sum( len( polyDataToArrays( mesh )[1] ) for mesh, _ in octants )
+    assert surface.GetNumberOfCells() <= count < 1.5 * surface.GetNumberOfCells()
+
+################################################################################
+
+def test_optimizeSurface():
+    """
+    Optimizing a surface welds its points, drops its noise islands and
+    decimates it to the triangle budget.
+    """
+    array = balls( 64 )
+    array[2:4, 2:4, 2:4] = 255
+    surface = extractSurface( arrayToImage( array ), 127 )
+    points, triangles = polyDataToArrays( surface )
+
+    for budget in (None, len( triangles ) // 4):
+        optimizedPoints, optimizedTriangles = polyDataToArrays( optimizeSurface( surface, 100, budget ) )
+
+        assert len( np.unique( optimizedPoints, axis = 0 ) ) == len( optimizedPoints )
+        assert np.linalg.norm( optimizedPoints - 31.5, axis = 1 ).min() > 10
+        if budget is not None: assert len( optimizedTriangles ) <= budget
+
+    # The island is kept if it is large enough.
+    assert len( polyDataToArrays( optimizeSurface( surface, 10 ) )[1] ) == len( triangles )
+
+################################################################################
+
+def test_subsampledSmoothing():
+    """
+    The standard deviation of the Gaussian smoothing of a subsampled image is
+    divided by the sample rate, such that the kernel is the same in space.
+    """
+    smoothing = (2, 1.0, 20, 0.1, 45.0, "Sparse")
+
+    assert _subsampledSmoothing( smoothing, 2 ) == (2, 0.5, 20, 0.1, 45.0, "Sparse")
+    assert _subsampledSmoothing( smoothing, 1 ) == smoothing and _subsampledSmoothing( None, 2 ) is None
+
+################################################################################
+
+def test_extractFocusedSurface():
+    """
+    The isosurface of a subsampled image is that of the full resolution image
+    within the focus extent and that of the subsampled image outside of it,
+    with or without smoothing.
+    """
+    image = arrayToImage( balls() )
+    rounded = lambda points : set( map( tuple, points.round( 3 ) ) )
+
+    for smoothing in (None, (2, 1.0, 20, 0.1, 45.0)):
+        full = polyDataToArrays( extractSurface( image, 127, smoothing ) )[0]
+        coarse = polyDataToArrays( extractSurface( image, 127, smoothing, 2 ) )[0]
+        points, _ = polyDataToArrays( extractSurface( image, 127, smoothing, 2, focus = (24, 47, 0, 47, 0, 47) ) )
+
+        assert len( coarse ) < len( points ) < len( full )
+        assert rounded( points[points[:, 0] > 25] ) <= rounded( full )
+        assert rounded( points[points[:, 0] < 23] ) <= rounded( coarse )
+        assert np.all( np.abs( np.linalg.norm( points - 23.5, axis = 1 ) - 16 ) < 0.2 )
+
+################################################################################
+################################################################################
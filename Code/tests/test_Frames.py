@@ -0,0 +1,196 @@
+"""
+File name:  test_Frames.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the frames of a time series and their cache (see
+            Neuroviz.Frames), on a series of growing balls.
+"""
+
+################################################################################
+################################################################################
+
+from time import sleep
+
+import numpy as np
+import pytest
+
+from conftest import balls, waitUntil
+from Neuroviz.Frames import Frame, FrameCache, createFrame
+from Neuroviz.Readers import MetaImageReader, arrayToImage
+from Neuroviz.Workers import Job, JobQueue
+
+################################################################################
+################################################################################
+
+def _series( fileName, timePoints = 4 ):
+    """
+    Write a series of balls (see conftest.balls) that grow by a voxel every
+    time point to a 4D MetaImage (.mha).
+    """
+    series = np.stack( [np.clip( balls().astype( int ) + 8 * t, 0, 255 ) for t in range( timePoints )] )
+    header = {"ObjectType": "Image", "NDims": 4, "DimSize": f"48 48 48 {timePoints}", "ElementType": "MET_UCHAR",
+              "ElementDataFile": "LOCAL"}
+
+    with open( fileName, "wb" ) as f:
+        f.write( "".join( f"{key} = {value}\n" for key, value in header.items() ).encode( "latin-1" ) )
+        f.write( series.astype( np.uint8 ).tobytes() )
+
+################################################################################
+
+def _buildFrame( index, delay = 0.0, job = None ):
+    """
+    Build a frame of 256 kB without contours, taking the given time (in
+    seconds) in which the job can be cancelled.
+    """
+    for _ in range( int( delay / 0.01 ) ):
+        if job is not None: job.checkCancelled()
+        sleep( 0.01 )
+
+    return Frame( index, arrayToImage( np.zeros( (64, 64, 64), dtype = np.uint8 ) ), None, [], None )
+
+################################################################################
+
+def _failFrame( index, job = None ):
+    """
+    Fail to build a frame.
+    """
+    raise IOError( f"Time point {index} is missing." )
+
+################################################################################
+
+@pytest.fixture
+def jobQueue( application ):
+    """
+    A job queue whose jobs are cancelled and waited for at the end of the test.
+    """
+    jobQueue = JobQueue()
+
+    yield jobQueue
+
+    jobQueue.cancelAll()
+    jobQueue._pool.waitForDone()
+
+################################################################################
+################################################################################
+
+def test_createFrame( tmp_path ):
+    """
+    A frame holds the (cropped) volume of its time point, its contours and
+    the octants of the first contour.
+    """
+    _series( tmp_path / "series.mha" )
+    reader = MetaImageReader( str( tmp_path / "series.mha" ) )
+    bounds = [(*x, *y, *z) for x in ((0, 24), (24, 47)) for y in ((0, 24), (24, 47)) for z in ((0, 24), (24, 47))]
+
+    frame = createFrame( reader, 2, (4, 43, 4, 43, 4, 43), [127, 200], [None, None], octantBounds = bounds )
+
+    assert frame.index == 2 and frame.image.GetDimensions() == (40, 40, 40)
+    assert frame.bricks.getRange()[1] == 255 and len( frame.contours ) == 2
+    assert len( frame.octants ) == 8 and frame.octantBounds == bounds
+    assert frame.rawSurface.GetNumberOfCells() == frame.contours[0][0].GetNumberOfCells()
+    assert frame.getSize() > 40 ** 3
+
+    # The balls of time point 2 are 2 voxels larger than those of the first.
+    points = np.array( frame.contours[1][0].GetPoints().GetData() )
+    assert abs( np.linalg.norm( points - 23.5, axis = 1 ).mean() - (55 / 8 + 2) ) < 0.5
+
+################################################################################
+
+def test_prefetch( jobQueue ):
+    """
+    The frames up to the number of prefetched frames ahead of the playhead
+    are built, by at most the given number of jobs at once, wrapping around at
+    the end of the series.
+    """
+    ready, pending = [], []
+    cache = FrameCache( 10, lambda index : Job( _buildFrame, index, 0.05 ), jobQueue, prefetch = 3, jobs = 2 )
+    cache.frameReady.connect( lambda index : (ready.append( index ), pending.append( len( cache._pending ) )) )
+
+    cache.setPlayhead( 8 )
+    assert len( cache._pending ) == 2
+
+    waitUntil( lambda : not jobQueue.isBusy() )
+
+    assert sorted( ready ) == [0, 1, 8, 9] and max( pending ) <= 2
+    assert cache.get( 9 ).index == 9 and cache.get( 2 ) is None
+
+################################################################################
+
+def test_evict( jobQueue ):
+    """
+    The least recently used frames are dropped once the cache exceeds its
+    budget, except for the frames ahead of the playhead. The frame that has
+    just been played is kept for stepping back, as long as it fits.
+    """
+    frameSize = _buildFrame( 0 ).getSize()
+    cache = FrameCache( 10, lambda index : Job( _buildFrame, index ), jobQueue, prefetch = 2,
+                        budget = 4.5 * frameSize )
+
+    for index in range( 6 ):
+        cache.setPlayhead( index )
+        waitUntil( lambda : not jobQueue.isBusy() )
+        assert cache.get( index ) is not None
+
+    assert sorted( cache._frames ) == [4, 5, 6, 7]
+    assert sum( cache._sizes.values() ) <= 4.5 * frameSize
+
+################################################################################
+
+def test_setPlayhead( jobQueue ):
+    """
+    Frames that are being built but are no longer ahead of the playhead are
+    cancelled and never cached.
+    """
+    ready = []
+    cache = FrameCache( 10, lambda index : Job( _buildFrame, index, 0.5 ), jobQueue, prefetch = 1 )
+    cache.frameReady.connect( ready.append )
+
+    cache.setPlayhead( 0 )
+    cache.setPlayhead( 5 )
+    assert cache._pending == {5, 6}
+
+    waitUntil( lambda : not jobQueue.isBusy() )
+
+    assert sorted( ready ) == [5, 6] and sorted( cache._frames ) == [5, 6]
+
+################################################################################
+
+def test_clear( jobQueue ):
+    """
+    Clearing the cache drops every frame but the one to keep and cancels the
+    frames that are being built.
+    """
+    cache = FrameCache( 10, lambda index : Job( _buildFrame, index, 0.5 ), jobQueue, prefetch = 3 )
+
+    for index in range( 3 ): cache.add( _buildFrame( index ) )
+    cache.setPlayhead( 0 )
+    assert cache._pending == {3}
+
+    cache.clear( keep = 1 )
+    waitUntil( lambda : not jobQueue.isBusy() )
+
+    assert list( cache._frames ) == [1] and list( cache._sizes ) == [1] and not cache._pending
+
+################################################################################
+
+def test_onFrameFailed( jobQueue ):
+    """
+    A frame that could not be built is forgotten, such that it is built again
+    when the playhead comes by.
+    """
+    ready = []
+    cache = FrameCache( 10, lambda index : Job( _failFrame, index ), jobQueue, prefetch = 1 )
+    cache.frameReady.connect( ready.append )
+
+    cache.setPlayhead( 0 )
+    waitUntil( lambda : not jobQueue.isBusy() )
+
+    assert ready == [] and not cache._frames and not cache._pending
+
+    cache.setPlayhead( 0 )
+    assert cache._pending == {0, 1}
+
+################################################################################
+################################################################################
@@ -0,0 +1,188 @@
+"""
+File name:  test_Meshes.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the operations on triangle meshes (see Neuroviz.Meshes).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+from vtk import (vtkCubeSource, vtkSphereSource,
+                 vtkWindowedSincPolyDataFilter)
+from vtk.util.numpy_support import numpy_to_vtk
+
+from Neuroviz.Meshes import (_spreadBits, arraysToPolyData, compactMesh,
+                             polyDataToArrays, reorderMesh, smoothMesh,
+                             splitByLabel, weldMeshes)
+
+################################################################################
+################################################################################
+
+def _sphere( endTheta = 360.0 ):
+    """
+    Get the points and triangles of a sphere, which is open if it ends before
+    the given angle (in degrees) goes round.
+    """
+    sphere = vtkSphereSource()
+    sphere.SetThetaResolution( 32 )
+    sphere.SetPhiResolution( 16 )
+    sphere.SetEndTheta( endTheta )
+    sphere.Update()
+
+    return polyDataToArrays( sphere.GetOutput() )
+
+################################################################################
+
+def _triangleSet( points, triangles ):
+    """
+    Get the triangles as a set of (sorted) tuples of point coordinates, which
+    does not depend on the numbering or order of the points and triangles.
+    """
+    return {tuple( sorted( map( tuple, points[triangle] ) ) ) for triangle in triangles}
+
+################################################################################
+
+def test_roundTrip():
+    """
+    Converting the arrays into vtkPolyData and back keeps the mesh.
+    """
+    points, triangles = _sphere()
+    roundTrip = polyDataToArrays( arraysToPolyData( points, triangles ) )
+
+    assert np.array_equal( roundTrip[0], points ) and np.array_equal( roundTrip[1], triangles )
+    assert polyDataToArrays( arraysToPolyData( np.empty( (0, 3) ), np.empty( (0, 3), dtype = int ) ) )[1].shape == (0, 3)
+
+################################################################################
+
+def test_triangulate():
+    """
+    Polygons other than triangles are triangulated.
+    """
+    cube = vtkCubeSource()
+    cube.Update()
+
+    points, triangles = polyDataToArrays( cube.GetOutput() )
+
+    assert triangles.shape == (12, 3)
+    assert np.all( triangles < len( points ) )
+
+################################################################################
+
+def test_compactMesh():
+    """
+    Compacting removes the points that are not used by any triangle.
+    """
+    points = np.array( [[0, 0, 0], [9, 9, 9], [1, 0, 0], [0, 1, 0]], dtype = np.float32 )
+    triangles = np.array( [[0, 2, 3]] )
+    compactPoints, compactTriangles = compactMesh( points, triangles )
+
+    assert len( compactPoints ) == 3
+    assert _triangleSet( compactPoints, compactTriangles ) == _triangleSet( points, triangles )
+
+################################################################################
+
+def test_splitByLabel():
+    """
+    A multi-label mesh is split into a mesh per label, by the labels of its
+    points, with an empty mesh for a missing label.
+    """
+    points, triangles = _sphere()
+    labels = np.where( points[triangles].mean( axis = 1 )[:, 2] > 0, 2, 5 ).astype( np.float32 )
+
+    # Give each triangle its own points, such that every point has one label.
+    polyData = arraysToPolyData( points[triangles].reshape( -1, 3 ), np.arange( 3 * len( triangles ) ).reshape( -1, 3 ) )
+    polyData.GetPointData().SetScalars( numpy_to_vtk( np.repeat( labels, 3 ), deep = 1 ) )
+
+    meshes = [polyDataToArrays( mesh ) for mesh in splitByLabel( polyData, [5, 2, 7] )]
+
+    assert [len( t ) for _, t in meshes] == [np.sum( labels == 5 ), np.sum( labels == 2 ), 0]
+    assert np.all( meshes[1][0][meshes[1][1]].mean( axis = 1 )[:, 2] > 0 )
+    assert _triangleSet( *meshes[0] ) | _triangleSet( *meshes[1] ) == _triangleSet( points, triangles )
+
+################################################################################
+
+def test_weldMeshes():
+    """
+    Welding merges the points that the pieces share, leaving the triangles
+    untouched.
+    """
+    points = np.array( [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]], dtype = np.float32 )
+    pieces = [(points[[0, 1, 2]], np.array( [[0, 1, 2]] )), (points[[1, 3, 2]], np.array( [[0, 1, 2]] ))]
+    weldedPoints, weldedTriangles = weldMeshes( pieces )
+
+    assert len( weldedPoints ) == 4 and len( weldedTriangles ) == 2
+    assert _triangleSet( weldedPoints, weldedTriangles ) == _triangleSet( points, np.array( [[0, 1, 2], [1, 3, 2]] ) )
+    assert len( weldMeshes( [] )[0] ) == 0
+
+################################################################################
+
+def test_reorderMesh():
+    """
+    Reordering permutes the points and triangles: the same triangles remain,
+    every point is used and the points are numbered in order of first use.
+    """
+    points, triangles = _sphere()
+    reorderedPoints, reorderedTriangles = reorderMesh( points, triangles )
+
+    assert len( reorderedTriangles ) == len( triangles )
+    assert _triangleSet( reorderedPoints, reorderedTriangles ) == _triangleSet( points, triangles )
+
+    used, first = np.unique( reorderedTriangles.ravel(), return_index = True )
+    assert np.array_equal( used, np.arange( len( reorderedPoints ) ) )
+    assert np.all( np.diff( first ) > 0 )
+
+################################################################################
+
+def test_spreadBits():
+    """
+    Spreading the bits puts bit i of the integer at bit 3i.
+    """
+    x = np.random.default_rng( 0 ).integers( 0, 2 ** 21, 1000 ).astype( np.uint64 )
+    spread = _spreadBits( x.copy() )
+
+    for i in range( 21 ):
+        assert np.array_equal( (spread >> np.uint64( 3 * i )) & np.uint64( 1 ), (x >> np.uint64( i )) & np.uint64( 1 ) )
+
+    assert np.all( spread & ~np.uint64( 0x1249249249249249 ) == 0 )
+
+################################################################################
+
+def test_smoothMesh():
+    """
+    The sparse smoothing engine matches vtkWindowedSincPolyDataFilter on a
+    noisy sphere and keeps the points at the boundary of an open sphere in
+    place exactly.
+    """
+    rng = np.random.default_rng( 0 )
+    points, triangles = _sphere()
+    points = points + rng.normal( 0.0, 0.01, points.shape ).astype( np.float32 )
+
+    sinc = vtkWindowedSincPolyDataFilter()
+    sinc.SetInputData( arraysToPolyData( points, triangles ) )
+    sinc.SetNumberOfIterations( 20 )
+    sinc.SetPassBand( 0.1 )
+    sinc.BoundarySmoothingOff()
+    sinc.FeatureEdgeSmoothingOff()
+    sinc.NonManifoldSmoothingOn()
+    sinc.NormalizeCoordinatesOn()
+    sinc.Update()
+
+    smoothed = smoothMesh( points, triangles, 20, 0.1 )
+    assert np.abs( smoothed - polyDataToArrays( sinc.GetOutput() )[0] ).max() < 1e-3
+    assert smoothMesh( points, triangles, 0, 0.1 ) is points
+
+    points, triangles = _sphere( 180.0 )
+    boundary = np.abs( points[:, 1] ) < 1e-6
+    points = points + rng.normal( 0.0, 0.01, points.shape ).astype( np.float32 )
+    smoothed = smoothMesh( points, triangles, 20, 0.1 )
+
+    assert boundary.any() and np.array_equal( smoothed[boundary], points[boundary] )
+    assert np.abs( np.linalg.norm( smoothed[~boundary], axis = 1 ) - 0.5 ).mean() < \
+           np.abs( np.linalg.norm( points[~boundary], axis = 1 ) - 0.5 ).mean()
+
+################################################################################
+################################################################################
@@ -0,0 +1,346 @@
+"""
+File name:  test_Readers.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the volume readers (see Neuroviz.Readers).
+"""
+
+################################################################################
+################################################################################
+
+from os import utime
+from os.path import exists
+
+import numpy as np
+import pytest
+from vtk import vtkImageData, vtkPNGWriter, vtkStructuredPointsWriter
+
+from conftest import balls
+from Neuroviz.Readers import (LegacyVTKReader, MetaImageReader, NIfTIReader,
+                              arrayToImage, compactImage, compactType,
+                              createReader, cropImage, downsampleImage,
+                              findExtent, imageToArray, writeMetaImage)
+
+################################################################################
+################################################################################
+
+def _volume( dtype = np.int16 ):
+    """
+    Get a random (z, y, x) volume of the given data type.
+    """
+    return (np.random.default_rng( 0 ).random( (7, 6, 5) ) * 100).astype( dtype )
+
+################################################################################
+
+def _writeMetaImage( fileName, array, **header ):
+    """
+    Write a single file MetaImage (.mha) with the given extra header fields.
+    """
+    types = {np.dtype( np.uint8 ): "MET_UCHAR", np.dtype( np.int16 ): "MET_SHORT", np.dtype( np.float32 ): "MET_FLOAT"}
+    fields = {"ObjectType": "Image", "NDims": 3, "DimSize": " ".join( map( str, array.shape[::-1] ) ),
+              "ElementType": types[array.dtype], "BinaryDataByteOrderMSB": "False", **header,
+              "ElementDataFile": "LOCAL"}
+
+    with open( fileName, "wb" ) as f:
+        f.write( "".join( f"{key} = {value}\n" for key, value in fields.items() ).encode( "latin-1" ) )
+        f.write( array.astype( array.dtype.newbyteorder( "<" ) ).tobytes() )
+
+################################################################################
+
+@pytest.mark.parametrize( "dtype", [np.uint8, np.int16, np.float32] )
+def test_MetaImageReader( tmp_path, dtype ):
+    """
+    The voxels of a MetaImage file are memory-mapped and wrapped without
+    copying them, along with the spacing and origin of the header.
+    """
+    array = _volume( dtype )
+    fileName = str( tmp_path / "volume.mha" )
+    _writeMetaImage( fileName, array, ElementSpacing = "0.5 1 2", Offset = "1 -2 3" )
+
+    reader = createReader( fileName )
+    image = reader.GetOutput()
+
+    assert isinstance( reader, MetaImageReader ) and isinstance( reader.GetArray(), np.memmap )
+    assert np.array_equal( reader.GetArray(), array )
+    assert np.shares_memory( imageToArray( image ), reader.GetArray() )
+    assert image.GetSpacing() == (0.5, 1.0, 2.0) and image.GetOrigin() == (1.0, -2.0, 3.0)
+    assert reader.GetBounds() == image.GetBounds()
+
+################################################################################
+
+def test_reorient( tmp_path ):
+    """
+    A flipped volume is flipped back into a view of the memory-mapped voxels,
+    with its origin moved to the voxel that becomes the first one. Only the
+    cropped part of it is copied when it is wrapped.
+    """
+    array = _volume()
+    fileName = str( tmp_path / "volume.mha" )
+    _writeMetaImage( fileName, array, ElementSpacing = "0.5 1 2", Offset = "10 20 30",
+                     TransformMatrix = "-1 0 0 0 1 0 0 0 -1" )
+
+    reader = createReader( fileName )
+
+    assert np.array_equal( reader.GetArray(), array[::-1, :, ::-1] )
+    assert isinstance( reader.GetArray(), np.memmap )
+    assert np.allclose( reader.GetBounds(), (8, 10, 20, 25, 18, 30) )
+    assert not isinstance( reader.GetOutputDataObject( 0 ), vtkImageData )
+
+    image = reader.GetTimePoint( 0, (1, 2, 0, 5, 3, 100) )
+
+    assert np.array_equal( imageToArray( image ), array[::-1, :, ::-1][3:, :, 1:3] )
+    assert np.allclose( image.GetOrigin(), (8.5, 20, 24) )
+    assert np.allclose( reader.GetOutput().GetBounds(), reader.GetBounds() )
+
+################################################################################
+
+def test_permute( tmp_path ):
+    """
+    A volume whose x- and y-axis are swapped is transposed, along with its
+    spacing.
+    """
+    array = _volume()
+    fileName = str( tmp_path / "volume.mha" )
+    _writeMetaImage( fileName, array, ElementSpacing = "0.5 1 2", TransformMatrix = "0 1 0 1 0 0 0 0 1" )
+
+    image = createReader( fileName ).GetOutput()
+
+    assert np.array_equal( imageToArray( image ), array.transpose( 0, 2, 1 ) )
+    assert image.GetSpacing() == (1.0, 0.5, 2.0)
+
+################################################################################
+
+def test_NIfTIReader( tmp_path ):
+    """
+    The voxels of a NIfTI-1 file are memory-mapped, scaled by the slope and
+    intercept of the header if any.
+    """
+    array = _volume()
+    header = np.zeros( 348, dtype = np.uint8 )
+    field = lambda type, offset, values : header[offset:].view( type )[:len( values )].__setitem__( slice( None ), values )
+
+    field( "<i4", 0, [348] )
+    field( "<i2", 40, [3, *array.shape[::-1], 1, 1, 1, 1] )
+    field( "<i2", 70, [4, 16] )
+    field( "<f4", 76, [1, 0.5, 1, 2] )
+    field( "<f4", 108, [352] )
+    header[344:348] = np.frombuffer( b"n+1\0", np.uint8 )
+
+    fileName = tmp_path / "volume.nii"
+    fileName.write_bytes( header.tobytes() + bytes( 4 ) + array.astype( "<i2" ).tobytes() )
+
+    reader = createReader( str( fileName ) )
+
+    assert isinstance( reader, NIfTIReader ) and isinstance( reader.GetArray(), np.memmap )
+    assert np.array_equal( reader.GetArray(), array )
+    assert reader.GetOutput().GetSpacing() == (0.5, 1.0, 2.0)
+
+    field( "<f4", 112, [2, 1] )
+    fileName.write_bytes( header.tobytes() + bytes( 4 ) + array.astype( "<i2" ).tobytes() )
+
+    assert np.array_equal( createReader( str( fileName ) ).GetArray(), 2 * array + 1 )
+
+################################################################################
+
+def test_PNGStackReader( tmp_path ):
+    """
+    The slices of a directory of PNG files are read in the order of their
+    names.
+    """
+    array = _volume( np.uint8 )
+
+    for z, slice in enumerate( array ):
+        writer = vtkPNGWriter()
+        writer.SetInputData( arrayToImage( slice[np.newaxis] ) )
+        writer.SetFileName( str( tmp_path / f"slice{z:03d}.png" ) )
+        writer.Write()
+
+    reader = createReader( str( tmp_path ), (0.5, 1.0, 2.0) )
+
+    assert np.array_equal( reader.GetArray(), array )
+    assert reader.GetOutput().GetSpacing() == (0.5, 1.0, 2.0)
+
+################################################################################
+
+def test_createReader( tmp_path ):
+    """
+    Files that can not be read give no reader.
+    """
+    (tmp_path / "volume.txt").write_text( "" )
+    (tmp_path / "volume.mha").write_text( "ObjectType = Image\n" )
+
+    assert createReader( str( tmp_path / "volume.txt" ) ) is None
+    assert createReader( str( tmp_path / "volume.mha" ) ) is None
+
+################################################################################
+
+def test_arrayToImage():
+    """
+    Arrays are wrapped into images and back without copying them.
+    """
+    array = np.arange( 60, dtype = np.int16 ).reshape( 3, 4, 5 )
+    image = arrayToImage( array )
+
+    assert image.GetDimensions() == (5, 4, 3)
+    assert np.shares_memory( imageToArray( image ), array )
+
+################################################################################
+
+def test_downsampleImage():
+    """
+    The strided copy keeps at most the given number of voxels and covers the
+    bounds of the image.
+    """
+    image = arrayToImage( np.zeros( (40, 30, 20), dtype = np.uint8 ), (0.5, 1.0, 2.0), (1.0, 2.0, 3.0) )
+
+    for maxVoxels in (24000, 5000, 100):
+        copy = downsampleImage( image, maxVoxels )
+
+        assert np.prod( copy.GetDimensions() ) <= maxVoxels
+        assert np.allclose( copy.GetBounds(), image.GetBounds() )
+
+    assert downsampleImage( image, 24000 ).GetDimensions() == (20, 30, 40)
+
+################################################################################
+
+def test_findExtent():
+    """
+    The extent bounds the voxels at or above the threshold, grown by the
+    margin and clipped to the array, whatever the size of the slabs.
+    """
+    array = np.zeros( (40, 30, 20), dtype = np.int16 )
+    array[17:23, 3:5, 11:19] = 10
+    array[35, 4, 12] = 20
+
+    for slabSize in (1, 16, 64):
+        assert findExtent( array, 10, slabSize = slabSize ) == (11, 18, 3, 4, 17, 35)
+        assert findExtent( array, 20, 2, slabSize ) == (10, 14, 2, 6, 33, 37)
+        assert findExtent( array, 10, 5, slabSize ) == (6, 19, 0, 9, 12, 39)
+
+    assert findExtent( array, 30 ) is None
+
+################################################################################
+
+def test_cropImage():
+    """
+    The cropped copy starts at index zero and covers the same part of space
+    as the voxels it holds. Cropping to the whole image keeps the image.
+    """
+    array = _volume()
+    image = arrayToImage( array, (0.5, 1.0, 2.0), (1.0, 2.0, 3.0) )
+    cropped = cropImage( image, (1, 3, -4, 2, 5, 10) )
+
+    assert cropped.GetExtent() == (0, 2, 0, 2, 0, 1)
+    assert np.array_equal( imageToArray( cropped ), array[5:7, 0:3, 1:4] )
+    assert np.allclose( cropped.GetOrigin(), (1.5, 2.0, 13.0) )
+
+    assert cropImage( image, (0, 4, 0, 5, 0, 6) ) is image
+    assert cropImage( image ) is image
+
+################################################################################
+
+@pytest.mark.parametrize( "compress", [False, True] )
+@pytest.mark.parametrize( "dtype", [np.uint8, np.int16, np.float32, np.float64] )
+def test_writeMetaImage( tmp_path, dtype, compress ):
+    """
+    A written MetaImage file is read back with its voxels, spacing and origin,
+    memory-mapped unless compressed, and no temporary files are left.
+    """
+    array = _volume( dtype )
+    fileName = str( tmp_path / "volume.mha" )
+
+    writeMetaImage( fileName, array, (0.5, 1.0, 2.0), (1.0, -2.0, 3.0), compress, blockSize = 64 )
+    reader = MetaImageReader( fileName )
+    image = reader.GetOutput()
+
+    assert np.array_equal( reader.GetArray(), array ) and reader.GetArray().dtype == dtype
+    assert isinstance( reader.GetArray(), np.memmap ) != compress
+    assert image.GetSpacing() == (0.5, 1.0, 2.0) and image.GetOrigin() == (1.0, -2.0, 3.0)
+    assert [path.name for path in tmp_path.iterdir()] == ["volume.mha"]
+
+################################################################################
+
+@pytest.mark.parametrize( "compress", [False, True] )
+def test_LegacyVTKReader( tmp_path, monkeypatch, compress ):
+    """
+    The first read of a legacy file converts it into a side-car, which later
+    reads use instead. A changed legacy file is converted again, replacing
+    the side-car of its previous version, as is an invalid side-car.
+    """
+    array, fileName = _volume(), str( tmp_path / "volume.vtk" )
+
+    def writeLegacyFile( array ):
+        writer = vtkStructuredPointsWriter()
+        writer.SetInputData( arrayToImage( array, (0.5, 1.0, 2.0), (1.0, -2.0, 3.0) ) )
+        writer.SetFileName( fileName )
+        writer.Write()
+
+    writeLegacyFile( array )
+    reader = LegacyVTKReader( fileName, compress )
+    sideCar = reader.GetSideCarName()
+
+    assert np.array_equal( reader.GetArray(), array ) and exists( sideCar )
+    assert sideCar.endswith( "z.mha" ) == compress
+
+    # Later reads never parse the legacy file.
+    parse = LegacyVTKReader._readLegacyFile
+    monkeypatch.setattr( LegacyVTKReader, "_readLegacyFile", lambda self : pytest.fail( "Parsed the legacy file." ) )
+    reader = LegacyVTKReader( fileName, compress )
+
+    assert np.array_equal( reader.GetArray(), array ) and isinstance( reader.GetArray(), np.memmap ) != compress
+    assert reader.GetOutput().GetSpacing() == (0.5, 1.0, 2.0) and reader.GetOutput().GetOrigin() == (1.0, -2.0, 3.0)
+
+    monkeypatch.setattr( LegacyVTKReader, "_readLegacyFile", parse )
+    writeLegacyFile( array + 1 )
+    utime( fileName, ns = (1, 1) )
+    reader = LegacyVTKReader( fileName, compress )
+
+    assert np.array_equal( reader.GetArray(), array + 1 )
+    assert reader.GetSideCarName() != sideCar and not exists( sideCar )
+
+    sideCar = reader.GetSideCarName()
+    with open( sideCar, "r+b" ) as f: f.truncate( 100 )
+
+    assert np.array_equal( LegacyVTKReader( fileName, compress ).GetArray(), array + 1 )
+    assert len( list( tmp_path.iterdir() ) ) == 2
+
+################################################################################
+
+def test_compactType():
+    """
+    The compact data type holds every value exactly, whatever the size of the
+    slabs, and is never larger than the data type of the array.
+    """
+    assert compactType( np.array( [[[0.0, 3.0, 255.0]]] ) ) == np.uint8
+    assert compactType( np.array( [[[-1.0, 300.0]]] ) ) == np.int16
+    assert compactType( np.array( [[[0.5, 1.0]]] ) ) == np.float32
+    assert compactType( np.array( [[[0, 1]]], dtype = np.uint8 ) ) == np.uint8
+    assert compactType( np.array( [[[-1, 1]]], dtype = np.int8 ) ) == np.int8
+    assert compactType( np.array( [[[0.5, 1.0]]], dtype = np.float32 ) ) == np.float32
+
+    array = np.zeros( (40, 2, 2) )
+    array[35, 1, 1] = 70000
+    assert compactType( array, slabSize = 4 ) == np.uint32
+
+    array[3, 0, 0] = 0.5
+    assert compactType( array, slabSize = 4 ) == np.float32
+
+################################################################################
+
+def test_compactImage():
+    """
+    A label volume is converted to the compact data type, keeping its voxels,
+    spacing and origin. A compact volume is kept as is.
+    """
+    array = balls().astype( np.float64 )
+    image = arrayToImage( array, (0.5, 1.0, 2.0), (1.0, -2.0, 3.0) )
+    compacted = compactImage( image )
+
+    assert imageToArray( compacted ).dtype == np.uint8 and np.array_equal( imageToArray( compacted ), array )
+    assert compacted.GetSpacing() == (0.5, 1.0, 2.0) and compacted.GetOrigin() == (1.0, -2.0, 3.0)
+    assert compactImage( compacted ) is compacted
+
+################################################################################
+################################################################################
@@ -0,0 +1,120 @@
+"""
+File name:  test_Slabs.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the slab projections (see Neuroviz.Slabs).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+import pytest
+
+from Neuroviz.Slabs import SlabIndex, createSlabIndices
+
+################################################################################
+################################################################################
+
+_functions = {"Maximum": np.max, "Minimum": np.min, "Average": np.mean}
+
+################################################################################
+
+def _volume( dtype ):
+    """
+    Get a random (z, y, x) volume of the given data type.
+    """
+    return (np.random.default_rng( 0 ).random( (13, 11, 9) ) * 1000).astype( dtype )
+
+################################################################################
+
+@pytest.mark.parametrize( "budget", [None, 0] )
+@pytest.mark.parametrize( "dtype", [np.uint8, np.int16, np.float32] )
+@pytest.mark.parametrize( "mode", ["Maximum", "Minimum", "Average"] )
+def test_project( mode, dtype, budget ):
+    """
+    Every slab along every axis is projected like numpy reduces its slices,
+    with and without the table.
+    """
+    array = _volume( dtype )
+
+    for axis in range( 3 ):
+        slices = np.moveaxis( array, 2 - axis, 0 )
+
+        for thickness in (1, 2, 3, 5, 8, 100):
+            index = SlabIndex( array, axis, mode, thickness, budget )
+
+            for center in range( len( slices ) ):
+                first, last = index.getSlab( center )
+                expected = _functions[mode]( slices[first:last + 1], axis = 0 )
+
+                # Cumulative sums in single precision are exact up to rounding.
+                assert np.allclose( index.project( center ), expected, rtol = 1e-5, atol = 1e-2 )
+
+################################################################################
+
+def test_getSlab():
+    """
+    Slabs keep their thickness near the border of the volume and are clipped
+    to the volume.
+    """
+    index = SlabIndex( _volume( np.uint8 ), 2, "Maximum", 4 )
+
+    assert index.getSlab( 0 ) == (0, 3)
+    assert index.getSlab( 6 ) == (4, 7)
+    assert index.getSlab( 12 ) == (9, 12)
+    assert SlabIndex( _volume( np.uint8 ), 2, "Maximum", 100 ).getSlab( 6 ) == (0, 12)
+
+################################################################################
+
+def test_withThickness():
+    """
+    The levels of the table are kept for other thicknesses, such that a
+    thickness that has been used before is a lookup. The index that is
+    reused is left untouched.
+    """
+    array = _volume( np.int16 )
+    index = SlabIndex( array, 2, "Maximum", 2 )
+
+    thick = index.withThickness( 8 )
+    assert index.getThickness() == 2 and index._levels[3] is None
+    assert thick.getThickness() == 8 and thick.getSize() > index.getSize()
+    assert thick._levels[1] is index._levels[1]
+
+    thin = thick.withThickness( 3 )
+    assert thin.getSize() == thick.getSize() and thin._levels[3] is thick._levels[3]
+
+    for thickness in (1, 2, 3, 5, 8, 13):
+        resized = thin.withThickness( thickness )
+        first, last = resized.getSlab( 6 )
+        assert np.array_equal( resized.project( 6 ), array[first:last + 1].max( axis = 0 ) )
+
+    average = SlabIndex( array, 2, "Average", 4 )
+    assert average.withThickness( 7 )._table is average._table
+
+################################################################################
+
+def test_budget():
+    """
+    The tables of the indices together fit the budget, and the levels that
+    do not fit it are released.
+    """
+    array = _volume( np.int16 )
+    budget = array.nbytes * 3
+
+    indices = createSlabIndices( array, "Average", 3, budget )
+
+    assert sum( index.getSize() for index in indices ) <= budget
+    assert [index.hasTable() for index in indices] == [False, False, True]
+
+    index = SlabIndex( array, 2, "Minimum", 2, 2 * array.nbytes )
+    for thickness in (4, 8, 2, 13):
+        index = index.withThickness( thickness )
+        assert 0 < index.getSize() <= 2 * array.nbytes
+
+    assert createSlabIndices( array, "Maximum", 3, 0 )[0].getSize() == 0
+
+################################################################################
+################################################################################
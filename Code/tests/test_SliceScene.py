@@ -0,0 +1,105 @@
+"""
+File name:  test_SliceScene.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the 2D scenes of the slices of the "Basic" scene (see
+            Neuroviz.Scenes.SliceScene).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+import pytest
+from vtk import vtkGenericRenderWindowInteractor, vtkRenderWindow
+
+from conftest import pump, waitUntil
+
+################################################################################
+################################################################################
+
+@pytest.fixture
+def createSliceScene( createScene ):
+    """
+    A function that creates the scene of the slice along the given axis in
+    an off screen render window of its own, along with the loaded "Basic"
+    scene it shows the slice of.
+    """
+    from Neuroviz.Scenes import SliceScene
+
+    scene, windows = createScene(), []
+
+    def create( axis ):
+        windows.append( vtkRenderWindow() )
+        windows[-1].SetOffScreenRendering( True )
+        windows[-1].SetSize( 100, 100 )
+
+        interactor = vtkGenericRenderWindowInteractor()
+        interactor.SetRenderWindow( windows[-1] )
+
+        return scene, SliceScene( windows[-1], axis )
+
+    yield create
+
+    for window in windows: window.Finalize()
+
+################################################################################
+################################################################################
+
+def test_setSlice( createSliceScene ):
+    """
+    The slice scene shows the colored slice of the "Basic" scene itself and
+    is rendered again whenever it is computed again. Only the producer of the
+    shown slice is observed.
+    """
+    scene, sliceScene = createSliceScene( 2 )
+
+    sliceScene.setSlice( *scene.getSlice( 1 ) )
+    sliceScene.setSlice( *scene.getSlice( 2 ) )
+
+    assert sliceScene._imageActor.GetMapper().GetInput() is scene._imageResliceMappers[2].GetOutput()
+    assert not scene._imageResliceMappers[1].HasObserver( "EndEvent" )
+    assert scene._imageResliceMappers[2].HasObserver( "EndEvent" )
+
+    scene.updateSlices( [10, 20, 30] )
+    assert sliceScene._isRenderPending
+
+    waitUntil( lambda : not sliceScene._isRenderPending )
+
+################################################################################
+
+def test_pickPosition( createSliceScene ):
+    """
+    The crosshair shows the positions of the other two slices and picking
+    the point where its lines cross gives the position of the three slices.
+    A hidden slice hides the crosshair and picks nothing.
+    """
+    scene, sliceScene = createSliceScene( 2 )
+    picked = []
+    sliceScene.positionPicked.connect( lambda *position : picked.append( position ) )
+
+    sliceScene.setSlice( *scene.getSlice( 2 ) )
+    scene.updateSlices( [10, 20, 30] )
+    sliceScene.updateSlices( [10, 20, 30] )
+    pump()
+
+    lines = [np.array( source.GetPoint1() ) for source in sliceScene._crosshairSources]
+    crossing = (lines[0][0], lines[1][1], 0.0)
+
+    renderer = sliceScene._renderer
+    renderer.SetWorldPoint( *crossing, 1.0 )
+    renderer.WorldToDisplay()
+    x, y, _ = renderer.GetDisplayPoint()
+
+    sliceScene._pickPosition( x, y )
+    assert np.allclose( picked[-1], (10, 20, 30), atol = 0.5 )
+
+    sliceScene.updateSlices( [10, 20, None] )
+    sliceScene._pickPosition( x, y )
+
+    assert len( picked ) == 1 and not any( actor.GetVisibility() for actor in sliceScene._crosshairActors )
+
+################################################################################
+################################################################################
@@ -0,0 +1,82 @@
+"""
+File name:  test_Stages.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the cache of pipeline stages (see Neuroviz.Stages).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+from vtk import vtkImageData
+
+from Neuroviz.Readers import arrayToImage
+from Neuroviz.Stages import StageCache
+
+################################################################################
+################################################################################
+
+def _image( size = 32 ):
+    """
+    Get an image of size^3 float32 voxels.
+    """
+    return arrayToImage( np.zeros( (size, size, size), dtype = np.float32 ) )
+
+################################################################################
+
+def test_compute():
+    """
+    An output is computed once and handed out as a shallow copy afterwards.
+    """
+    cache, calls = StageCache(), []
+    compute = lambda : calls.append( 1 ) or _image()
+
+    first = cache.compute( ("Stage", 1), compute )
+    second = cache.compute( ("Stage", 1), compute )
+
+    assert len( calls ) == 1
+    assert second is not first and second.GetPointData().GetScalars() is first.GetPointData().GetScalars()
+
+    cache.compute( ("Stage", 2), compute )
+    assert len( calls ) == 2
+
+################################################################################
+
+def test_evict():
+    """
+    The least recently used outputs are dropped to fit the budget, except for
+    the most recent one.
+    """
+    size = 1024 * _image().GetActualMemorySize()
+    cache = StageCache( 2 * size )
+
+    for key in ("A", "B", "C"): cache.add( key, _image() )
+    assert len( cache.getOutputs() ) == 2
+
+    cache.compute( "B", _image )
+    cache.add( "D", _image() )
+    assert cache.compute( "B", lambda : None ) is not None
+    assert cache.compute( "C", lambda : None ) is None
+
+    cache = StageCache( 1 )
+    cache.add( "A", _image() )
+    assert len( cache.getOutputs() ) == 1
+
+################################################################################
+
+def test_fingerprint():
+    """
+    Shallow copies of a volume share its fingerprint, other volumes do not.
+    """
+    image = _image()
+    copy = vtkImageData()
+    copy.ShallowCopy( image )
+
+    assert StageCache.fingerprint( copy ) == StageCache.fingerprint( image )
+    assert StageCache.fingerprint( _image() ) != StageCache.fingerprint( image )
+
+################################################################################
+################################################################################
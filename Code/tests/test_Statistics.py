@@ -0,0 +1,77 @@
+"""
+File name:  test_Statistics.py
+Author:     Gerbrand De Laender
+Date:       19/10/2026
+Email:      gerbrand.delaender@ugent.be
+Brief:      E016712, Project, Neuroviz
+About:      Tests of the tissue statistics (see Neuroviz.Statistics).
+"""
+
+################################################################################
+################################################################################
+
+import numpy as np
+import pytest
+
+from Neuroviz.Bricks import BrickIndex
+from Neuroviz.Statistics import _binVoxels, _lookupTable, computeStatistics
+
+################################################################################
+################################################################################
+
+def _expected( array, value, spacing, discrete ):
+    """
+    Measure the tissue of a value by brute force.
+    """
+    mask = array == value if discrete else array >= value
+    voxels = int( mask.sum() )
+    if voxels == 0: return 0, 0.0, None
+
+    z, y, x = np.nonzero( mask )
+    extent = (x.min(), x.max(), y.min(), y.max(), z.min(), z.max())
+
+    return voxels, voxels * float( np.prod( spacing ) ), tuple( int( e ) for e in extent )
+
+################################################################################
+
+@pytest.mark.parametrize( "bricks", [False, True] )
+@pytest.mark.parametrize( "discrete", [False, True] )
+@pytest.mark.parametrize( "dtype", [np.uint8, np.int16, np.float32] )
+def test_computeStatistics( dtype, discrete, bricks ):
+    """
+    The statistics match the brute force ones, whether the volume is visited
+    a brick or a slab at a time, for unsorted and repeated values.
+    """
+    rng = np.random.default_rng( 0 )
+    array = np.zeros( (40, 30, 20), dtype = dtype )
+    array[5:20, 3:17, 2:9] = rng.integers( 1, 6, (15, 14, 7) )
+    array[30, 25, 15] = 7
+
+    values = [3, 1, 7, 3, 9, 5]
+    spacing = (0.5, 1.0, 2.0)
+    index = BrickIndex( array ) if bricks else None
+
+    statistics = computeStatistics( array, values, spacing, discrete, index, slabSize = 7 )
+
+    assert statistics == [_expected( array, value, spacing, discrete ) for value in values]
+
+################################################################################
+
+@pytest.mark.parametrize( "discrete", [False, True] )
+def test_binVoxels( discrete ):
+    """
+    Voxels are binned by the levels, and binning by table lookup matches
+    binning by search.
+    """
+    array = np.arange( -300, 300, dtype = np.int16 )
+    levels = np.array( [-100, 0, 7, 200] )
+
+    bins = _binVoxels( array, levels, discrete )
+    expected = np.searchsorted( levels, array, side = "right" )
+    if discrete: expected[~np.isin( array, levels )] = 0
+
+    assert np.array_equal( bins, expected )
+    assert np.array_equal( _binVoxels( array, levels, discrete, _lookupTable( array.dtype, levels, discrete ) ), bins )
+
+################################################################################
+################################################################################